@@ -0,0 +1,155 @@
+"""
+API HTTP asynchrone pour le chatbot touristique du Burkina Faso
+Usage: python api.py --workers 2   (ou: uvicorn api:app --port 8000 --workers 2)
+"""
+
+import argparse
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from burkina_chatbot import get_shared_chatbot, warm_up_shared_chatbot
+from config import Config, load_environment
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pool borné pour le travail CPU (encodage, recherche) : la boucle asyncio reste libre
+_executor = ThreadPoolExecutor(max_workers=Config.API_THREADS, thread_name_prefix="chatbot")
+_in_flight = 0
+_rejected = 0
+
+
+class ChatRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=1000)
+
+
+class ChatResponse(BaseModel):
+    response: str
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=1000)
+    n_results: Optional[int] = Field(None, ge=1, le=20)
+
+
+class SearchResponse(BaseModel):
+    documents: List[str]
+    scores: List[float]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Charge le chatbot partagé du processus sans bloquer le démarrage du serveur"""
+    # Exécuté dans chaque processus (uvicorn --workers), y compris sans passer par main()
+    load_environment()
+    app.state.chatbot_ready = asyncio.wrap_future(warm_up_shared_chatbot())
+    yield
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Burkina Faso - Assistant Touristique", lifespan=lifespan)
+
+
+async def run_in_pool(func, *args):
+    """Exécute une fonction bloquante dans le pool, ou refuse la requête si le serveur est saturé"""
+    global _in_flight, _rejected
+    if _in_flight >= Config.API_MAX_PENDING:
+        _rejected += 1
+        raise HTTPException(status_code=503, detail="Serveur saturé, réessayez plus tard",
+                            headers={"Retry-After": "1"})
+
+    _in_flight += 1
+    try:
+        await app.state.chatbot_ready
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _in_flight -= 1
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """Répond à une question"""
+    response = await run_in_pool(lambda: get_shared_chatbot().chat(request.query))
+    return ChatResponse(response=response)
+
+
+@app.post("/search", response_model=SearchResponse)
+async def search(request: SearchRequest):
+    """Retourne les documents les plus pertinents pour une question"""
+    documents, scores = await run_in_pool(
+        lambda: get_shared_chatbot().search_similar_documents(request.query, n_results=request.n_results)
+    )
+    return SearchResponse(documents=documents, scores=scores)
+
+
+@app.get("/health")
+async def health():
+    """État du service : "loading" tant que le modèle et l'index ne sont pas prêts"""
+    if not app.state.chatbot_ready.done():
+        return {"status": "loading"}
+    if app.state.chatbot_ready.exception():
+        raise HTTPException(status_code=500, detail=str(app.state.chatbot_ready.exception()))
+    return {"status": "ok", "documents": app.state.chatbot_ready.result().collection.count()}
+
+
+@app.get("/stats")
+async def stats():
+    """Statistiques du processus : charge, caches et corpus"""
+    result = {
+        "in_flight": _in_flight,
+        "max_pending": Config.API_MAX_PENDING,
+        "threads": Config.API_THREADS,
+        "rejected": _rejected,
+    }
+    if app.state.chatbot_ready.done() and not app.state.chatbot_ready.exception():
+        chatbot = app.state.chatbot_ready.result()
+        result.update({
+            "collection": chatbot.collection.name,
+            "corpus_version": chatbot.corpus_version,
+            "reindexing": chatbot.is_reindexing,
+            "last_reindex_report": chatbot.last_reindex_report,
+            "last_reindex_error": chatbot.last_reindex_error,
+            "query_embedding_cache": chatbot.query_embedding_cache.stats(),
+            "response_cache": chatbot.response_cache.stats(),
+            "search_routes": chatbot.search_route_stats(),
+        })
+        if chatbot.query_batcher is not None:
+            result["query_batcher"] = chatbot.query_batcher.stats()
+        if chatbot.generator is not None:
+            result["generator"] = chatbot.generator.stats()
+        if chatbot.metrics.enabled:
+            result["metrics"] = chatbot.metrics.snapshot()
+    return result
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métriques au format texte Prometheus (vide tant que le chatbot n'est pas prêt)"""
+    text = ""
+    if app.state.chatbot_ready.done() and not app.state.chatbot_ready.exception():
+        text = app.state.chatbot_ready.result().metrics.prometheus_text()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP du chatbot touristique")
+    parser.add_argument("--host", default=Config.API_HOST)
+    parser.add_argument("--port", type=int, default=Config.API_PORT)
+    parser.add_argument("--workers", type=int, default=Config.API_WORKERS,
+                        help="Nombre de processus derrière le même port (un chatbot par processus)")
+    args = parser.parse_args()
+
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,9 @@ Interface Streamlit pour le chatbot touristique du Burkina Faso
 import streamlit as st
 from datetime import datetime
 import logging
-from burkina_chatbot import BurkinaChatbot
-from config import Config
+import time
+from burkina_chatbot import warm_up_shared_chatbot
+from config import Config, load_environment
 import random
 
 # Configuration du logging
@@ -125,14 +126,13 @@ def load_css():
 
 def init_session_state():
     """Initialise les variables de session"""
-    if 'chatbot' not in st.session_state:
-        with st.spinner("🚀 Initialisation du chatbot..."):
-            try:
-                st.session_state.chatbot = BurkinaChatbot()
-                st.session_state.initialized = True
-            except Exception as e:
-                st.error(f"Erreur lors de l'initialisation: {e}")
-                st.session_state.initialized = False
+    # Le chatbot (modèle, base vectorielle) est partagé par toutes les sessions du processus ;
+    # seuls l'historique, les compteurs et les retours restent propres à chaque session.
+    # Il se charge en arrière-plan : la page s'affiche sans attendre le modèle.
+    ready = warm_up_shared_chatbot()
+    if 'chatbot' not in st.session_state and ready.done() and not ready.exception():
+        st.session_state.chatbot = ready.result()
+    st.session_state.initialized = 'chatbot' in st.session_state
 
     if 'messages' not in st.session_state:
         st.session_state.messages = []
@@ -144,6 +144,30 @@ def init_session_state():
         st.session_state.feedback = {}
 
 
+def wait_for_chatbot() -> bool:
+    """Attend la fin du préchargement si nécessaire ; retourne True si le chatbot est prêt"""
+    if not st.session_state.initialized:
+        with st.spinner("⏳ Chargement du modèle..."):
+            try:
+                warm_up_shared_chatbot().result()
+            except Exception as e:
+                logger.error(f"Erreur lors de l'initialisation: {e}")
+        init_session_state()
+    return st.session_state.initialized
+
+
+def display_readiness():
+    """Indique l'état du chargement du modèle et de l'index (rien une fois prêts)"""
+    ready = warm_up_shared_chatbot()
+    if not ready.done():
+        st.info("⏳ Chargement du modèle en arrière-plan... vous pouvez déjà poser votre question")
+    elif ready.exception():
+        st.error(f"Erreur lors de l'initialisation: {ready.exception()}")
+    elif not st.session_state.initialized:
+        # Chargement terminé : on réaffiche toute la page (compteurs, options, statut)
+        st.rerun()
+
+
 def display_header():
     """Affiche l'en-tête de l'application"""
     st.markdown("""
@@ -160,6 +184,12 @@ def display_sidebar():
     with st.sidebar:
         st.markdown("## 🎯 Navigation")
 
+        # Pendant le chargement, seul l'indicateur est rafraîchi périodiquement
+        if not st.session_state.initialized and hasattr(st, "fragment"):
+            st.fragment(run_every=1)(display_readiness)()
+        else:
+            display_readiness()
+
         # Guide d'utilisation
         st.markdown("""
         <div class="info-card">
@@ -188,9 +218,8 @@ def display_sidebar():
         ]
 
         for suggestion in suggestions:
-            if st.button(f"💬 {suggestion}", key=f"sugg_{suggestion[:20]}"):
-                process_user_query(suggestion)
-                st.rerun()
+            st.button(f"💬 {suggestion}", key=f"sugg_{suggestion[:20]}",
+                      on_click=queue_user_query, args=(suggestion,))
 
         # Statistiques d'utilisation
         st.markdown("### 📊 Statistiques")
@@ -227,9 +256,22 @@ def display_sidebar():
                 st.success("✅ Conversation réinitialisée!")
                 st.session_state.reset_success = False
             
-            if 'reload_success' in st.session_state and st.session_state.reload_success:
-                st.success("✅ Base de données rechargée!")
-                st.session_state.reload_success = False
+            # La réindexation tourne en arrière-plan : le chatbot reste disponible pendant ce temps
+            if st.session_state.get('reload_started') and st.session_state.initialized:
+                chatbot = st.session_state.chatbot
+                if chatbot.is_reindexing:
+                    st.info("🔄 Réindexation en arrière-plan... le chatbot reste disponible")
+                elif chatbot.last_reindex_error:
+                    st.error(f"❌ Échec du rechargement : {chatbot.last_reindex_error}")
+                    st.session_state.reload_started = False
+                else:
+                    report = chatbot.last_reindex_report or {}
+                    st.success(
+                        "✅ Base de données rechargée! "
+                        f"({report.get('added', 0)} ajoutés, {report.get('updated', 0)} mis à jour, "
+                        f"{report.get('removed', 0)} supprimés, {report.get('unchanged', 0)} inchangés)"
+                    )
+                    st.session_state.reload_started = False
             
             if st.button("🔄 Réinitialiser la conversation"):
                 st.session_state.messages = []
@@ -239,16 +281,16 @@ def display_sidebar():
                 st.rerun()
 
             if st.button("🗄️ Recharger la base de données"):
-                with st.spinner("Rechargement en cours..."):
-                    if st.session_state.initialized:
-                        st.session_state.chatbot.reset_database()
-                        st.session_state.reload_success = True
-                        st.rerun()
+                if st.session_state.initialized:
+                    st.session_state.chatbot.reset_database(background=True)
+                    st.session_state.reload_started = True
+                    st.rerun()
 
-            # Mode débogage
-            debug_mode = st.checkbox("🐛 Mode Debug", value=Config.DEBUG)
-            if st.session_state.initialized:
-                st.session_state.chatbot.config.DEBUG = debug_mode
+            # Mode débogage propre à la session : il ne règle que l'affichage des détails ici,
+            # la configuration du chatbot partagé (journalisation) n'est pas modifiée
+            st.session_state.debug_mode = st.checkbox(
+                "🐛 Mode Debug", value=st.session_state.get('debug_mode', Config.DEBUG)
+            )
 
         # Anecdotes sur le Burkina Faso
         st.markdown("### 🌍 Le saviez-vous ?")
@@ -271,45 +313,101 @@ def display_sidebar():
         """, unsafe_allow_html=True)
 
 
+def queue_user_query(user_input: str):
+    """Met une question en attente : elle est traitée et affichée au fil de l'eau sous l'historique"""
+    if user_input:
+        st.session_state.pending_query = user_input
+
+
+def submit_chat_form():
+    """Rappel du formulaire : la saisie est lue avant son effacement"""
+    queue_user_query(st.session_state.get("chat_input", "").strip())
+
+
 def process_user_query(user_input: str):
-    """Traite la question de l'utilisateur"""
-    if not st.session_state.initialized:
-        st.error("❌ Le chatbot n'est pas encore initialisé. Veuillez patienter...")
+    """Traite la question de l'utilisateur en affichant la réponse au fur et à mesure"""
+    if not wait_for_chatbot():
+        st.error("❌ Le chatbot n'a pas pu être initialisé.")
         return
 
-    # Enregistrement de la question
+    # Enregistrement et affichage immédiat de la question
+    timestamp = datetime.now().strftime("%H:%M")
     st.session_state.messages.append({
         "role": "user",
         "content": user_input,
-        "timestamp": datetime.now().strftime("%H:%M")
+        "timestamp": timestamp
     })
+    st.markdown(render_message("user", user_input, timestamp), unsafe_allow_html=True)
 
     st.session_state.conversation_count += 1
     
     logger.info(f"Message {st.session_state.conversation_count} traité")
 
-    # Génération de la réponse
-    with st.spinner("🤔 Je réfléchis..."):
-        try:
-            response = st.session_state.chatbot.chat(user_input)
-
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.now().strftime("%H:%M")
-            })
-            
-            user_count = sum(1 for m in st.session_state.messages if m["role"] == "user")
-            logger.info(f"Total messages utilisateur: {user_count}")
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération de réponse: {e}")
-            st.error(f"❌ Erreur: {e}")
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": "Désolé, j'ai rencontré une erreur. Pouvez-vous reformuler votre question ?",
-                "timestamp": datetime.now().strftime("%H:%M")
-            })
+    # Génération de la réponse, affichée fragment par fragment
+    placeholder = st.empty()
+    start = time.perf_counter()
+    first_chunk_ms = None
+    retrieval = None
+    response = ""
+    try:
+        for event in st.session_state.chatbot.chat_stream(user_input):
+            if event["type"] == "retrieval":
+                retrieval = event
+            if event["type"] == "retrieval" and not event["cached"]:
+                placeholder.markdown(render_message(
+                    "assistant", f"🔎 {len(event['documents'])} document(s) pertinent(s) trouvé(s)...", timestamp
+                ), unsafe_allow_html=True)
+            elif event["type"] == "chunk":
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - start) * 1000
+                response += event["text"]
+                placeholder.markdown(render_message("assistant", response + "▌", timestamp),
+                                     unsafe_allow_html=True)
+        total_ms = (time.perf_counter() - start) * 1000
+        placeholder.markdown(render_message("assistant", response, timestamp), unsafe_allow_html=True)
+
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": response,
+            "timestamp": timestamp,
+            "first_chunk_ms": first_chunk_ms,
+            "total_ms": total_ms,
+            "retrieval": None if retrieval is None else {
+                "cached": retrieval["cached"],
+                "category": retrieval["category"],
+                "scores": [round(score, 3) for score in retrieval["scores"]],
+            }
+        })
+        logger.info(f"Premier fragment en {first_chunk_ms or 0:.0f} ms, réponse complète en {total_ms:.0f} ms")
+        
+        user_count = sum(1 for m in st.session_state.messages if m["role"] == "user")
+        logger.info(f"Total messages utilisateur: {user_count}")
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération de réponse: {e}")
+        st.error(f"❌ Erreur: {e}")
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": "Désolé, j'ai rencontré une erreur. Pouvez-vous reformuler votre question ?",
+            "timestamp": timestamp
+        })
+
+
+def render_message(role: str, content: str, timestamp: str) -> str:
+    """HTML d'un message de la conversation"""
+    if role == "user":
+        return f"""
+            <div class="chat-message user-message">
+                <b>👤 Vous ({timestamp})</b><br>
+                {content}
+            </div>
+            """
+    return f"""
+            <div class="chat-message bot-message">
+                <b>🤖 Assistant ({timestamp})</b><br>
+                {content}
+            </div>
+            """
 
 
 def display_chat_messages():
@@ -319,20 +417,19 @@ def display_chat_messages():
         content = message["content"]
         timestamp = message.get("timestamp", "")
 
-        if role == "user":
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <b>👤 Vous ({timestamp})</b><br>
-                {content}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="chat-message bot-message">
-                <b>🤖 Assistant ({timestamp})</b><br>
-                {content}
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(render_message(role, content, timestamp), unsafe_allow_html=True)
+
+        if role != "user":
+            if st.session_state.get('debug_mode') and message.get("first_chunk_ms") is not None:
+                st.caption(f"⏱️ Premier fragment: {message['first_chunk_ms']:.0f} ms · "
+                           f"réponse complète: {message['total_ms']:.0f} ms")
+            retrieval = message.get("retrieval")
+            if st.session_state.get('debug_mode') and retrieval is not None:
+                if retrieval["cached"]:
+                    st.caption("🐛 Réponse servie par le cache")
+                else:
+                    st.caption(f"🐛 Catégorie détectée: {retrieval['category']} · "
+                               f"scores: {retrieval['scores']}")
 
             # Système de feedback
             col1, col2, col3 = st.columns([1, 1, 8])
@@ -352,6 +449,7 @@ def display_chat_messages():
 
 def main():
     """Point d'entrée principal de l'application"""
+    load_environment()
     load_css()
     init_session_state()
     display_header()
@@ -361,9 +459,10 @@ def main():
     col1, col2, col3 = st.columns([1, 3, 1])
 
     with col2:
+        pending_query = st.session_state.pop('pending_query', None)
         if st.session_state.messages:
             display_chat_messages()
-        else:
+        elif pending_query is None:
             st.markdown("""
             <div class="info-card" style="text-align: center;">
                 <h2>👋 Bienvenue!</h2>
@@ -382,6 +481,11 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+        # Question en attente (formulaire ou suggestion) : réponse affichée au fil de l'eau
+        if pending_query:
+            process_user_query(pending_query)
+            st.rerun()
+
         st.markdown("---")
 
         # Formulaire de saisie
@@ -389,18 +493,16 @@ def main():
             col1, col2 = st.columns([5, 1])
 
             with col1:
-                user_input = st.text_input(
+                st.text_input(
                     "Votre question:",
+                    key="chat_input",
                     placeholder="Tapez votre question ici...",
                     label_visibility="collapsed"
                 )
 
             with col2:
-                submit = st.form_submit_button("🚀", use_container_width=True, type="primary")
-
-            if submit and user_input:
-                process_user_query(user_input)
-                st.rerun()
+                st.form_submit_button("🚀", use_container_width=True, type="primary",
+                                      on_click=submit_chat_form)
 
     # Indicateurs de statut
     with col3:
@@ -418,6 +520,12 @@ def main():
                     <p>💬 {user_message_count} message{'s' if user_message_count > 1 else ''}</p>
                 </div>
                 """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div class="metric-card">
+                <p>⏳ Chargement du modèle...</p>
+            </div>
+            """, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+Regroupement dynamique (micro-batching) des encodages de requêtes concurrentes
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesce les appels concurrents à un encodeur en un seul appel par lot.
+
+    Un thread unique consomme la file : il prend la première demande, y ajoute toutes
+    celles déjà en attente (arrivées pendant l'encodage précédent), puis attend au plus
+    `max_wait_ms` d'autres demandes tant que le lot n'atteint pas `max_batch_size`.
+    Un utilisateur seul ne paie donc que la fenêtre d'attente, et sous charge les
+    requêtes profitent du débit matriciel du modèle.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], Any], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts: List[str]):
+        """Encode les textes (bloquant) ; l'appel peut être fusionné avec d'autres"""
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _collect(self) -> List[tuple]:
+        """Constitue le prochain lot à partir de la file"""
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            try:
+                # Les demandes déjà en file sont prises sans attendre
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+
+            try:
+                vectors = self._encode_fn(texts)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'encodage groupé: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques de regroupement"""
+        return {
+            "batches": self.batches,
+            "requests": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": self._queue.qsize(),
+        }
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark de la détection de catégorie : boucle de sous-chaînes vs détecteur compilé
+Usage (depuis la racine du projet): python benchmarks/bench_category_matcher.py
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from burkina_chatbot import CATEGORY_KEYWORDS  # noqa: E402
+from text_utils import KeywordMatcher  # noqa: E402
+
+QUERIES = [
+    "Quels sont les sites touristiques incontournables ?",
+    "Où dormir à Ouagadougou ?",
+    "Que peut-on manger au Burkina Faso ?",
+    "Quelle est la meilleure période pour visiter ?",
+    "Comment se déplacer dans le pays ?",
+    "Quelles sont les cascades à voir ?",
+    "Y a-t-il des parcs nationaux ?",
+    "Combien coûte un séjour touristique ?",
+    "Quel est le prix d'entrée au parc d'Arly ?",
+    "Bonjour",
+]
+
+
+def legacy_detect(query: str):
+    """Ancienne implémentation : une recherche de sous-chaîne par mot-clé"""
+    query_lower = query.lower()
+    scores = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in query_lower)
+        if score > 0:
+            scores[category] = score
+    return max(scores, key=scores.get) if scores else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000, help="Nombre de passes sur le jeu de questions")
+    args = parser.parse_args()
+
+    matcher = KeywordMatcher(CATEGORY_KEYWORDS)
+
+    def compiled_detect(query: str):
+        match = matcher.best(query)
+        return match[0] if match else None
+
+    print("=" * 60)
+    print("DÉTECTION DE CATÉGORIE - COÛT PAR QUESTION")
+    print("=" * 60)
+    # Avant : détection appelée deux fois par requête (recherche + mise en forme) ; après : une fois
+    for name, detect, calls_per_request in (("boucle", legacy_detect, 2), ("compilé", compiled_detect, 1)):
+        seconds = timeit.timeit(lambda: [detect(q) for q in QUERIES], number=args.repeat)
+        per_query_us = 1e6 * seconds / (args.repeat * len(QUERIES))
+        print(f"{name:>10} : {per_query_us:.2f} µs/appel, "
+              f"{per_query_us * calls_per_request:.2f} µs/requête ({calls_per_request} appel(s))")
+
+    print("\nCatégories (boucle -> compilé) :")
+    for query in QUERIES:
+        print(f"  {query[:45]:<45} {legacy_detect(query)} -> {compiled_detect(query)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Débit de chat_batch comparé à une boucle sur chat (caches désactivés)
+Usage (depuis la racine du projet): python benchmarks/bench_chat_batch.py --queries 64
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402
+
+QUESTIONS = [
+    "Quels sont les sites touristiques incontournables ?",
+    "Où dormir à Ouagadougou ?",
+    "Que peut-on manger au Burkina Faso ?",
+    "Quelle est la meilleure période pour visiter ?",
+    "Comment se déplacer dans le pays ?",
+    "Quelles sont les cascades à voir ?",
+    "Y a-t-il des parcs nationaux ?",
+    "Combien coûte un séjour touristique ?",
+    "Quel est le prix d'entrée au parc d'Arly ?",
+    "Où manger à Bobo-Dioulasso ?",
+    "Quels hôtels à Banfora ?",
+    "Que faire à Ouagadougou ?",
+]
+
+
+def make_queries(count: int):
+    """Questions toutes distinctes pour que les caches ne faussent pas la mesure"""
+    return [f"{QUESTIONS[i % len(QUESTIONS)]} ({i})" for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=64, help="Nombre de questions par mesure")
+    args = parser.parse_args()
+
+    # Caches désactivés : on mesure le coût réel de l'encodage et des requêtes Chroma
+    Config.QUERY_EMBEDDING_CACHE_SIZE = 0
+    Config.RESPONSE_CACHE_SIZE = 0
+    Config.RESPONSE_CACHE_PATH = None
+
+    from burkina_chatbot import BurkinaChatbot
+    chatbot = BurkinaChatbot()
+    queries = make_queries(args.queries)
+
+    # Préchauffage du modèle et de l'index
+    chatbot.chat_batch(queries[:4])
+
+    start = time.perf_counter()
+    sequential = [chatbot.chat(q) for q in queries]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = chatbot.chat_batch(queries)
+    batch_s = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"CHAT EN LOT vs BOUCLE ({len(queries)} questions)")
+    print("=" * 60)
+    print(f"Boucle chat()  : {loop_s:.3f} s ({len(queries) / loop_s:.1f} questions/s)")
+    print(f"chat_batch()   : {batch_s:.3f} s ({len(queries) / batch_s:.1f} questions/s)")
+    print(f"Accélération   : x{loop_s / batch_s:.2f}")
+    print(f"Réponses identiques : {sequential == batched}")
+
+
+if __name__ == "__main__":
+    main()
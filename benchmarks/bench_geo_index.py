@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Coût des questions de proximité selon le nombre de fiches localisées : index géographique
+(grille) contre calcul de toutes les distances, sur des fiches synthétiques réparties sur le
+territoire du Burkina Faso ; construction de l'index, recherche par rayon et k plus proches
+voisins, avec vérification que les deux méthodes donnent les mêmes résultats.
+Usage (depuis la racine du projet): python benchmarks/bench_geo_index.py --sizes 100 1000 10000 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402
+from geo_index import GeoIndex, haversine_km  # noqa: E402
+
+# Emprise approximative du pays (latitude, longitude)
+BOUNDS = ((9.4, 15.1), (-5.5, 2.4))
+
+
+def synthetic_sites(count: int, rng: np.random.Generator):
+    """Fiches de sites aux coordonnées tirées uniformément sur l'emprise du pays"""
+    lats = rng.uniform(*BOUNDS[0], size=count)
+    lons = rng.uniform(*BOUNDS[1], size=count)
+    ids = [f"site_{i}" for i in range(count)]
+    metadatas = [
+        {"type": "site_touristique", "nom": f"Site {i}",
+         "coordonnees": f"{lat:.4f}°N, {abs(lon):.4f}°{'W' if lon < 0 else 'E'}"}
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    ]
+    return ids, [""] * count, metadatas
+
+
+def time_per_query(func, points) -> float:
+    """Durée moyenne d'un appel (µs)"""
+    start = time.perf_counter()
+    for lat, lon in points:
+        func(lat, lon)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200, help="Points de référence par taille")
+    parser.add_argument("--radius", type=float, default=Config.GEO_RADIUS_KM, help="Rayon (km)")
+    parser.add_argument("--k", type=int, default=Config.TOP_K_RESULTS, help="Nombre de plus proches voisins")
+    parser.add_argument("--cell-deg", type=float, default=Config.GEO_GRID_CELL_DEG)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    points = list(zip(rng.uniform(*BOUNDS[0], size=args.queries), rng.uniform(*BOUNDS[1], size=args.queries)))
+
+    print("=" * 92)
+    print(f"INDEX GÉOGRAPHIQUE : rayon {args.radius:.0f} km, k={args.k}, cellules de {args.cell_deg}°, "
+          f"{args.queries} requêtes par taille (µs par requête)")
+    print("=" * 92)
+    print(f"{'fiches':>8} | {'construction':>12} | {'rayon grille':>12} | {'rayon brut':>10} | "
+          f"{'kNN grille':>10} | {'kNN brut':>8} | {'identiques':>10}")
+    for size in args.sizes:
+        ids, documents, metadatas = synthetic_sites(size, rng)
+        start = time.perf_counter()
+        index = GeoIndex(ids, documents, metadatas, cell_deg=args.cell_deg)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def brute_within(lat, lon):
+            distances = haversine_km(lat, lon, index.lats, index.lons)
+            rows = np.flatnonzero(distances <= args.radius)
+            return rows[np.argsort(distances[rows], kind="stable")]
+
+        def brute_nearest(lat, lon):
+            distances = haversine_km(lat, lon, index.lats, index.lons)
+            return np.argsort(distances, kind="stable")[:args.k]
+
+        grid_within = time_per_query(lambda lat, lon: index.within(lat, lon, args.radius), points)
+        full_within = time_per_query(brute_within, points)
+        grid_nearest = time_per_query(lambda lat, lon: index.nearest(lat, lon, args.k), points)
+        full_nearest = time_per_query(brute_nearest, points)
+
+        # Mêmes fiches retrouvées (à égalité de distance, l'ordre peut différer)
+        same = all(
+            {row for row, _ in index.within(lat, lon, args.radius)} == set(brute_within(lat, lon).tolist())
+            and np.allclose([d for _, d in index.nearest(lat, lon, args.k)],
+                            np.sort(haversine_km(lat, lon, index.lats, index.lons))[:args.k])
+            for lat, lon in points
+        )
+        print(f"{size:>8} | {build_ms:>9.1f} ms | {grid_within:>12.1f} | {full_within:>10.1f} | "
+              f"{grid_nearest:>10.1f} | {full_nearest:>8.1f} | {'oui' if same else 'NON':>10}")
+
+
+if __name__ == "__main__":
+    main()
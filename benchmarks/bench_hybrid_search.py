@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Recherche dense seule vs hybride (BM25 + dense, fusion par rang réciproque) vs hybride avec
+réponse lexicale directe, puis avec le dictionnaire des entités : recall@k, MRR et latence sur
+le jeu de questions étiquetées
+Le cache des embeddings de requêtes est désactivé : chaque recherche dense paie l'encodage.
+Usage (depuis la racine du projet): python benchmarks/bench_hybrid_search.py --backend numpy
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_retrieval_quality import DEFAULT_EVAL, evaluate  # noqa: E402
+from config import Config  # noqa: E402
+
+MODES = {
+    "dense": {"HYBRID_SEARCH": False, "ENTITY_FAST_PATH": False},
+    "hybride": {"HYBRID_SEARCH": True, "LEXICAL_FAST_PATH": False, "ENTITY_FAST_PATH": False},
+    "hybride + lexical seul": {"HYBRID_SEARCH": True, "LEXICAL_FAST_PATH": True, "ENTITY_FAST_PATH": False},
+    "+ entités": {"HYBRID_SEARCH": True, "LEXICAL_FAST_PATH": True, "ENTITY_FAST_PATH": True},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval", type=Path, default=DEFAULT_EVAL, help="Jeu de questions étiquetées")
+    parser.add_argument("--backend", default=Config.VECTOR_BACKEND, choices=["chroma", "numpy"])
+    parser.add_argument("--top-k", type=int, default=Config.TOP_K_RESULTS)
+    parser.add_argument("--repeats", type=int, default=3, help="Mesures par question (médiane)")
+    args = parser.parse_args()
+
+    with open(args.eval, 'r', encoding='utf-8') as f:
+        queries = json.load(f)["queries"]
+
+    Config.VECTOR_BACKEND = args.backend
+    # Index lexical et dictionnaire des entités construits au démarrage, activés ou non par mode
+    Config.HYBRID_SEARCH = True
+    Config.ENTITY_FAST_PATH = True
+    Config.QUERY_EMBEDDING_CACHE_SIZE = 0
+    Config.RESPONSE_CACHE_PATH = None
+    Config.METRICS_ENABLED = True
+
+    from burkina_chatbot import BurkinaChatbot
+    chatbot = BurkinaChatbot()
+    chatbot.search_batch([q["text"] for q in queries[:4]])  # Préchauffage du modèle
+
+    print("=" * 84)
+    print(f"RECHERCHE DENSE vs HYBRIDE ({args.backend}, {len(queries)} questions, k={args.top_k})")
+    print("=" * 84)
+    print(f"{'mode':>24} | {'recall@k':>8} | {'MRR':>6} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'sans encodeur':>13}")
+    for mode, settings in MODES.items():
+        for key, value in settings.items():
+            setattr(chatbot.config, key, value)
+        chatbot.metrics.reset()
+        result = evaluate(chatbot, queries, args.top_k, args.repeats)
+        counters = chatbot.metrics.snapshot()["counters"]
+        fast_path = counters.get("lexical_fast_path", 0) + counters.get("entity_fast_path", 0)
+        share = fast_path / (len(queries) * args.repeats)
+        print(f"{mode:>24} | {result['recall_at_k']:>8.3f} | {result['mrr']:>6.3f} | "
+              f"{result['p50_ms']:>8.2f} | {result['p95_ms']:>8.2f} | {share:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Latence (p50/p99) et débit de la recherche sous concurrence, avec et sans micro-batching
+Usage (depuis la racine du projet): python benchmarks/bench_micro_batching.py --concurrency 1 4 16
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402
+
+QUESTIONS = [
+    "Quels sont les sites touristiques incontournables ?",
+    "Où dormir à Ouagadougou ?",
+    "Que peut-on manger au Burkina Faso ?",
+    "Quelle est la meilleure période pour visiter ?",
+    "Comment se déplacer dans le pays ?",
+    "Quelles sont les cascades à voir ?",
+    "Y a-t-il des parcs nationaux ?",
+    "Combien coûte un séjour touristique ?",
+]
+
+
+def percentile(values, p):
+    """Percentile par rang le plus proche"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run_load(chatbot, concurrency: int, requests_per_client: int) -> dict:
+    """Chaque client enchaîne des recherches sur des questions distinctes"""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_id: int):
+        for i in range(requests_per_client):
+            query = f"{QUESTIONS[(client_id + i) % len(QUESTIONS)]} [{client_id}-{i}]"
+            start = time.perf_counter()
+            chatbot.search_similar_documents(query)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    return {
+        "p50_ms": 1000 * statistics.median(latencies),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "qps": len(latencies) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=20, help="Requêtes par client")
+    args = parser.parse_args()
+
+    # Questions toutes distinctes : le cache d'embeddings est désactivé pour mesurer le modèle
+    Config.QUERY_EMBEDDING_CACHE_SIZE = 0
+    Config.EMBEDDING_BATCHING = True
+
+    from burkina_chatbot import BurkinaChatbot
+    chatbot = BurkinaChatbot()
+    batcher = chatbot.query_batcher
+    chatbot.search_similar_documents("préchauffage")
+
+    print("=" * 72)
+    print("MICRO-BATCHING DES EMBEDDINGS DE REQUÊTES")
+    print(f"(fenêtre {Config.EMBEDDING_BATCH_WINDOW_MS} ms, lot max {Config.EMBEDDING_BATCH_MAX_SIZE})")
+    print("=" * 72)
+    print(f"{'clients':>8} | {'mode':>10} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'req/s':>8}")
+
+    for concurrency in args.concurrency:
+        for mode in ("sans", "avec"):
+            chatbot.query_batcher = batcher if mode == "avec" else None
+            r = run_load(chatbot, concurrency, args.requests)
+            print(f"{concurrency:>8} | {mode:>10} | {r['p50_ms']:>9.2f} | {r['p99_ms']:>9.2f} | {r['qps']:>8.1f}")
+
+    print(f"\nLots formés : {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
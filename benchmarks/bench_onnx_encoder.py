@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Latence d'encodage des requêtes : PyTorch vs ONNX Runtime (fp32 et int8), avec contrôle de l'écart
+Usage (depuis la racine du projet): python benchmarks/bench_onnx_encoder.py --threads 1 2 4
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402
+from encoders import VERIFICATION_TEXTS, OnnxEncoder, max_deviation  # noqa: E402
+
+QUESTIONS = [
+    "Quels sont les sites touristiques incontournables ?",
+    "Où dormir à Ouagadougou ?",
+    "Que peut-on manger au Burkina Faso ?",
+    "Quelle est la meilleure période pour visiter ?",
+    "Comment se déplacer dans le pays ?",
+    "Quelles sont les cascades à voir ?",
+    "Y a-t-il des parcs nationaux ?",
+    "Combien coûte un séjour touristique ?",
+]
+
+
+def measure(encoder, repeats: int):
+    """Latence médiane d'une requête seule (ms) et débit d'un lot (questions/s)"""
+    encoder.encode(QUESTIONS[:2])  # Préchauffage
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        encoder.encode([QUESTIONS[i % len(QUESTIONS)]])
+        latencies.append(time.perf_counter() - start)
+
+    batch = QUESTIONS * 8
+    start = time.perf_counter()
+    encoder.encode(batch)
+    throughput = len(batch) / (time.perf_counter() - start)
+    return 1000 * statistics.median(latencies), throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[Config.ONNX_INTRA_OP_THREADS],
+                        help="Valeurs de intra_op_num_threads à comparer (0 = nombre de cœurs)")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    reference = SentenceTransformer(Config.EMBEDDING_MODEL, device="cpu")
+    expected = reference.encode(VERIFICATION_TEXTS + QUESTIONS)
+
+    print("=" * 72)
+    print(f"ENCODAGE DES REQUÊTES : {Config.EMBEDDING_MODEL}")
+    print("=" * 72)
+    print(f"{'backend':>16} | {'threads':>7} | {'requête (ms)':>12} | {'lot (q/s)':>9} | {'écart max':>9}")
+
+    latency, throughput = measure(reference, args.repeats)
+    print(f"{'pytorch':>16} | {'-':>7} | {latency:>12.2f} | {throughput:>9.1f} | {0.0:>9.5f}")
+
+    for quantize in (False, True):
+        for threads in args.threads:
+            encoder = OnnxEncoder(
+                Config.EMBEDDING_MODEL, cache_dir=Config.ONNX_CACHE_DIR, quantize=quantize,
+                intra_op_threads=threads, inter_op_threads=Config.ONNX_INTER_OP_THREADS,
+                tolerance=Config.ONNX_TOLERANCE
+            )
+            deviation = max_deviation(expected, encoder.encode(VERIFICATION_TEXTS + QUESTIONS))
+            latency, throughput = measure(encoder, args.repeats)
+            label = "onnx int8" if quantize else "onnx fp32"
+            status = "" if deviation <= Config.ONNX_TOLERANCE else "  (hors tolérance)"
+            print(f"{label:>16} | {threads:>7} | {latency:>12.2f} | {throughput:>9.1f} | "
+                  f"{deviation:>9.5f}{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Stockage compact des embeddings (float16 / int8) : mémoire économisée et rappel@k
+Usage (depuis la racine du projet): python benchmarks/bench_quantized_storage.py --synthetic 100000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config  # noqa: E402
+from vector_index import NumpyCollection  # noqa: E402
+
+QUESTIONS = [
+    "Quels sont les sites touristiques incontournables ?",
+    "Où dormir à Ouagadougou ?",
+    "Que peut-on manger au Burkina Faso ?",
+    "Quelle est la meilleure période pour visiter ?",
+    "Comment se déplacer dans le pays ?",
+    "Quelles sont les cascades à voir ?",
+    "Y a-t-il des parcs nationaux ?",
+    "Combien coûte un séjour touristique ?",
+    "Quel est le prix d'entrée au parc d'Arly ?",
+    "Où manger à Bobo-Dioulasso ?",
+    "Quels hôtels à Banfora ?",
+    "Que faire à Ouagadougou ?",
+]
+
+
+def build(storage: str, vectors: np.ndarray, rescore_candidates: int = 0):
+    """Collection remplie dans le mode de stockage donné, avec re-classement optionnel"""
+    documents = [str(i) for i in range(len(vectors))]
+    rescore_fn = None
+    if rescore_candidates:
+        rescore_fn = lambda texts: [vectors[int(t)] for t in texts]  # noqa: E731
+    collection = NumpyCollection("bench", storage=storage, rescore_fn=rescore_fn,
+                                 rescore_candidates=rescore_candidates)
+    collection.add(ids=[f"doc_{i}" for i in range(len(vectors))], embeddings=vectors,
+                   documents=documents, metadatas=[{"category": "general"}] * len(vectors))
+    return collection
+
+
+def top_k(collection, queries: np.ndarray, k: int):
+    """Identifiants retournés et latence médiane par requête"""
+    returned, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        returned.append(collection.query(query_embeddings=[query], n_results=k)["ids"][0])
+        latencies.append(time.perf_counter() - start)
+    return returned, 1000 * statistics.median(latencies)
+
+
+def recall(reference, candidate) -> float:
+    hits = sum(len(set(r) & set(c)) for r, c in zip(reference, candidate))
+    return hits / max(1, sum(len(r) for r in reference))
+
+
+def report(title: str, vectors: np.ndarray, queries: np.ndarray, k: int, rescore: int):
+    print(f"\n{title} : {len(vectors)} vecteurs de dimension {vectors.shape[1]}, {len(queries)} requêtes, k={k}")
+    print(f"{'mode':>20} | {'mémoire (Ko)':>12} | {'gain':>6} | {'rappel@k':>8} | {'requête (ms)':>12}")
+
+    reference = build("float32", vectors)
+    exact, _ = top_k(reference, queries, k)
+    baseline = reference.memory_bytes()
+
+    for storage in ("float32", "float16", "int8"):
+        for candidates in ((0, rescore) if storage != "float32" else (0,)):
+            collection = build(storage, vectors, candidates)
+            returned, latency = top_k(collection, queries, k)
+            label = storage + (f" + rescore {candidates}" if candidates else "")
+            memory = collection.memory_bytes()
+            print(f"{label:>20} | {memory / 1024:>12.1f} | {baseline / memory:>5.1f}x | "
+                  f"{recall(exact, returned):>8.3f} | {latency:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=Config.TOP_K_RESULTS * 4)
+    parser.add_argument("--rescore", type=int, default=Config.EMBEDDING_RESCORE_CANDIDATES)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Taille d'un corpus synthétique supplémentaire (0 = corpus réel uniquement)")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("STOCKAGE COMPACT DES EMBEDDINGS")
+    print("=" * 72)
+
+    # Corpus réel et questions de test, encodés par le modèle configuré
+    from burkina_chatbot import BurkinaChatbot
+    Config.VECTOR_BACKEND = "numpy"
+    chatbot = BurkinaChatbot()
+    corpus = chatbot.collection.get(include=["embeddings"])["embeddings"]
+    queries = np.asarray(chatbot.embedding_model.encode(QUESTIONS), dtype=np.float32)
+    report("Corpus réel", np.asarray(corpus, dtype=np.float32), queries, args.top_k, args.rescore)
+
+    if args.synthetic:
+        rng = np.random.default_rng(42)
+        vectors = rng.standard_normal((args.synthetic, corpus.shape[1])).astype(np.float32)
+        synthetic_queries = vectors[rng.choice(len(vectors), 50)] + 0.5 * rng.standard_normal(
+            (50, corpus.shape[1])).astype(np.float32)
+        report("Corpus synthétique", vectors, synthetic_queries, args.top_k, args.rescore)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Qualité et coût de la recherche sur un jeu de questions étiquetées, par balayage des paramètres
+Pour chaque combinaison (seuil, top-k, multiplicateur, seuil inter-catégories, backend) :
+recall@k, MRR et latence de search_similar_documents ; recommande la configuration la moins
+coûteuse qui atteint le niveau de qualité demandé.
+Usage (depuis la racine du projet): python benchmarks/bench_retrieval_quality.py --backends chroma numpy numpy-int8 --min-recall 0.8
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import Config  # noqa: E402
+from text_utils import fold_accents  # noqa: E402
+
+DEFAULT_EVAL = ROOT / "benchmarks" / "eval_v3.json"
+
+
+def is_relevant(document: str, expected: List[str]) -> List[str]:
+    """Noms attendus présents dans le document (comparaison sans accents ni casse)"""
+    folded = fold_accents(document)
+    return [name for name in expected if fold_accents(name) in folded]
+
+
+def evaluate(chatbot, queries: List[Dict], top_k: int, repeats: int) -> Dict:
+    """recall@k, MRR et latences d'une configuration sur le jeu étiqueté"""
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for query in queries:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            documents, _ = chatbot.search_similar_documents(query["text"], n_results=top_k)
+            timings.append(time.perf_counter() - start)
+        latencies.append(float(np.median(timings)))
+
+        found = set()
+        first_rank = None
+        for rank, document in enumerate(documents[:top_k], start=1):
+            names = is_relevant(document, query["expected"])
+            if names and first_rank is None:
+                first_rank = rank
+            found.update(names)
+        recalls.append(len(found) / len(query["expected"]))
+        reciprocal_ranks.append(1.0 / first_rank if first_rank else 0.0)
+
+    values = np.array(latencies) * 1000
+    return {
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "misses": [q["id"] for q, r in zip(queries, recalls) if r == 0.0],
+    }
+
+
+def category_routing(chatbot, queries: List[Dict]) -> float:
+    """Part des questions dont la catégorie détectée n'écarte pas la réponse attendue"""
+    routed = 0
+    for query in queries:
+        detected = chatbot._detect_question_category(query["text"])
+        routed += detected is None or detected == query["category"]
+    return round(routed / len(queries), 4)
+
+
+def route_mismatches(chatbot, queries: List[Dict]) -> List[str]:
+    """Questions dont le chemin rapide diffère du champ `route` attendu, sous la forme "id (obtenu != attendu)" """
+    mismatches = []
+    for query in queries:
+        if "route" not in query:
+            continue
+        category = chatbot._detect_question_category(query["text"])
+        route, _ = chatbot._route_query(query["text"], category)
+        if route != query["route"]:
+            mismatches.append(f"{query['id']} ({route} != {query['route']})")
+    return mismatches
+
+
+def open_backend(spec: str):
+    """Crée un chatbot pour un backend "chroma", "numpy" ou "numpy-<stockage>" (ex: numpy-int8)"""
+    backend, _, storage = spec.partition("-")
+    Config.VECTOR_BACKEND = backend
+    Config.EMBEDDING_STORAGE = storage or "float32"
+    from burkina_chatbot import BurkinaChatbot
+    return BurkinaChatbot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval", type=Path, default=DEFAULT_EVAL, help="Jeu de questions étiquetées")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.2, Config.SIMILARITY_THRESHOLD, 0.4])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[Config.TOP_K_RESULTS, 5])
+    parser.add_argument("--multipliers", type=int, nargs="+", default=[1, 2, Config.SEARCH_MULTIPLIER])
+    parser.add_argument("--cross-category", type=float, nargs="+",
+                        default=[0.35, Config.CROSS_CATEGORY_MIN_SCORE, 1.0],
+                        help="Valeurs de CROSS_CATEGORY_MIN_SCORE (1.0 = jamais hors catégorie)")
+    parser.add_argument("--backends", nargs="+", default=[Config.VECTOR_BACKEND],
+                        help='"chroma", "numpy", "numpy-float16", "numpy-int8"')
+    parser.add_argument("--repeats", type=int, default=3, help="Mesures par question (médiane)")
+    parser.add_argument("--min-recall", type=float, default=0.8, help="recall@k minimal exigé")
+    parser.add_argument("--min-mrr", type=float, default=0.0, help="MRR minimal exigé")
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    with open(args.eval, 'r', encoding='utf-8') as f:
+        eval_set = json.load(f)
+    queries = eval_set["queries"]
+    # Les réponses ne sont pas utilisées : seul le cache des embeddings de requêtes reste actif,
+    # préchauffé pour que toutes les combinaisons paient le même coût d'encodage (nul)
+    Config.RESPONSE_CACHE_PATH = None
+
+    results = []
+    routing = {}
+    route_errors = {}
+    for backend in args.backends:
+        chatbot = open_backend(backend)
+        routing[backend] = category_routing(chatbot, queries)
+        route_errors[backend] = route_mismatches(chatbot, queries)
+        chatbot.search_batch([q["text"] for q in queries])
+
+        grid = itertools.product(args.thresholds, args.top_k, args.multipliers, args.cross_category)
+        for threshold, top_k, multiplier, cross_category in grid:
+            chatbot.config.SIMILARITY_THRESHOLD = threshold
+            chatbot.config.SEARCH_MULTIPLIER = multiplier
+            chatbot.config.CROSS_CATEGORY_MIN_SCORE = cross_category
+            metrics = evaluate(chatbot, queries, top_k, args.repeats)
+            results.append({
+                "backend": backend, "threshold": threshold, "top_k": top_k, "multiplier": multiplier,
+                "cross_category": cross_category, "candidates": top_k * multiplier, **metrics,
+            })
+
+    print("=" * 96)
+    print(f"QUALITÉ DE LA RECHERCHE : jeu {eval_set['version']} ({len(queries)} questions étiquetées)")
+    print("=" * 96)
+    for backend, share in routing.items():
+        print(f"Routage par catégorie ({backend}) : {share:.0%} des questions gardent la réponse attendue")
+        if route_errors[backend]:
+            print(f"Chemins rapides inattendus ({backend}) : {', '.join(route_errors[backend])}")
+    print()
+    print(f"{'backend':>14} | {'seuil':>5} | {'k':>2} | {'mult':>4} | {'hors cat.':>9} | "
+          f"{'recall@k':>8} | {'MRR':>6} | {'p50 (ms)':>8} | {'p95 (ms)':>8}")
+    for r in results:
+        print(f"{r['backend']:>14} | {r['threshold']:>5.2f} | {r['top_k']:>2} | {r['multiplier']:>4} | "
+              f"{r['cross_category']:>9.2f} | {r['recall_at_k']:>8.3f} | {r['mrr']:>6.3f} | "
+              f"{r['p50_ms']:>8.2f} | {r['p95_ms']:>8.2f}")
+
+    # Configuration la moins coûteuse au-dessus du niveau demandé : latence p95, puis candidats demandés
+    eligible = [r for r in results if r["recall_at_k"] >= args.min_recall and r["mrr"] >= args.min_mrr]
+    print()
+    if eligible:
+        best = min(eligible, key=lambda r: (r["p95_ms"], r["candidates"], -r["recall_at_k"]))
+        print(f"Configuration recommandée (recall@k >= {args.min_recall}, MRR >= {args.min_mrr}) :")
+        print(f"    VECTOR_BACKEND = \"{best['backend'].partition('-')[0]}\"")
+        if "-" in best["backend"]:
+            print(f"    EMBEDDING_STORAGE = \"{best['backend'].partition('-')[2]}\"")
+        print(f"    SIMILARITY_THRESHOLD = {best['threshold']}")
+        print(f"    TOP_K_RESULTS = {best['top_k']}")
+        print(f"    SEARCH_MULTIPLIER = {best['multiplier']}")
+        print(f"    CROSS_CATEGORY_MIN_SCORE = {best['cross_category']}")
+        if best["misses"]:
+            print(f"Questions sans réponse attendue : {', '.join(best['misses'])}")
+    else:
+        print(f"Aucune configuration n'atteint recall@k >= {args.min_recall} et MRR >= {args.min_mrr}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"eval_set": eval_set["version"], "routing": routing, "route_errors": route_errors,
+                       "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nRésultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Comparaison mémoire / latence : un chatbot par session vs chatbot partagé
+Usage (depuis la racine du projet): python benchmarks/bench_shared_chatbot.py --sessions 4
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+QUERY = "Où dormir à Ouagadougou ?"
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus courant (Mo)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sur macOS, en kilo-octets sur Linux
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_mode(mode: str, sessions: int) -> dict:
+    """Simule `sessions` sessions dans le processus courant et mesure le coût"""
+    from burkina_chatbot import BurkinaChatbot, get_shared_chatbot
+
+    baseline_rss = peak_rss_mb()
+    init_times = []
+    chatbots = []
+
+    for _ in range(sessions):
+        start = time.perf_counter()
+        if mode == "shared":
+            chatbots.append(get_shared_chatbot())
+        else:
+            chatbots.append(BurkinaChatbot())
+        init_times.append(time.perf_counter() - start)
+
+    query_times = []
+    for chatbot in chatbots:
+        start = time.perf_counter()
+        chatbot.chat(QUERY)
+        query_times.append(time.perf_counter() - start)
+
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "models_loaded": len({id(c.embedding_model) for c in chatbots}),
+        "first_init_s": round(init_times[0], 3),
+        "total_init_s": round(sum(init_times), 3),
+        "mean_query_ms": round(1000 * sum(query_times) / len(query_times), 2),
+        "rss_added_mb": round(peak_rss_mb() - baseline_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=4, help="Nombre de sessions simulées")
+    parser.add_argument("--mode", choices=["per-session", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Mode enfant : une mesure isolée dans son propre processus
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.sessions)))
+        return
+
+    results = []
+    for mode in ("per-session", "shared"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--sessions", str(args.sessions)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    print("=" * 60)
+    print(f"CHATBOT PAR SESSION vs PARTAGÉ ({args.sessions} sessions)")
+    print("=" * 60)
+    for r in results:
+        print(f"\n▶ {r['mode']}")
+        print(f"  Modèles chargés      : {r['models_loaded']}")
+        print(f"  Init 1re session     : {r['first_init_s']} s")
+        print(f"  Init totale          : {r['total_init_s']} s")
+        print(f"  Latence moyenne chat : {r['mean_query_ms']} ms")
+        print(f"  RSS ajoutée          : {r['rss_added_mb']} Mo (pic {r['peak_rss_mb']} Mo)")
+
+
+if __name__ == "__main__":
+    main()
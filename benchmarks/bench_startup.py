@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Temps de démarrage : import des modules, premier affichage de l'interface et première réponse
+Chaque mesure est prise dans un processus neuf (démarrage à froid, caches disque déjà remplis).
+Usage (depuis la racine du projet): python benchmarks/bench_startup.py --repeats 3
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+QUESTION = "Quels sont les sites touristiques incontournables ?"
+
+
+def phase_import() -> dict:
+    """Durée d'import du module du chatbot (sans créer le chatbot)"""
+    start = time.perf_counter()
+    import burkina_chatbot  # noqa: F401
+    return {"import_s": time.perf_counter() - start}
+
+
+def phase_render() -> dict:
+    """Durée du premier rendu complet de app.py (le modèle se charge en arrière-plan)"""
+    from streamlit.testing.v1 import AppTest
+    start = time.perf_counter()
+    app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+    app.run()
+    return {"first_render_s": time.perf_counter() - start}
+
+
+def phase_answer() -> dict:
+    """Délai jusqu'au chatbot prêt puis jusqu'à la première réponse, depuis l'import"""
+    start = time.perf_counter()
+    from burkina_chatbot import warm_up_shared_chatbot
+    chatbot = warm_up_shared_chatbot().result()
+    ready = time.perf_counter() - start
+    chatbot.chat(QUESTION)
+    return {"ready_s": ready, "first_answer_s": time.perf_counter() - start}
+
+
+PHASES = {"import": phase_import, "render": phase_render, "answer": phase_answer}
+
+
+def run_phase(name: str) -> dict:
+    """Exécute une phase dans un processus neuf et retourne ses mesures"""
+    output = subprocess.run(
+        [sys.executable, __file__, "--phase", name], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--phase", choices=PHASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        print(json.dumps(PHASES[args.phase]()))
+        return
+
+    results = {}
+    for name in PHASES:
+        try:
+            for _ in range(args.repeats):
+                for key, value in run_phase(name).items():
+                    results.setdefault(key, []).append(value)
+        except subprocess.CalledProcessError as e:
+            print(f"Phase {name} ignorée: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+
+    print("=" * 60)
+    print(f"TEMPS DE DÉMARRAGE (médiane sur {args.repeats} processus)")
+    print("=" * 60)
+    labels = {
+        "import_s": "Import de burkina_chatbot",
+        "first_render_s": "Premier affichage de app.py",
+        "ready_s": "Chatbot prêt (modèle + index)",
+        "first_answer_s": "Première réponse",
+    }
+    for key, label in labels.items():
+        if key in results:
+            print(f"{label:<32}: {statistics.median(results[key]):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Banc d'essai complet : indexation, recherche, mise en forme et chat sur un jeu de questions versionné
+Mesure les latences à froid (caches vides) et à chaud (p50/p95/p99), le débit, le temps de
+construction de l'index et la mémoire maximale ; les résultats sont écrits en JSON avec le
+commit et la configuration pour comparer deux versions du code.
+Usage (depuis la racine du projet): python benchmarks/bench_suite.py --repeats 3 --compare benchmarks/results/ancien.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import Config  # noqa: E402
+
+DEFAULT_QUERIES = ROOT / "benchmarks" / "queries_v1.json"
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+
+def load_query_set(path: Path) -> Dict:
+    """Jeu de questions versionné : {"version", "queries": [{"id", "text"}]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        query_set = json.load(f)
+    try:
+        query_set["path"] = str(path.resolve().relative_to(ROOT))
+    except ValueError:
+        query_set["path"] = str(path)
+    return query_set
+
+
+def apply_overrides(overrides: List[str]):
+    """Applique des paramètres `CLE=VALEUR` à Config (valeur JSON, sinon chaîne)"""
+    for override in overrides:
+        key, _, raw = override.partition("=")
+        if not hasattr(Config, key):
+            raise SystemExit(f"Paramètre inconnu: {key}")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        setattr(Config, key, value)
+
+
+def config_snapshot() -> Dict:
+    """Paramètres de Config sérialisables, sans les clés d'API"""
+    return {
+        key: value for key, value in vars(Config).items()
+        if key.isupper() and not key.endswith("_KEY")
+        and isinstance(value, (str, int, float, bool, type(None)))
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Commit courant (suffixe "-dirty" si des fichiers suivis sont modifiés)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Mémoire résidente maximale du processus (Mo), None si indisponible (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def summarize(latencies: List[float]) -> Dict:
+    """Percentiles (ms) et débit (questions/s) d'une série de durées en secondes"""
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(latencies),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "throughput_qps": round(len(latencies) / max(sum(latencies), 1e-9), 1),
+    }
+
+
+def time_calls(func: Callable, items: List, passes: int = 1) -> List[float]:
+    """Durée de chaque appel de `func`, sur `passes` passages du jeu"""
+    latencies = []
+    for _ in range(passes):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_index_build(chatbot) -> Dict:
+    """Construit l'index dans une collection temporaire : sans puis avec le cache d'embeddings"""
+    results = {}
+    store = chatbot.embedding_store
+    variants = [("cold_s", None)] + ([("warm_s", store)] if store is not None else [])
+    for key, embedding_store in variants:
+        name = f"{Config.COLLECTION_NAME}_bench_{int(time.time() * 1000)}"
+        collection = chatbot.chroma_client.create_collection(name=name, metadata={"hnsw:space": "cosine"})
+        chatbot.embedding_store = embedding_store
+        try:
+            start = time.perf_counter()
+            report = chatbot.load_data(collection=collection)
+            results[key] = round(time.perf_counter() - start, 3)
+            results["documents"] = collection.count()
+            results["report"] = report
+        finally:
+            chatbot.embedding_store = store
+            chatbot.chroma_client.delete_collection(name=name)
+    return results
+
+
+def run(query_set: Dict, repeats: int) -> Dict:
+    """Exécute toutes les phases et retourne les résultats"""
+    texts = [q["text"] for q in query_set["queries"]]
+    results = {}
+
+    start = time.perf_counter()
+    from burkina_chatbot import BurkinaChatbot
+    chatbot = BurkinaChatbot()
+    results["startup_s"] = round(time.perf_counter() - start, 3)
+    results["rss_after_startup_mb"] = peak_rss_mb()
+
+    results["index_build"] = bench_index_build(chatbot)
+
+    stages = {}
+
+    # Recherche : à froid (cache des embeddings de requêtes vide), puis à chaud
+    chatbot.query_embedding_cache.clear()
+    stages["search_similar_documents"] = {
+        "cold": summarize(time_calls(chatbot.search_similar_documents, texts)),
+        "warm": summarize(time_calls(chatbot.search_similar_documents, texts, repeats)),
+    }
+
+    # Mise en forme seule, à partir des documents retrouvés
+    contexts = [(text, chatbot.search_similar_documents(text)[0]) for text in texts]
+    stages["generate_response"] = {
+        "cold": summarize(time_calls(lambda item: chatbot.generate_response(*item), contexts)),
+        "warm": summarize(time_calls(lambda item: chatbot.generate_response(*item), contexts, repeats)),
+    }
+
+    # Bout en bout : à froid (tous les caches vides), puis à chaud (réponses en cache)
+    chatbot.query_embedding_cache.clear()
+    chatbot.response_cache.invalidate(chatbot.corpus_version)
+    stages["chat"] = {
+        "cold": summarize(time_calls(chatbot.chat, texts)),
+        "warm": summarize(time_calls(chatbot.chat, texts, repeats)),
+    }
+
+    results["stages"] = stages
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def print_report(report: Dict):
+    print("=" * 78)
+    print(f"BANC D'ESSAI  commit {report['commit']}  jeu {report['query_set']['version']} "
+          f"({report['query_set']['count']} questions)")
+    print("=" * 78)
+    build = report["index_build"]
+    print(f"Démarrage du chatbot : {report['startup_s']:.2f} s")
+    print(f"Construction de l'index ({build.get('documents', 0)} documents) : "
+          f"{build.get('cold_s', 0):.2f} s à froid"
+          + (f", {build['warm_s']:.2f} s avec le cache d'embeddings" if "warm_s" in build else ""))
+    if report["peak_rss_mb"] is not None:
+        print(f"Mémoire maximale : {report['peak_rss_mb']:.0f} Mo "
+              f"({report['rss_after_startup_mb']:.0f} Mo après démarrage)")
+    print()
+    print(f"{'étape':<26} | {'mode':<5} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9} | {'q/s':>8}")
+    for stage, modes in report["stages"].items():
+        for mode, s in modes.items():
+            print(f"{stage:<26} | {mode:<5} | {s['p50_ms']:>9.2f} | {s['p95_ms']:>9.2f} | "
+                  f"{s['p99_ms']:>9.2f} | {s['throughput_qps']:>8.1f}")
+
+
+def print_comparison(report: Dict, baseline: Dict):
+    """Écart relatif des percentiles avec un résultat précédent"""
+    print()
+    print(f"COMPARAISON avec {baseline.get('commit')} ({baseline.get('timestamp')})")
+    if baseline["query_set"]["version"] != report["query_set"]["version"]:
+        print("⚠️  Jeux de questions différents : comparaison indicative")
+    print(f"{'étape':<26} | {'mode':<5} | {'p50':>16} | {'p95':>16}")
+    for stage, modes in report["stages"].items():
+        for mode, current in modes.items():
+            previous = baseline.get("stages", {}).get(stage, {}).get(mode)
+            if previous is None:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms"):
+                delta = 100 * (current[key] - previous[key]) / max(previous[key], 1e-9)
+                cells.append(f"{previous[key]:.2f}→{current[key]:.2f} ({delta:+.0f}%)")
+            print(f"{stage:<26} | {mode:<5} | {cells[0]:>16} | {cells[1]:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=Path, default=DEFAULT_QUERIES, help="Jeu de questions versionné")
+    parser.add_argument("--repeats", type=int, default=3, help="Passages à chaud du jeu de questions")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="CLE=VALEUR",
+                        help="Surcharge d'un paramètre de Config (ex: VECTOR_BACKEND=numpy)")
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats (défaut: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="Résultat précédent à comparer")
+    args = parser.parse_args()
+
+    apply_overrides(args.overrides)
+    # Le cache de réponses sur disque fausserait les mesures à froid
+    Config.RESPONSE_CACHE_PATH = None
+    query_set = load_query_set(args.queries)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "query_set": {"version": query_set["version"], "path": query_set["path"],
+                      "count": len(query_set["queries"])},
+        "repeats": args.repeats,
+        "config": config_snapshot(),
+    }
+    report.update(run(query_set, args.repeats))
+    print_report(report)
+
+    output = args.output or RESULTS_DIR / f"bench_{report['commit'] or 'nocommit'}_{int(time.time())}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRésultats écrits dans {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Comparaison des backends vectoriels (ChromaDB vs index NumPy) à différentes tailles de corpus
+Usage (depuis la racine du projet): python benchmarks/bench_vector_backends.py --sizes 100 10000 100000
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vector_index import NumpyCollection  # noqa: E402
+
+CATEGORIES = ["site_touristique", "prix", "activites", "hebergement", "restauration",
+              "transport", "periode", "pratique", "general"]
+DIM = 384  # Dimension de paraphrase-multilingual-MiniLM-L12-v2
+
+
+def make_corpus(size: int, rng: np.random.Generator):
+    """Corpus synthétique : vecteurs aléatoires normalisés et catégories réparties uniformément"""
+    vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"doc_{i}" for i in range(size)]
+    documents = [f"Document {i}" for i in range(size)]
+    metadatas = [{"category": CATEGORIES[i % len(CATEGORIES)]} for i in range(size)]
+    return ids, vectors, documents, metadatas
+
+
+def build(collection, ids, vectors, documents, metadatas, batch_size: int = 5000) -> float:
+    """Remplit une collection par lots et retourne la durée"""
+    start = time.perf_counter()
+    for i in range(0, len(ids), batch_size):
+        collection.add(
+            ids=ids[i:i + batch_size],
+            embeddings=vectors[i:i + batch_size].tolist(),
+            documents=documents[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size]
+        )
+    return time.perf_counter() - start
+
+
+def time_queries(collection, queries: np.ndarray, n_results: int, where=None):
+    """Latence médiane d'une requête top-k et identifiants retournés"""
+    latencies = []
+    returned = []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=n_results, where=where,
+                                  include=["documents", "metadatas", "distances"])
+        latencies.append(time.perf_counter() - start)
+        returned.append(result["ids"][0])
+    return 1000 * statistics.median(latencies), returned
+
+
+def recall(reference, candidate) -> float:
+    """Part des résultats exacts retrouvés par le backend approché"""
+    hits = sum(len(set(r) & set(c)) for r, c in zip(reference, candidate))
+    return hits / max(1, sum(len(r) for r in reference))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=12, help="TOP_K_RESULTS x search_multiplier")
+    args = parser.parse_args()
+
+    import chromadb
+    from chromadb.config import Settings
+
+    rng = np.random.default_rng(42)
+    print("=" * 78)
+    print("BACKENDS VECTORIELS : CHROMADB vs NUMPY")
+    print("=" * 78)
+    print(f"{'docs':>8} | {'backend':>7} | {'construction (s)':>16} | {'top-k (ms)':>10} | "
+          f"{'filtré (ms)':>11} | {'rappel':>6}")
+
+    for size in args.sizes:
+        ids, vectors, documents, metadatas = make_corpus(size, rng)
+        queries = rng.standard_normal((args.queries, DIM)).astype(np.float32)
+        where = {"category": "hebergement"}
+
+        numpy_collection = NumpyCollection("bench")
+        numpy_build = build(numpy_collection, ids, vectors, documents, metadatas)
+        numpy_ms, exact = time_queries(numpy_collection, queries, args.top_k)
+        numpy_filtered_ms, exact_filtered = time_queries(numpy_collection, queries, args.top_k, where)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            client = chromadb.PersistentClient(path=tmp, settings=Settings(anonymized_telemetry=False))
+            chroma_collection = client.create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+            chroma_build = build(chroma_collection, ids, vectors, documents, metadatas)
+            chroma_ms, approx = time_queries(chroma_collection, queries, args.top_k)
+            chroma_filtered_ms, approx_filtered = time_queries(chroma_collection, queries, args.top_k, where)
+
+        chroma_recall = (recall(exact, approx) + recall(exact_filtered, approx_filtered)) / 2
+        print(f"{size:>8} | {'chroma':>7} | {chroma_build:>16.2f} | {chroma_ms:>10.2f} | "
+              f"{chroma_filtered_ms:>11.2f} | {chroma_recall:>6.3f}")
+        print(f"{size:>8} | {'numpy':>7} | {numpy_build:>16.2f} | {numpy_ms:>10.2f} | "
+              f"{numpy_filtered_ms:>11.2f} | {1.0:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,57 +4,157 @@ Chatbot RAG pour le tourisme au Burkina Faso
 
 import os
 import json
+import hashlib
+import itertools
 import logging
-from typing import List, Dict, Optional, Tuple
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import re
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
-from config import Config
+import numpy as np
+from config import Config, load_environment, print_config
+from batching import EmbeddingBatcher
+from cache import LRUCache, ResponseCache, normalize_query
+from embedding_store import EmbeddingStore
+from entity_index import EntityIndex
+from encoders import create_encoder, encoder_id
+from generation import GenerationOverloaded, LocalGenerator
+from geo_index import GeoIndex
+from itinerary import TravelPlanner, format_hours
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from metrics import Metrics
+from structured_index import MONTH_NAMES, StructuredIndex, format_fcfa
+from text_utils import KeywordMatcher, fold_accents
+from vector_index import create_vector_client, query_with_fallback
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Mots-clés pour identifier les catégories de questions
+CATEGORY_KEYWORDS = {
+    "hebergement": ["dormir", "hôtel", "hébergement", "loger", "chambre", "auberge", "lodge", "campement"],
+    "restauration": ["manger", "restaurant", "nourriture", "plat", "cuisine", "gastronomie", "spécialité", "repas"],
+    "transport": ["déplacer", "transport", "taxi", "bus", "voiture", "location", "trajet", "aller", "voyage"],
+    "prix": ["prix", "coût", "coûte", "tarif", "budget", "dépense", "combien"],
+    "periode": ["période", "quand", "saison", "moment", "meilleur", "climat", "météo", "temps"],
+    "activites": ["faire", "activité", "visite", "visiter", "découvrir", "excursion", "voir"],
+    "site_touristique": ["site", "lieu", "endroit", "cascade", "parc", "monument", "ruine", "musée", "mosquée"]
+}
+
+# Catégories dont les questions ne demandent pas de circuit, même avec une durée de séjour
+# ("je veux visiter Banfora pendant 3 jours, où dormir ?")
+NON_PLAN_CATEGORIES = ("hebergement", "restauration")
+
+# Durée d'un séjour dans une question de budget ("quel budget pour un séjour de 10 jours ?")
+_STAY_DAYS = re.compile(r"(\d+)\s*jours?\b")
+
+# Questions récentes dont le chemin rapide (et ses données) est mémorisé entre la recherche
+# et la mise en forme de la réponse
+ROUTE_CACHE_SIZE = 256
+
+# Compteur de métriques de chaque chemin rapide
+ROUTE_METRICS = {
+    "itinerary": "itinerary_plan",
+    "geo": "geo_search",
+    "structured": "structured_filter",
+    "entity": "entity_fast_path",
+}
+
+# Chemins rapides dont la réponse est calculée (plan, distances, critères) et non tirée du
+# texte des documents : elle est mise en forme sans passer par le modèle local
+COMPUTED_ROUTES = ("itinerary", "geo", "structured")
+
+# Valeur par défaut signifiant "catégorie à détecter" (None signifie "aucune catégorie")
+_DETECT = object()
+
 
 class BurkinaChatbot:
     def __init__(self):
         """Initialisation du chatbot"""
         self.config = Config()
+        self.metrics = Metrics(enabled=self.config.METRICS_ENABLED, json_logs=self.config.METRICS_JSON_LOGS)
         
-        logger.info("Chargement du modèle d'embeddings...")
-        self.embedding_model = SentenceTransformer(self.config.EMBEDDING_MODEL)
+        # Verrou court protégeant la référence à la collection active (bascule, version du corpus)
+        self._lock = threading.RLock()
+        # Synchronisations des données sérialisées entre elles, sans bloquer les lectures
+        self._sync_lock = threading.Lock()
         
-        logger.info("Initialisation de la base vectorielle...")
-        self.chroma_client = chromadb.PersistentClient(
-            path=self.config.CHROMA_DB_PATH,
-            settings=Settings(anonymized_telemetry=False)
+        logger.info("Chargement du modèle d'embeddings...")
+        self.embedding_model = create_encoder(self.config)
+        # Les vecteurs ONNX (quantifiés) ne sont pas mélangés à ceux de PyTorch dans les caches
+        self.encoder_id = encoder_id(self.embedding_model, self.config.EMBEDDING_MODEL)
+        self.embedding_store = None
+        if self.config.EMBEDDING_CACHE_DIR:
+            self.embedding_store = EmbeddingStore(self.config.EMBEDDING_CACHE_DIR, self.encoder_id)
+        self.query_batcher = None
+        if self.config.EMBEDDING_BATCHING:
+            self.query_batcher = EmbeddingBatcher(
+                lambda texts: self.embedding_model.encode(texts).tolist(),
+                max_batch_size=self.config.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=self.config.EMBEDDING_BATCH_WINDOW_MS
+            )
+        self.query_embedding_cache = LRUCache(
+            max_size=self.config.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl=self.config.QUERY_EMBEDDING_CACHE_TTL
+        )
+        self.response_cache = ResponseCache(
+            max_size=self.config.RESPONSE_CACHE_SIZE,
+            ttl=self.config.RESPONSE_CACHE_TTL,
+            path=self.config.RESPONSE_CACHE_PATH
         )
+        self.corpus_version = ""
+        # Index auxiliaires reconstruits à chaque changement du corpus indexé
+        self.lexical_index: Optional[LexicalIndex] = None
+        self.entity_index: Optional[EntityIndex] = None
+        self.structured_index: Optional[StructuredIndex] = None
+        self.geo_index: Optional[GeoIndex] = None
+        self.travel_planner: Optional[TravelPlanner] = None
+        # Répartition des questions entre les chemins de recherche
+        # (trajet/circuit, proximité, critères, entité, lexical, dense)
+        self.search_routes = {"itinerary": 0, "geo": 0, "structured": 0, "entity": 0, "lexical": 0, "dense": 0}
+        self._routes_lock = threading.Lock()
+        # Chemin rapide choisi pour chaque question, réutilisé par la mise en forme de la réponse
+        self._route_cache = LRUCache(max_size=ROUTE_CACHE_SIZE)
         
-        try:
-            self.collection = self.chroma_client.get_collection(
-                name=self.config.COLLECTION_NAME
-            )
-            logger.info(f"Collection existante récupérée: {self.collection.count()} documents")
-        except:
-            logger.info("Création d'une nouvelle collection...")
-            self.collection = self.chroma_client.create_collection(
-                name=self.config.COLLECTION_NAME,
-                metadata={"hnsw:space": "cosine"}
+        # Génération RAG par un modèle local, chargé au préchargement ou à la première réponse
+        self.generator = None
+        if self.config.USE_LOCAL_MODEL:
+            self.generator = LocalGenerator(
+                self.config.LOCAL_MODEL_NAME,
+                workers=self.config.LOCAL_MODEL_WORKERS,
+                max_pending=self.config.LOCAL_MODEL_MAX_PENDING,
+                queue_timeout=self.config.LOCAL_MODEL_QUEUE_TIMEOUT,
+                max_new_tokens=self.config.LOCAL_MODEL_MAX_NEW_TOKENS,
+                temperature=self.config.TEMPERATURE,
+                max_context_chars=self.config.LOCAL_MODEL_CONTEXT_CHARS,
+                threads=self.config.LOCAL_MODEL_THREADS
             )
         
+        logger.info("Initialisation de la base vectorielle...")
+        self.chroma_client = create_vector_client(self.config, self.embedding_store)
+        
+        # Pointeur vers la collection active (bascule blue/green lors des réindexations),
+        # persisté sur disque uniquement pour le backend Chroma
+        self._pointer_path = None
+        self._active_name = self.config.COLLECTION_NAME
+        if self.config.VECTOR_BACKEND == "chroma":
+            self._pointer_path = os.path.join(self.config.CHROMA_DB_PATH, "active_collection.json")
+        self._pointer_mtime = self._get_pointer_mtime()
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self.last_reindex_report: Optional[Dict[str, int]] = None
+        self.last_reindex_error: Optional[str] = None
+        self.collection = self._open_active_collection()
+        
         if self.collection.count() == 0:
             self.load_data()
+        else:
+            self._refresh_corpus_version()
         
-        # Mots-clés pour identifier les catégories de questions
-        self.category_keywords = {
-            "hebergement": ["dormir", "hôtel", "hébergement", "loger", "chambre", "auberge", "lodge", "campement"],
-            "restauration": ["manger", "restaurant", "nourriture", "plat", "cuisine", "gastronomie", "spécialité", "repas"],
-            "transport": ["déplacer", "transport", "taxi", "bus", "voiture", "location", "trajet", "aller", "voyage"],
-            "prix": ["prix", "coût", "coûte", "tarif", "budget", "dépense", "combien"],
-            "periode": ["période", "quand", "saison", "moment", "meilleur", "climat", "météo", "temps"],
-            "activites": ["faire", "activité", "visite", "visiter", "découvrir", "excursion", "voir"],
-            "site_touristique": ["site", "lieu", "endroit", "cascade", "parc", "monument", "ruine", "musée", "mosquée"]
-        }
+        # Mots-clés pour identifier les catégories de questions (détecteur compilé une seule fois)
+        self.category_keywords = CATEGORY_KEYWORDS
+        self.category_matcher = KeywordMatcher(self.category_keywords)
 
     def _is_greeting(self, query: str) -> bool:
         """Détecte si le message est une salutation"""
@@ -79,17 +179,11 @@ class BurkinaChatbot:
 
     def _detect_question_category(self, query: str) -> Optional[str]:
         """Identifie la catégorie de la question"""
-        query_lower = query.lower()
-        category_scores = {}
-        
-        for category, keywords in self.category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in query_lower)
-            if score > 0:
-                category_scores[category] = score
-        
-        if category_scores:
-            best_category = max(category_scores, key=category_scores.get)
-            logger.info(f"Catégorie détectée: {best_category} (score: {category_scores[best_category]})")
+        with self.metrics.span("detect_category"):
+            match = self.category_matcher.best(query)
+        if match:
+            best_category, score = match
+            logger.info(f"Catégorie détectée: {best_category} (score: {score})")
             return best_category
         
         return None
@@ -138,96 +232,288 @@ class BurkinaChatbot:
                 return ville.title()
         return ""
 
-    def load_data(self):
-        """Charge et indexe les données touristiques"""
-        logger.info("Chargement des données touristiques...")
+    def _encode_query(self, query: str) -> List[float]:
+        """Calcule l'embedding d'une question, en réutilisant le cache si possible"""
+        return self._encode_queries([query])[0]
+
+    def _encode_queries(self, queries: List[str]) -> List[List[float]]:
+        """Calcule les embeddings de plusieurs questions en un seul appel au modèle (hors cache)"""
+        keys = [normalize_query(q) for q in queries]
+        embeddings = [self.query_embedding_cache.get(key) for key in keys]
         
+        # Une seule passe du modèle pour toutes les questions absentes du cache (doublons compris)
+        missing = {}
+        for i, (key, embedding) in enumerate(zip(keys, embeddings)):
+            if embedding is None:
+                missing.setdefault(key, []).append(i)
+        
+        self.metrics.incr("embedding_cache_hit", len(queries) - sum(len(v) for v in missing.values()))
+        if missing:
+            self.metrics.incr("embedding_cache_miss", len(missing))
+            texts = [queries[indices[0]] for indices in missing.values()]
+            with self.metrics.span("encode"):
+                if self.query_batcher is not None:
+                    # Fusionné avec les encodages des requêtes concurrentes
+                    encoded = self.query_batcher.encode(texts)
+                else:
+                    encoded = self.embedding_model.encode(texts).tolist()
+            for (key, indices), embedding in zip(missing.items(), encoded):
+                self.query_embedding_cache.put(key, embedding)
+                for i in indices:
+                    embeddings[i] = embedding
+        
+        return embeddings
+
+    def _get_pointer_mtime(self) -> Optional[int]:
+        """Date de modification du pointeur de collection active (None s'il n'existe pas)"""
+        if self._pointer_path is None:
+            return None
+        try:
+            return os.stat(self._pointer_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_active_collection_name(self) -> str:
+        """Nom de la collection active ; la collection historique par défaut"""
+        if self._pointer_path is None:
+            return self._active_name
+        try:
+            with open(self._pointer_path, 'r', encoding='utf-8') as f:
+                return json.load(f)["name"]
+        except (OSError, ValueError, KeyError):
+            return self.config.COLLECTION_NAME
+
+    def _write_active_collection_name(self, name: str):
+        """Met à jour le pointeur de façon atomique (écriture puis renommage)"""
+        self._active_name = name
+        if self._pointer_path is None:
+            return
+        os.makedirs(self.config.CHROMA_DB_PATH, exist_ok=True)
+        tmp_path = f"{self._pointer_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"name": name, "activated_at": time.time()}, f)
+        os.replace(tmp_path, self._pointer_path)
+        self._pointer_mtime = self._get_pointer_mtime()
+
+    def _open_active_collection(self):
+        """Ouvre la collection désignée par le pointeur, en la créant si nécessaire"""
+        name = self._read_active_collection_name()
+        try:
+            collection = self.chroma_client.get_collection(name=name)
+            logger.info(f"Collection existante récupérée: {name} ({collection.count()} documents)")
+            indexed_with = (collection.metadata or {}).get("encoder")
+            if indexed_with and indexed_with != self.encoder_id:
+                logger.warning(f"Collection indexée avec {indexed_with}, encodeur courant {self.encoder_id}: "
+                               "relancez la réindexation")
+        except Exception:
+            logger.info("Création d'une nouvelle collection...")
+            collection = self.chroma_client.create_collection(
+                name=name,
+                metadata={"hnsw:space": "cosine", "encoder": self.encoder_id}
+            )
+        return collection
+
+    def _current_collection(self):
+        """Collection active, rouverte si un autre processus a basculé le pointeur"""
+        mtime = self._get_pointer_mtime()
+        if mtime != self._pointer_mtime:
+            with self._lock:
+                if mtime != self._pointer_mtime:
+                    self._pointer_mtime = mtime
+                    if self._read_active_collection_name() != self.collection.name:
+                        self.collection = self._open_active_collection()
+                        self._refresh_corpus_version()
+        return self.collection
+
+    def _refresh_corpus_version(self):
+        """Recalcule l'empreinte du corpus indexé et invalide les réponses en cache si elle a changé"""
+        contents = self.collection.get(include=["documents", "metadatas"])
+        fingerprint = hashlib.sha256(self.encoder_id.encode("utf-8"))
+        for doc_id, doc in sorted(zip(contents["ids"], contents["documents"])):
+            fingerprint.update(doc_id.encode("utf-8"))
+            fingerprint.update((doc or "").encode("utf-8"))
+        
+        version = fingerprint.hexdigest()[:16]
+        if version != self.corpus_version:
+            self.corpus_version = version
+            self.response_cache.invalidate(version)
+            logger.info(f"Version du corpus: {version}")
+            self._build_side_indexes(contents)
+
+    def _build_side_indexes(self, contents: Dict[str, List]):
+        """Reconstruit les index en mémoire dérivés du contenu de la collection active"""
+        if self.config.HYBRID_SEARCH:
+            start = time.perf_counter()
+            self.lexical_index = LexicalIndex(
+                contents["ids"], contents["documents"], contents["metadatas"],
+                k1=self.config.BM25_K1,
+                b=self.config.BM25_B,
+                fast_path_max_tokens=self.config.LEXICAL_FAST_PATH_MAX_TOKENS,
+                rare_df_ratio=self.config.LEXICAL_RARE_DF_RATIO
+            )
+            logger.info(f"Index lexical: {self.lexical_index.size} documents "
+                        f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        if self.config.ENTITY_FAST_PATH:
+            self.entity_index = EntityIndex(contents["ids"], contents["documents"], contents["metadatas"])
+            entities, variants = self.entity_index.stats()
+            logger.info(f"Dictionnaire des entités: {entities} entités, {variants} variantes de noms")
+        if self.config.STRUCTURED_ANSWERS:
+            self.structured_index = StructuredIndex(contents["ids"], contents["documents"], contents["metadatas"])
+            stats = self.structured_index.stats()
+            logger.info(f"Index structuré: {stats['fiches']} fiches ({stats['prix']} tarifs, "
+                        f"{stats['horaires']} horaires, {stats['periodes']} périodes)")
+        if self.config.GEO_INDEX:
+            self.geo_index = GeoIndex(contents["ids"], contents["documents"], contents["metadatas"],
+                                      cell_deg=self.config.GEO_GRID_CELL_DEG)
+            stats = self.geo_index.stats()
+            logger.info(f"Index géographique: {stats['fiches']} fiches localisées "
+                        f"({stats['exactes']} coordonnées exactes, {stats['cellules']} cellules)")
+        if self.config.ITINERARY_PLANNER:
+            structured = self.structured_index or StructuredIndex(
+                contents["ids"], contents["documents"], contents["metadatas"]
+            )
+            self.travel_planner = TravelPlanner(
+                contents["ids"], contents["documents"], contents["metadatas"], structured,
+                day_hours=self.config.ITINERARY_DAY_HOURS,
+                road_neighbours=self.config.ITINERARY_ROAD_NEIGHBOURS
+            )
+            stats = self.travel_planner.stats()
+            logger.info(f"Graphe des trajets: {stats['villes']} villes, {stats['trajets']} trajets "
+                        f"({stats['liaisons']} liaisons directes), {stats['sites']} sites planifiables")
+
+    def search_route_stats(self) -> Dict[str, Any]:
+        """Nombre de questions servies par chaque chemin de recherche et part des raccourcis"""
+        with self._routes_lock:
+            routes = dict(self.search_routes)
+        total = sum(routes.values())
+        routes["itinerary_share"] = round(routes["itinerary"] / total, 4) if total else 0.0
+        routes["geo_share"] = round(routes["geo"] / total, 4) if total else 0.0
+        routes["structured_share"] = round(routes["structured"] / total, 4) if total else 0.0
+        routes["entity_share"] = round(routes["entity"] / total, 4) if total else 0.0
+        routes["lexical_share"] = round(routes["lexical"] / total, 4) if total else 0.0
+        return routes
+
+    def _embed_documents(self, documents: List[str]):
+        """Encode des documents du corpus en réutilisant le cache disque si disponible"""
+        if self.embedding_store is None:
+            return self.embedding_model.encode(documents, show_progress_bar=True)
+        return self.embedding_store.encode(
+            documents,
+            lambda texts: self.embedding_model.encode(texts, show_progress_bar=True)
+        )
+
+    def _make_doc_id(self, prefix: str, doc_key: str, text: str, metadata: Dict) -> str:
+        """Identifiant dérivé du contenu : il change si et seulement si le document change"""
+        payload = json.dumps([doc_key, text, metadata], ensure_ascii=False, sort_keys=True)
+        return f"{prefix}_{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]}"
+
+    @staticmethod
+    def _structured_fields(item: Dict, prix: str) -> Dict[str, str]:
+        """Champs d'une fiche repris tels quels dans les métadonnées pour les index structuré et géographique"""
+        fields = {
+            "prix": item.get(prix),
+            "horaires": item.get("horaires"),
+            "meilleure_periode": item.get("meilleure_periode"),
+            "duree_visite": item.get("duree_visite"),
+            "coordonnees": item.get("coordonnees"),
+        }
+        # Les métadonnées n'acceptent que des valeurs scalaires non nulles
+        return {key: value for key, value in fields.items() if isinstance(value, str) and value}
+
+    def _build_documents(self) -> Tuple[List[str], List[Dict], List[str]]:
+        """Construit les documents à indexer (textes, métadonnées, identifiants) depuis les fichiers de données"""
         documents = []
         metadatas = []
         ids = []
+        seen_keys = {}
+        
+        def add_document(prefix: str, doc_key: str, text: str, metadata: Dict):
+            # La clé logique identifie l'élément d'une version à l'autre des données
+            seen_keys[doc_key] = seen_keys.get(doc_key, 0) + 1
+            if seen_keys[doc_key] > 1:
+                doc_key = f"{doc_key}#{seen_keys[doc_key]}"
+            metadata["doc_key"] = doc_key
+            documents.append(text)
+            metadatas.append(metadata)
+            ids.append(self._make_doc_id(prefix, doc_key, text, metadata))
         
         if os.path.exists(self.config.DATA_JSON_PATH):
             with open(self.config.DATA_JSON_PATH, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            doc_id = 0
-            
             # Traitement des sites touristiques
             if "sites_touristiques" in data:
                 for site in data["sites_touristiques"]:
-                    doc_text = self._format_site_info(site)
-                    documents.append(doc_text)
-                    metadatas.append({
+                    add_document("site", f"site:{site.get('nom', '')}", self._format_site_info(site), {
                         "type": "site_touristique",
                         "nom": site.get("nom", ""),
                         "ville": site.get("ville", ""),
                         "region": site.get("region", ""),
-                        "category": "site_touristique"
+                        "category": "site_touristique",
+                        **self._structured_fields(site, prix="prix")
                     })
-                    ids.append(f"site_{doc_id}")
-                    doc_id += 1
                     
                     # Indexation des prix
                     if "prix" in site:
                         price_doc = f"Prix pour {site['nom']}: {site['prix']}. Tarifs d'entrée: {site['prix']}"
-                        documents.append(price_doc)
-                        metadatas.append({
+                        add_document("prix", f"prix:{site.get('nom', '')}", price_doc, {
                             "type": "prix",
                             "nom": site.get("nom", ""),
                             "ville": site.get("ville", ""),
                             "category": "prix"
                         })
-                        ids.append(f"prix_{doc_id}")
-                        doc_id += 1
                     
                     # Indexation des activités
                     if "activites" in site and site["activites"]:
                         activities_doc = f"Activités à {site['nom']}: {', '.join(site['activites'])}. Que faire: {', '.join(site['activites'])}"
-                        documents.append(activities_doc)
-                        metadatas.append({
+                        add_document("activites", f"activites:{site.get('nom', '')}", activities_doc, {
                             "type": "activites",
                             "nom": site.get("nom", ""),
                             "ville": site.get("ville", ""),
                             "category": "activites"
                         })
-                        ids.append(f"activites_{doc_id}")
-                        doc_id += 1
             
             # Traitement des hébergements
             if "hebergements" in data:
                 for hotel in data["hebergements"]:
-                    doc_text = self._format_hotel_info(hotel)
-                    documents.append(doc_text)
-                    metadatas.append({
+                    add_document("hotel", f"hotel:{hotel.get('nom', '')}", self._format_hotel_info(hotel), {
                         "type": "hebergement",
                         "nom": hotel.get("nom", ""),
                         "ville": hotel.get("ville", ""),
                         "categorie": hotel.get("categorie", ""),
-                        "category": "hebergement"
+                        "category": "hebergement",
+                        **self._structured_fields(hotel, prix="prix_nuit")
                     })
-                    ids.append(f"hotel_{doc_id}")
-                    doc_id += 1
             
             # Traitement des restaurants
             if "restaurants" in data:
                 for resto in data["restaurants"]:
-                    doc_text = self._format_restaurant_info(resto)
-                    documents.append(doc_text)
-                    metadatas.append({
+                    add_document("resto", f"resto:{resto.get('nom', '')}", self._format_restaurant_info(resto), {
                         "type": "restaurant",
                         "nom": resto.get("nom", ""),
                         "ville": resto.get("ville", ""),
                         "cuisine": resto.get("cuisine", ""),
-                        "category": "restauration"
+                        "category": "restauration",
+                        **self._structured_fields(resto, prix="budget_moyen")
                     })
-                    ids.append(f"resto_{doc_id}")
-                    doc_id += 1
+            
+            # Traitement des moyens de transport (liaisons reprises pour le graphe des trajets)
+            if "transport" in data:
+                for transport in data["transport"]:
+                    metadata = {
+                        "type": "transport",
+                        "mode": transport.get("type", ""),
+                        "category": "transport"
+                    }
+                    if transport.get("principales_liaisons"):
+                        metadata["liaisons"] = transport["principales_liaisons"]
+                    add_document("transport", f"transport:{transport.get('type', '')}",
+                                 self._format_transport_info(transport), metadata)
             
             # Traitement des informations pratiques
             if "infos_pratiques" in data:
                 for info in data["infos_pratiques"]:
                     doc_text = f"{info.get('categorie', '')}: {info.get('titre', '')}.\n{info.get('description', '')}"
-                    documents.append(doc_text)
                     
                     categorie = info.get('categorie', '').lower()
                     if 'transport' in categorie:
@@ -237,13 +523,11 @@ class BurkinaChatbot:
                     else:
                         cat = "pratique"
                     
-                    metadatas.append({
+                    add_document("info", f"info:{info.get('categorie', '')}:{info.get('titre', '')}", doc_text, {
                         "type": "info_pratique",
                         "categorie": info.get("categorie", ""),
                         "category": cat
                     })
-                    ids.append(f"info_{doc_id}")
-                    doc_id += 1
         
         # Chargement du fichier texte supplémentaire
         if os.path.exists(self.config.DATA_TXT_PATH):
@@ -252,34 +536,94 @@ class BurkinaChatbot:
             
             chunks = self._split_text_with_categories(text_content)
             for i, (chunk, category) in enumerate(chunks):
-                documents.append(chunk)
-                metadatas.append({
+                add_document("txt_chunk", f"txt:{i}", chunk, {
                     "type": "text_chunk",
                     "source": "burkina_tourism_data.txt",
                     "chunk_id": i,
                     "category": category
                 })
-                ids.append(f"txt_chunk_{doc_id}")
-                doc_id += 1
         
-        if documents:
-            logger.info(f"Indexation de {len(documents)} documents...")
-            embeddings = self.embedding_model.encode(documents, show_progress_bar=True)
-            embeddings_list = embeddings.tolist()
+        return documents, metadatas, ids
+
+    def load_data(self, collection=None) -> Dict[str, int]:
+        """Synchronise une collection avec les fichiers de données (indexation incrémentale)
+
+        Seuls les documents nouveaux ou modifiés sont encodés et ajoutés, les documents
+        disparus sont supprimés. Par défaut la collection active est synchronisée.
+        Retourne le nombre de documents ajoutés, mis à jour, supprimés et inchangés.
+        """
+        logger.info("Chargement des données touristiques...")
+        documents, metadatas, ids = self._build_documents()
+        
+        # Encodage et écriture hors du verrou de la collection active : les lectures et la
+        # bascule d'une réindexation ne sont pas bloquées pendant la synchronisation
+        with self._sync_lock:
+            with self._lock:
+                target = collection if collection is not None else self.collection
+            existing_keys = self._document_keys(target)
+            
+            wanted_ids = set(ids)
+            new_indices = [i for i, doc_id in enumerate(ids) if doc_id not in existing_keys]
+            removed_ids = [doc_id for doc_id in existing_keys if doc_id not in wanted_ids]
+            report = self._sync_report(existing_keys, {
+                doc_id: metadata["doc_key"] for doc_id, metadata in zip(ids, metadatas)
+            })
             
             batch_size = 100
-            for i in range(0, len(documents), batch_size):
-                end_idx = min(i + batch_size, len(documents))
-                self.collection.add(
-                    embeddings=embeddings_list[i:end_idx],
-                    documents=documents[i:end_idx],
-                    metadatas=metadatas[i:end_idx],
-                    ids=ids[i:end_idx]
-                )
+            if new_indices:
+                logger.info(f"Indexation de {len(new_indices)} documents...")
+                embeddings = self._embed_documents([documents[i] for i in new_indices])
+                # L'index NumPy reçoit directement la matrice ; Chroma attend des listes Python
+                if self.config.VECTOR_BACKEND != "numpy":
+                    embeddings = embeddings.tolist()
             
-            logger.info(f"✓ {len(documents)} documents indexés avec succès!")
-        else:
-            logger.warning("Aucune donnée trouvée à indexer!")
+                for start in range(0, len(new_indices), batch_size):
+                    batch = new_indices[start:start + batch_size]
+                    target.upsert(
+                        embeddings=embeddings[start:start + batch_size],
+                        documents=[documents[i] for i in batch],
+                        metadatas=[metadatas[i] for i in batch],
+                        ids=[ids[i] for i in batch]
+                    )
+            
+            # Suppression après l'ajout : la collection n'est jamais vide pendant la synchronisation
+            for start in range(0, len(removed_ids), batch_size):
+                target.delete(ids=removed_ids[start:start + batch_size])
+            
+            if ids:
+                logger.info(f"✓ Synchronisation terminée: {report}")
+            else:
+                logger.warning("Aucune donnée trouvée à indexer!")
+            
+            with self._lock:
+                if target is self.collection:
+                    self._refresh_corpus_version()
+        
+        return report
+
+    @staticmethod
+    def _document_keys(collection) -> Dict[str, Optional[str]]:
+        """Identifiants des documents d'une collection et leur clé logique"""
+        existing = collection.get(include=["metadatas"])
+        return {
+            doc_id: (meta or {}).get("doc_key")
+            for doc_id, meta in zip(existing["ids"], existing["metadatas"])
+        }
+
+    @staticmethod
+    def _sync_report(existing_keys: Dict[str, Optional[str]], wanted_keys: Dict[str, Optional[str]]) -> Dict[str, int]:
+        """Documents ajoutés, mis à jour, supprimés et inchangés pour passer d'un contenu à l'autre"""
+        new_ids = [doc_id for doc_id in wanted_keys if doc_id not in existing_keys]
+        removed_ids = [doc_id for doc_id in existing_keys if doc_id not in wanted_keys]
+        # Un document est "mis à jour" quand sa clé logique existait sous un autre identifiant
+        removed_keys = {existing_keys[doc_id] for doc_id in removed_ids if existing_keys[doc_id]}
+        updated = sum(1 for doc_id in new_ids if wanted_keys[doc_id] in removed_keys)
+        return {
+            "added": len(new_ids) - updated,
+            "updated": updated,
+            "removed": len(removed_ids) - updated,
+            "unchanged": len(wanted_keys) - len(new_ids)
+        }
 
     def _split_text_with_categories(self, text: str) -> List[Tuple[str, str]]:
         """Découpe le texte en segments avec détection de catégorie"""
@@ -353,6 +697,28 @@ class BurkinaChatbot:
         
         return "\n".join(parts)
 
+    def _format_transport_info(self, transport: Dict) -> str:
+        """Formate les informations d'un moyen de transport"""
+        labels = {
+            "compagnies": "Compagnies",
+            "aeroport_principal": "Aéroport principal",
+            "liaisons_nationales": "Liaisons nationales",
+            "principales_liaisons": "Principales liaisons",
+            "tarifs_ville": "Tarifs en ville",
+            "taxi_brousse": "Taxi-brousse",
+            "location_voiture": "Location de voiture",
+            "conseils": "Conseils"
+        }
+        parts = [f"🚗 Transport : {transport.get('type', '')}"]
+        for key, value in transport.items():
+            if key == "type" or not value:
+                continue
+            if isinstance(value, list):
+                value = ', '.join(value)
+            parts.append(f"• {labels.get(key, key.replace('_', ' ').capitalize())} : {value}")
+        
+        return "\n".join(parts)
+
     def _format_restaurant_info(self, resto: Dict) -> str:
         """Formate les informations d'un restaurant"""
         parts = [
@@ -368,93 +734,392 @@ class BurkinaChatbot:
         
         return "\n".join(parts)
 
-    def search_similar_documents(self, query: str, n_results: int = None) -> Tuple[List[str], List[float]]:
-        """Recherche les documents pertinents avec filtrage par catégorie"""
+    def search_similar_documents(self, query: str, n_results: int = None,
+                                 detected_category=_DETECT) -> Tuple[List[str], List[float]]:
+        """Recherche les documents pertinents avec filtrage par catégorie
+
+        `detected_category` permet de transmettre une catégorie déjà détectée pour la requête.
+        """
+        categories = None if detected_category is _DETECT else [detected_category]
+        with self.metrics.trace("search"):
+            return self.search_batch([query], n_results=n_results, categories=categories)[0]
+
+    def search_batch(self, queries: List[str], n_results: int = None,
+                     categories: Optional[List[Optional[str]]] = None) -> List[Tuple[List[str], List[float]]]:
+        """Recherche les documents pertinents pour plusieurs questions à la fois
+
+        Les questions sont encodées en un seul appel au modèle, puis regroupées par
+        catégorie détectée : une seule requête est émise par groupe, sur le sous-index de
+        la catégorie (backend numpy ; filtre `where` avec Chroma), et le repli sans filtre
+        réutilise les mêmes embeddings. Les résultats sont retournés dans l'ordre des
+        questions.
+        
+        Les chemins rapides sont essayés d'abord (voir `_route_query`) : trajet ou circuit,
+        proximité, critères, entité nommée. Avec la recherche hybride, les résultats denses
+        sont fusionnés avec ceux de l'index lexical ; une question courte contenant un nom
+        propre reconnu est servie par l'index lexical seul, sans passer par l'encodeur.
+        """
         if n_results is None:
             n_results = self.config.TOP_K_RESULTS
+        if not queries:
+            return []
         
         try:
-            detected_category = self._detect_question_category(query)
-            query_embedding = self.embedding_model.encode([query])[0].tolist()
+            if categories is None:
+                categories = [self._detect_question_category(q) for q in queries]
+            
+            # Référence locale : une bascule concurrente ne change pas la collection en cours de requête
+            collection = self._current_collection()
+            
+            raw_results: List[Optional[Dict]] = [None] * len(queries)
+            # Chemins rapides : documents du trajet ou du circuit, des fiches voisines, des fiches
+            # satisfaisant les critères ou de l'entité nommée
+            routes: List[Optional[str]] = [None] * len(queries)
+            for i, (query, category) in enumerate(zip(queries, categories)):
+                route, payload = self._route_query(query, category)
+                if route is not None:
+                    routes[i] = route
+                    raw_results[i] = payload["results"]
+                    self.metrics.incr(ROUTE_METRICS[route])
+            routed = sum(route is not None for route in routes)
+            
+            lexical_hits: List[Optional[List[Tuple[int, float]]]] = [None] * len(queries)
+            lexical_index = self.lexical_index if self.config.HYBRID_SEARCH else None
+            if lexical_index is not None:
+                with self.metrics.span("lexical"):
+                    for i, query in enumerate(queries):
+                        if raw_results[i] is not None:
+                            continue
+                        hits, confident = lexical_index.search(query, self.config.LEXICAL_CANDIDATES)
+                        lexical_hits[i] = hits
+                        if confident and self.config.LEXICAL_FAST_PATH:
+                            raw_results[i] = lexical_index.as_results(lexical_index.covering(query, hits))
+                            self.metrics.incr("lexical_fast_path")
+            dense = [i for i, result in enumerate(raw_results) if result is None]
+            with self._routes_lock:
+                for route in routes:
+                    if route is not None:
+                        self.search_routes[route] += 1
+                self.search_routes["lexical"] += len(queries) - len(dense) - routed
+                self.search_routes["dense"] += len(dense)
+            query_embeddings: Dict[int, List[float]] = {}
+            if dense:
+                query_embeddings = dict(zip(dense, self._encode_queries([queries[i] for i in dense])))
             
             # Augmenter les résultats initiaux pour permettre la déduplication
-            search_multiplier = 4
-            
-            # Recherche avec filtre de catégorie si applicable
-            if detected_category:
-                logger.info(f"Filtrage par catégorie: {detected_category}")
-                results = self.collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=n_results * search_multiplier,
-                    where={"category": detected_category},
-                    include=["documents", "metadatas", "distances"]
-                )
-                
-                if not results['documents'][0]:
-                    logger.info("Aucun résultat avec filtre, recherche sans filtre...")
-                    results = self.collection.query(
-                        query_embeddings=[query_embedding],
-                        n_results=n_results * 2,
-                        include=["documents", "metadatas", "distances"]
-                    )
-            else:
-                results = self.collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=n_results * 2,
-                    include=["documents", "metadatas", "distances"]
-                )
+            search_multiplier = self.config.SEARCH_MULTIPLIER
             
-            if not results['documents'][0]:
-                logger.warning("Aucun document trouvé dans la base")
-                return [], []
+            groups: Dict[Optional[str], List[int]] = {}
+            for i in dense:
+                groups.setdefault(categories[i], []).append(i)
             
-            documents = results['documents'][0]
-            distances = results['distances'][0]
-            similarities = [1 - d for d in distances]
-            metadatas = results['metadatas'][0]
+            # Recherche avec filtre de catégorie si applicable, repli sans filtre dans la même passe
+            for category, indices in groups.items():
+                embeddings = [query_embeddings[i] for i in indices]
+                if category is None:
+                    results = self._query_collection(collection, embeddings, n_results * 2)
+                else:
+                    logger.info(f"Filtrage par catégorie: {category} ({len(indices)} question(s))")
+                    results = self._query_collection(
+                        collection, embeddings, n_results * search_multiplier,
+                        where={"category": category}, fallback_n_results=n_results * 2
+                    )
+                for i, result in zip(indices, results):
+                    # Partition vide : les résultats viennent de la recherche sans filtre
+                    if category is not None and result['metadatas'] and \
+                            result['metadatas'][0].get('category') != category:
+                        self.metrics.incr("category_fallback")
+                    if lexical_hits[i]:
+                        result = self._fuse_results(collection, result, lexical_index, lexical_hits[i],
+                                                    query_embeddings[i])
+                    raw_results[i] = result
             
-            # Nettoyage des documents
+            # Les chemins rapides ont déjà choisi leurs documents (critères satisfaits, ou tous les termes
+            # de la question pour l'index lexical, dont les scores sont des BM25 relatifs au meilleur) :
+            # les seuils cosinus ne s'appliquent qu'aux résultats de la recherche dense
+            dense_rows = set(dense)
+            return [
+                self._postprocess_results(query, result, category, n_results, apply_thresholds=i in dense_rows)
+                for i, (query, result, category) in enumerate(zip(queries, raw_results, categories))
+            ]
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche: {e}")
+            self.metrics.incr("search_error")
+            return [([], []) for _ in queries]
+
+    def _route_query(self, query: str, category: Optional[str]) -> Tuple[Optional[str], Optional[Dict]]:
+        """Chemin rapide d'une question et ses données, (None, None) pour la recherche habituelle
+
+        Dans l'ordre : demande de trajet ou de circuit ("itinerary"), question de proximité
+        ("geo", avant les entités : "sites près des cascades de Karfiguéla" ne porte pas sur
+        les cascades elles-mêmes), question à critères ("structured", entités nommées
+        comprises) et question nommant une entité connue ("entity"). Les données portent
+        les documents servis par la recherche ("results") et ce dont la mise en forme de la
+        réponse a besoin ; elles sont mémorisées par question, catégorie et version du
+        corpus, de sorte que la réponse réutilise le calcul fait par la recherche.
+        """
+        key = (query, category, self.corpus_version)
+        cached = self._route_cache.get(key)
+        if cached is not None:
+            return cached
+        route: Tuple[Optional[str], Optional[Dict]] = (None, None)
+        for name, find in (("itinerary", lambda: self._plan_trip(query, category)),
+                           ("geo", lambda: self._geo_search(query)),
+                           ("structured", lambda: self._structured_search(query)),
+                           ("entity", lambda: self._entity_search(query, category))):
+            payload = find()
+            if payload is not None:
+                route = (name, payload)
+                break
+        self._route_cache.put(key, route)
+        return route
+
+    def _plan_trip(self, query: str, category: Optional[str]) -> Optional[Dict]:
+        """Trajet entre deux villes ou circuit de plusieurs jours demandé par la question, None sinon
+
+        Une question d'hébergement ou de restauration n'est pas une demande de circuit.
+        """
+        planner = self.travel_planner if self.config.ITINERARY_PLANNER else None
+        if planner is None:
+            return None
+        request = planner.parse_query(query, self.config.ITINERARY_START_CITY, self.config.ITINERARY_DEFAULT_DAYS)
+        if request is None or (request["plan"] and category in NON_PLAN_CATEGORIES):
+            return None
+        if request["plan"]:
+            plan = planner.plan(request["start"], request["days"], request["budget"], request["month"])
+            results = planner.site_results(plan) if plan else planner.structured.as_results([])
+            return {"request": request, "plan": plan, "results": results}
+        route = planner.route(request["origin"], request["destination"])
+        return {"request": request, "route": route, "results": planner.transport_results}
+
+    def _geo_search(self, query: str) -> Optional[Dict]:
+        """Lieu de référence d'une question de proximité et fiches voisines, None si ce n'en est pas une
+
+        Les fiches sont celles situées dans le rayon demandé (GEO_RADIUS_KM par défaut) ;
+        si aucune ne l'est, les plus proches sont retenues.
+        """
+        geo_index = self.geo_index if self.config.GEO_INDEX else None
+        if geo_index is None:
+            return None
+        match_names = self.entity_index.match if self.entity_index is not None else None
+        request = geo_index.parse_query(query, match_names)
+        if request is None:
+            return None
+        label, lat, lon = request["location"]
+        radius = request["radius_km"] or self.config.GEO_RADIUS_KM
+        hits = geo_index.within(lat, lon, radius, request["kinds"], exclude=[label])
+        nearest = not hits
+        if nearest:
+            hits = geo_index.nearest(lat, lon, self.config.TOP_K_RESULTS, request["kinds"], exclude=[label])
+        return {"anchor": label, "radius_km": radius, "hits": hits, "nearest": nearest,
+                "results": geo_index.as_results(hits)}
+
+    def _structured_search(self, query: str) -> Optional[Dict]:
+        """Critères d'une question (tarif, ouverture, mois) et fiches qui les satisfont, None sans critère
+
+        Si la question nomme des entités ("Le Gondwana est-il ouvert le dimanche ?"), seules
+        elles sont confrontées aux critères et leurs fiches sont servies.
+        """
+        index = self.structured_index if self.config.STRUCTURED_ANSWERS else None
+        if index is None:
+            return None
+        constraints = index.parse_query(query)
+        if not constraints:
+            return None
+        named = self._structured_rows_for_query(query)
+        if named:
+            checks = {key: value for key, value in constraints.items() if key not in ("kinds", "city")}
+            matching = index.filter(**checks, names=[index.names[row] for row in named])
+            return {"constraints": constraints, "checks": checks, "named": named, "rows": matching,
+                    "results": index.as_results(named)}
+        rows = index.filter(**constraints)
+        return {"constraints": constraints, "checks": constraints, "named": [], "rows": rows,
+                "results": index.as_results(rows)}
+
+    def _entity_search(self, query: str, category: Optional[str]) -> Optional[Dict]:
+        """Documents des entités nommées dans la question (voir `EntityIndex.lookup`), None sinon"""
+        entity_index = self.entity_index if self.config.ENTITY_FAST_PATH else None
+        if entity_index is None:
+            return None
+        rows = entity_index.lookup(query, category)
+        if not rows:
+            return None
+        return {"rows": rows, "results": entity_index.as_results(rows)}
+
+    def _fuse_results(self, collection, result: Dict, lexical_index: LexicalIndex,
+                      hits: List[Tuple[int, float]], query_embedding: List[float]) -> Dict:
+        """Fusionne les résultats denses et lexicaux d'une question par rang réciproque
+
+        L'ordre vient de la fusion ; chaque document garde sa similarité cosinus, calculée
+        à partir de son embedding pour ceux que seule la recherche lexicale a trouvés, de
+        sorte que le seuil de pertinence garde le même sens.
+        """
+        lexical_ids = [lexical_index.ids[row] for row, _ in hits]
+        ranking = reciprocal_rank_fusion([result["ids"], lexical_ids], k=self.config.RRF_K)
+        rows = {
+            doc_id: (document, metadata, distance)
+            for doc_id, document, metadata, distance in zip(
+                result["ids"], result["documents"], result["metadatas"], result["distances"]
+            )
+        }
+        
+        missing = [doc_id for doc_id in lexical_ids if doc_id not in rows]
+        if missing:
+            extra = collection.get(ids=missing, include=["documents", "metadatas", "embeddings"])
+            query = np.asarray(query_embedding, dtype=np.float32)
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+            for doc_id, document, metadata, embedding in zip(
+                    extra["ids"], extra["documents"], extra["metadatas"], extra["embeddings"]):
+                embedding = np.asarray(embedding, dtype=np.float32)
+                similarity = float(embedding @ query) / max(float(np.linalg.norm(embedding)), 1e-12)
+                rows[doc_id] = (document, metadata, 1.0 - similarity)
+        
+        ranking = [doc_id for doc_id in ranking if doc_id in rows]
+        return {
+            "ids": ranking,
+            "documents": [rows[doc_id][0] for doc_id in ranking],
+            "metadatas": [rows[doc_id][1] for doc_id in ranking],
+            "distances": [rows[doc_id][2] for doc_id in ranking],
+        }
+
+    def _query_collection(self, collection, embeddings: List[List[float]], n_results: int,
+                          where: Optional[Dict] = None,
+                          fallback_n_results: Optional[int] = None) -> List[Dict]:
+        """Interroge la collection pour plusieurs embeddings et découpe le résultat par question"""
+        include = ["documents", "metadatas", "distances"]
+        with self.metrics.span("vector_query"):
+            if where is not None and fallback_n_results is not None:
+                results = query_with_fallback(collection, embeddings, n_results, where, fallback_n_results, include)
+            else:
+                results = collection.query(
+                    query_embeddings=embeddings,
+                    n_results=n_results,
+                    where=where,
+                    include=include
+                )
+        return [
+            {
+                "ids": results['ids'][i],
+                "documents": results['documents'][i],
+                "metadatas": results['metadatas'][i],
+                "distances": results['distances'][i]
+            }
+            for i in range(len(embeddings))
+        ]
+
+    def _postprocess_results(self, query: str, results: Dict, detected_category: Optional[str],
+                             n_results: int, apply_thresholds: bool = True) -> Tuple[List[str], List[float]]:
+        """Filtre par seuil et catégorie, nettoie et déduplique les résultats d'une question
+
+        Sans `apply_thresholds` (résultats d'un chemin rapide), les documents sont gardés
+        tels quels : leurs scores ne sont pas des similarités cosinus.
+        """
+        if not results['documents']:
+            logger.warning("Aucun document trouvé dans la base")
+            self.metrics.incr("empty_results")
+            return [], []
+        
+        documents = results['documents']
+        distances = results['distances']
+        similarities = [1 - d for d in distances]
+        metadatas = results['metadatas']
+        
+        # Nettoyage des documents
+        with self.metrics.span("clean"):
             documents = [self._clean_text(doc) for doc in documents]
-            
-            # Filtrage par seuil de pertinence
-            filtered_docs = []
-            filtered_scores = []
-            filtered_metas = []
-            
-            for doc, score, metadata in zip(documents, similarities, metadatas):
-                if score >= self.config.SIMILARITY_THRESHOLD:
-                    if detected_category:
-                        doc_category = metadata.get('category', '')
-                        if doc_category == detected_category or score > 0.45:
-                            filtered_docs.append(doc)
-                            filtered_scores.append(score)
-                            filtered_metas.append(metadata)
-                    else:
+        
+        # Filtrage par seuil de pertinence
+        filtered_docs = []
+        filtered_scores = []
+        filtered_metas = []
+        
+        for doc, score, metadata in zip(documents, similarities, metadatas):
+            if not apply_thresholds:
+                filtered_docs.append(doc)
+                filtered_scores.append(score)
+                filtered_metas.append(metadata)
+            elif score >= self.config.SIMILARITY_THRESHOLD:
+                if detected_category:
+                    doc_category = metadata.get('category', '')
+                    if doc_category == detected_category or score > self.config.CROSS_CATEGORY_MIN_SCORE:
                         filtered_docs.append(doc)
                         filtered_scores.append(score)
                         filtered_metas.append(metadata)
-            
-            if not filtered_docs and documents:
-                logger.info("Aucun document au-dessus du seuil, utilisation des meilleurs résultats")
-                filtered_docs = documents[:n_results]
-                filtered_scores = similarities[:n_results]
-                filtered_metas = metadatas[:n_results]
-            
-            # Déduplication
+                else:
+                    filtered_docs.append(doc)
+                    filtered_scores.append(score)
+                    filtered_metas.append(metadata)
+        
+        if not filtered_docs and documents:
+            logger.info("Aucun document au-dessus du seuil, utilisation des meilleurs résultats")
+            self.metrics.incr("below_threshold")
+            filtered_docs = documents[:n_results]
+            filtered_scores = similarities[:n_results]
+            filtered_metas = metadatas[:n_results]
+        
+        # Déduplication
+        with self.metrics.span("dedupe"):
             unique_docs = self._deduplicate_results(filtered_docs, filtered_metas)
-            
-            if self.config.DEBUG:
-                logger.info(f"Query: {query}")
-                logger.info(f"Catégorie détectée: {detected_category}")
-                logger.info(f"Documents trouvés: {len(unique_docs)}")
-            
-            return unique_docs[:n_results], filtered_scores[:len(unique_docs[:n_results])]
         
+        if self.config.DEBUG:
+            logger.info(f"Query: {query}")
+            logger.info(f"Catégorie détectée: {detected_category}")
+            logger.info(f"Documents trouvés: {len(unique_docs)}")
+            logger.info(f"Cache des embeddings: {self.query_embedding_cache.stats()}")
+        
+        return unique_docs[:n_results], filtered_scores[:len(unique_docs[:n_results])]
+
+    def generate_response(self, query: str, context: List[str], detected_category=_DETECT) -> str:
+        """Génère une réponse à partir du contexte (modèle local si activé, sinon mise en forme)"""
+        return self._generate(query, context, detected_category)[0]
+
+    def _use_generator(self, query: str, context: List[str], detected_category=_DETECT) -> bool:
+        """Le modèle local ne reçoit que les documents : les réponses calculées par un chemin
+        rapide (circuit, distances, critères) restent mises en forme"""
+        if self.generator is None or not context or self._is_greeting(query):
+            return False
+        if detected_category is _DETECT:
+            detected_category = self._detect_question_category(query)
+        route, _ = self._route_query(query, detected_category)
+        return route not in COMPUTED_ROUTES
+
+    def _generate(self, query: str, context: List[str], detected_category=_DETECT) -> Tuple[str, str]:
+        """Réponse et son origine : "template", "llm" ou "fallback" (modèle local saturé ou en erreur)"""
+        if not self._use_generator(query, context, detected_category):
+            with self.metrics.span("format"):
+                return self._format_response(query, context, detected_category), "template"
+        try:
+            with self.metrics.span("generate"):
+                response = self.generator.generate(query, context)
+            if response:
+                return response, "llm"
+        except GenerationOverloaded as e:
+            logger.warning(f"Génération locale indisponible ({e}), réponse mise en forme")
         except Exception as e:
-            logger.error(f"Erreur lors de la recherche: {e}")
-            return [], []
+            logger.error(f"Erreur de génération locale ({e}), réponse mise en forme")
+        self.metrics.incr("generation_fallback")
+        with self.metrics.span("format"):
+            return self._format_response(query, context, detected_category), "fallback"
 
-    def generate_response(self, query: str, context: List[str]) -> str:
+    def _generate_stream(self, query: str, context: List[str],
+                         detected_category=_DETECT) -> Tuple[Iterator[str], str]:
+        """Fragments de la réponse et leur origine ; le repli est décidé avant le premier fragment"""
+        if not self._use_generator(query, context, detected_category):
+            return self._split_chunks(self._format_response(query, context, detected_category)), "template"
+        try:
+            chunks = self.generator.stream(query, context)
+            first = next(chunks, None)
+            if first is not None:
+                return itertools.chain([first], chunks), "llm"
+        except GenerationOverloaded as e:
+            logger.warning(f"Génération locale indisponible ({e}), réponse mise en forme")
+        except Exception as e:
+            logger.error(f"Erreur de génération locale ({e}), réponse mise en forme")
+        self.metrics.incr("generation_fallback")
+        return self._split_chunks(self._format_response(query, context, detected_category)), "fallback"
+
+    def _format_response(self, query: str, context: List[str], detected_category=_DETECT) -> str:
         """Génère une réponse structurée à partir du contexte"""
         
         # Traitement des salutations
@@ -469,12 +1134,25 @@ Je peux vous aider à :
 
 Que souhaitez-vous savoir ?"""
         
+        # Identification du type de question
+        if detected_category is _DETECT:
+            detected_category = self._detect_question_category(query)
+        
+        # Chemins rapides de la recherche (mémorisés) : réponse tirée de leurs données
+        route, payload = self._route_query(query, detected_category)
+        # Demandes de trajet ou de circuit : plan calculé sur le graphe des trajets
+        if route == "itinerary":
+            return self._format_itinerary_response(payload)
+        # Questions de proximité : fiches voisines triées par distance
+        if route == "geo":
+            return self._format_geo_response(payload)
+        # Questions à critères (tarif, ouverture, mois) : réponse calculée sur l'index structuré
+        if route == "structured":
+            return self._format_structured_response(payload)
+        
         if not context:
             return self._generate_fallback_response(query)
         
-        # Identification du type de question
-        detected_category = self._detect_question_category(query)
-        
         # Traitement spécifique pour le transport
         if detected_category == "transport":
             return self._format_transport_response(context)
@@ -497,6 +1175,18 @@ Que souhaitez-vous savoir ?"""
         else:
             return self._format_general_response(context_items)
 
+    def generate_response_stream(self, query: str, context: List[str],
+                                 detected_category=_DETECT) -> Iterator[str]:
+        """Produit la réponse par fragments (tokens du modèle local, ou lignes des réponses mises en forme)"""
+        chunks, _ = self._generate_stream(query, context, detected_category)
+        yield from chunks
+
+    @staticmethod
+    def _split_chunks(text: str) -> Iterator[str]:
+        """Découpe un texte en fragments ligne par ligne, sauts de ligne conservés"""
+        for line in text.splitlines(keepends=True):
+            yield line
+
     def _format_hebergement_response(self, context: List[str], query: str) -> str:
         """Formate une réponse pour les hébergements"""
         ville = self._extract_ville_from_query(query)
@@ -575,12 +1265,170 @@ Que souhaitez-vous savoir ?"""
             
             return '\n'.join(formatted)
     
+    def _structured_rows_for_query(self, query: str) -> List[int]:
+        """Lignes de l'index structuré des entités nommées dans la question"""
+        if self.structured_index is None or self.entity_index is None:
+            return []
+        return self.structured_index.rows_for(self.entity_index.match(query))
+
+    def _structured_details(self, row: int, constraints: Dict) -> List[str]:
+        """Champs d'une fiche en rapport avec les critères de la question"""
+        metadata = self.structured_index.metadatas[row]
+        details = []
+        if metadata.get("prix") and ("max_price" in constraints or "min_price" in constraints):
+            details.append(f"   💰 {metadata['prix']}")
+        if metadata.get("horaires") and ("day" in constraints or "hour" in constraints):
+            details.append(f"   🕐 {metadata['horaires']}")
+            day = constraints.get("day")
+            if day is not None and self.structured_index.closure_days[row, day]:
+                details.extend(f"   ⚠️ {note.capitalize()}" for note in self.structured_index.closure_notes[row])
+        if metadata.get("meilleure_periode") and "month" in constraints:
+            details.append(f"   📅 {metadata['meilleure_periode']}")
+        return details
+
+    def _format_leg(self, leg) -> str:
+        """Ligne d'un trajet entre deux villes"""
+        origin, destination, hours, cost, mode = leg
+        names = self.travel_planner.city_names
+        if mode == "route":
+            return f"🚗 {names[origin]} → {names[destination]} : route, ~{format_hours(hours)}, ~{format_fcfa(cost)} (estimé)"
+        return f"🚌 {names[origin]} → {names[destination]} : {mode}, {format_hours(hours)}, {format_fcfa(cost)}"
+
+    def _format_itinerary_response(self, trip: Dict) -> str:
+        """Réponse à une demande de trajet ou de circuit tirée du planificateur"""
+        planner = self.travel_planner
+        request = trip["request"]
+        names = planner.city_names
+        
+        if not request["plan"]:
+            origin, destination = names[request["origin"]], names[request["destination"]]
+            if trip["route"] is None:
+                return f"Je ne connais pas de trajet entre {origin} et {destination}."
+            legs, hours, cost = trip["route"]
+            formatted = [f"🚌 **{origin} → {destination}** : {format_hours(hours)}, {format_fcfa(cost)}", ""]
+            formatted.extend(f"   {self._format_leg(leg)}" for leg in legs)
+            formatted.append("")
+            formatted.append("💡 Trajets routiers estimés d'après les liaisons de bus ; négociez les taxis-brousse !")
+            return '\n'.join(formatted)
+        
+        conditions = [f"au départ de {names[request['start']]}"]
+        if request["budget"] is not None:
+            conditions.append(f"budget {format_fcfa(request['budget'])}")
+        if request["month"] is not None:
+            conditions.append(f"en {MONTH_NAMES[request['month']]}")
+        title = f"🗺️ **Circuit de {request['days']} jour(s)** ({', '.join(conditions)})"
+        plan = trip["plan"]
+        if plan is None:
+            return f"""{title}
+
+Aucun site ne peut être visité avec ces contraintes.
+
+💡 Allongez la durée du séjour ou augmentez le budget !"""
+        
+        formatted = [title, ""]
+        for number, day in enumerate(plan["days"], start=1):
+            formatted.append(f"**Jour {number}** :")
+            if not day:
+                formatted.append("   (suite de la visite)")
+            for step in day:
+                if step[0] == "travel":
+                    formatted.append(f"   {self._format_leg(step[1])}")
+                else:
+                    metadata = planner.structured.metadatas[step[1]]
+                    duree = metadata.get("duree_visite") or format_hours(step[2])
+                    formatted.append(f"   🏞️ {metadata['nom']} ({duree})")
+            formatted.append("")
+        formatted.append(f"📊 {plan['sites']} site(s) sur {plan['eligible_sites']}, "
+                         f"{format_hours(plan['hours'])} de visites et de trajets")
+        formatted.append(f"💰 Trajets et entrées : ~{format_fcfa(plan['cost'])} (hébergement et repas en sus)")
+        formatted.append("")
+        formatted.append("💡 Trajets routiers estimés d'après les liaisons de bus")
+        return '\n'.join(formatted)
+
+    def _format_geo_response(self, nearby: Dict) -> str:
+        """Réponse à une question de proximité tirée de l'index géographique"""
+        index = self.geo_index
+        icons = {"site_touristique": "🏞️", "hebergement": "🏨", "restaurant": "🍽️"}
+        radius = f"{nearby['radius_km']:.0f} km"
+        if nearby["nearest"]:
+            formatted = [f"📍 Rien à moins de {radius} de {nearby['anchor']} ; les plus proches :", ""]
+        else:
+            formatted = [f"📍 À moins de {radius} de {nearby['anchor']} :", ""]
+        for row, distance in nearby["hits"][:10]:
+            metadata = index.metadatas[row]
+            ville = metadata.get("ville")
+            if index.precise[row]:
+                where = f"{distance:.0f} km"
+            else:
+                where = "même ville" if distance < 1 else f"≈ {distance:.0f} km"
+            formatted.append(f"{icons.get(metadata.get('type'), '•')} **{index.names[row]}**" +
+                             (f" ({ville})" if ville else "") + f" : {where}")
+        if len(nearby["hits"]) > 10:
+            formatted.append(f"• ... et {len(nearby['hits']) - 10} autre(s)")
+        formatted.append("")
+        formatted.append("💡 Distances à vol d'oiseau ; ≈ : position du centre de la ville")
+        return '\n'.join(formatted)
+
+    def _format_structured_response(self, answer: Dict) -> str:
+        """Réponse à une question à critères tirée de l'index structuré"""
+        index = self.structured_index
+        constraints = answer["constraints"]
+        criteria = index.describe(constraints)
+        
+        # Entités nommées ("Le Gondwana est-il ouvert le dimanche ?") : chacune est confrontée aux critères
+        if answer["named"]:
+            matching = set(answer["rows"])
+            formatted = [f"🔎 Critères : {criteria}", ""]
+            for row in answer["named"]:
+                formatted.append(f"{'✅' if row in matching else '❌'} **{index.names[row]}**")
+                formatted.extend(self._structured_details(row, answer["checks"]))
+                formatted.append("")
+            formatted.append("💡 Pour plus de détails, demandez-moi !")
+            return '\n'.join(formatted)
+        
+        rows = answer["rows"]
+        if not rows:
+            return f"""Aucun lieu ne correspond à ces critères ({criteria}).
+
+💡 Élargissez votre budget ou vos horaires, ou demandez-moi les tarifs d'un lieu précis !"""
+        
+        formatted = [f"🔎 {len(rows)} résultat(s) : {criteria}", ""]
+        for row in rows[:10]:
+            ville = index.metadatas[row].get("ville")
+            formatted.append(f"• **{index.names[row]}**" + (f" ({ville})" if ville else ""))
+            formatted.extend(self._structured_details(row, constraints))
+        if len(rows) > 10:
+            formatted.append(f"• ... et {len(rows) - 10} autre(s)")
+        formatted.append("")
+        formatted.append("💡 Pour plus de détails sur un lieu, demandez-moi !")
+        return '\n'.join(formatted)
+
     def _format_prix_response(self, context: List[str], query: str) -> str:
         """Formate une réponse pour les tarifs"""
         formatted = ["💰 Tarifs :", ""]
         
-        for item in context:
-            # Extraction des lignes de prix
+        # Entités nommées : tarifs lus dans l'index structuré plutôt que dans le texte du contexte
+        named = self._structured_rows_for_query(query)
+        index = self.structured_index
+        for row in named:
+            metadata = index.metadatas[row]
+            if not metadata.get("prix"):
+                continue
+            formatted.append(f"📍 **{index.names[row]}**")
+            formatted.append(f"💰 {metadata['prix']}")
+            low, high = index.price_min[row], index.price_max[row]
+            if low == 0:
+                formatted.append("   • Entrée gratuite" +
+                                 (f", options jusqu'à {format_fcfa(high)}" if high > 0 else ""))
+            elif not np.isnan(low):
+                formatted.append(f"   • À partir de {format_fcfa(low)}" +
+                                 (f", jusqu'à {format_fcfa(high)}" if high > low else ""))
+            if metadata.get("duree_visite"):
+                formatted.append(f"⏱️ Durée de visite : {metadata['duree_visite']}")
+            formatted.append("")
+        
+        # Sans entité connue : lignes de prix extraites du contexte
+        for item in context if len(formatted) == 2 else []:
             lines = item.split('\n')
             price_lines = [l for l in lines if any(x in l.lower() for x in ['💰', 'prix', 'fcfa', 'tarif'])]
             
@@ -593,17 +1441,41 @@ Que souhaitez-vous savoir ?"""
                 formatted.append("")
         
         # Ajout d'informations sur le budget global si pertinent
-        if any(word in query.lower() for word in ["séjour", "voyage", "budget global", "coûte un"]):
+        if any(word in query.lower() for word in ["séjour", "voyage", "budget", "coûte un"]):
             formatted.append("💡 **Budget estimé pour un séjour** :")
             formatted.append("• Économique : 20,000-35,000 FCFA/jour")
             formatted.append("• Confort moyen : 40,000-70,000 FCFA/jour")
             formatted.append("• Haut de gamme : 100,000+ FCFA/jour")
+            # Durée donnée ("séjour de 10 jours") : mêmes fourchettes pour l'ensemble du séjour
+            days = _STAY_DAYS.search(fold_accents(query))
+            if days and int(days.group(1)) > 0:
+                count = int(days.group(1))
+                formatted.append("")
+                formatted.append(f"🧮 **Pour {count} jours** :")
+                formatted.append(f"• Économique : {format_fcfa(20000 * count)} - {format_fcfa(35000 * count)}")
+                formatted.append(f"• Confort moyen : {format_fcfa(40000 * count)} - {format_fcfa(70000 * count)}")
+                formatted.append(f"• Haut de gamme : {format_fcfa(100000 * count)} et plus")
         
         return '\n'.join(formatted)
 
     def _format_periode_response(self, context: List[str], query: str) -> str:
         """Formate une réponse sur la période de visite"""
-        formatted = ["📅 **Meilleure période pour visiter le Burkina Faso** :", ""]
+        formatted = []
+        
+        # Entités nommées : période et horaires propres au lieu, avant les conseils généraux
+        index = self.structured_index
+        for row in self._structured_rows_for_query(query):
+            metadata = index.metadatas[row]
+            if not metadata.get("meilleure_periode"):
+                continue
+            formatted.append(f"📅 **{index.names[row]}** : {metadata['meilleure_periode']}")
+            if metadata.get("horaires"):
+                formatted.append(f"   🕐 Horaires : {metadata['horaires']}")
+            if metadata.get("duree_visite"):
+                formatted.append(f"   ⏱️ Durée de visite : {metadata['duree_visite']}")
+            formatted.append("")
+        
+        formatted.extend(["📅 **Meilleure période pour visiter le Burkina Faso** :", ""])
         
         formatted.append("🌤️ **Saison sèche (octobre à mai)** - RECOMMANDÉE")
         formatted.append("   • Idéale pour le tourisme")
@@ -630,8 +1502,15 @@ Que souhaitez-vous savoir ?"""
         formatted.append("")
         
         formatted.append("🚌 **Bus interurbain**")
-        formatted.append("   • Ouaga → Bobo : 4h, 5,000 FCFA")
-        formatted.append("   • Ouaga → Banfora : 6h, 7,000 FCFA")
+        # Liaisons lues dans le graphe des trajets
+        planner = self.travel_planner
+        bus_legs = planner.bus_legs if planner is not None else []
+        for origin, destination, hours, cost, _ in bus_legs:
+            formatted.append(f"   • {planner.city_names[origin]} → {planner.city_names[destination]} : "
+                             f"{format_hours(hours)}, {format_fcfa(cost)}")
+        if not bus_legs:
+            formatted.append("   • Ouaga → Bobo : 4h, 5,000 FCFA")
+            formatted.append("   • Ouaga → Banfora : 6h, 7,000 FCFA")
         formatted.append("   • Compagnies : STMB, TSR, TCV, Rakieta")
         formatted.append("")
         
@@ -646,6 +1525,8 @@ Que souhaitez-vous savoir ?"""
         formatted.append("")
         
         formatted.append("💡 **Conseil** : Réservez les bus à l'avance en haute saison !")
+        if planner is not None:
+            formatted.append("🗺️ Demandez-moi un trajet (« de Ouaga à Banfora ») ou un circuit (« circuit de 5 jours ») !")
         
         return '\n'.join(formatted)
 
@@ -700,30 +1581,261 @@ Reformulez votre question ou choisissez un sujet !"""
 
     def chat(self, query: str) -> str:
         """Fonction principale d'interaction"""
+        with self.metrics.trace("chat") as trace:
+            try:
+                # Réponse déterministe pour un corpus donné : servie directement depuis le cache
+                version = self.corpus_version
+                response = self.response_cache.get(query, version)
+                if response is not None:
+                    self.metrics.incr("response_cache_hit")
+                    return response
+                self.metrics.incr("response_cache_miss")
+            
+                # Catégorie détectée une seule fois, partagée par la recherche et la mise en forme
+                start = time.perf_counter()
+                detected_category = self._detect_question_category(query)
+                documents, scores = self.search_similar_documents(query, detected_category=detected_category)
+                retrieved = time.perf_counter()
+                response, source = self._generate(query, documents, detected_category=detected_category)
+                logger.info(f"Latences: recherche {(retrieved - start) * 1000:.0f} ms, "
+                            f"génération ({source}) {(time.perf_counter() - retrieved) * 1000:.0f} ms")
+                if trace is not None:
+                    trace.update(category=detected_category, source=source, documents=len(documents))
+                # Une recherche vide peut provenir d'une erreur transitoire, un repli d'une surcharge :
+                # ni l'une ni l'autre n'est mémorisée
+                if (documents or self._is_greeting(query)) and source != "fallback":
+                    self.response_cache.put(query, version, response)
+                return response
+            except Exception as e:
+                logger.error(f"Erreur dans chat(): {e}")
+                self.metrics.incr("errors")
+                return f"Désolé, une erreur s'est produite : {str(e)}"
+
+    def chat_stream(self, query: str) -> Iterator[Dict[str, Any]]:
+        """Version incrémentale de `chat` pour un affichage au fil de l'eau
+
+        Produit d'abord le résultat de la recherche, puis la réponse par fragments :
+        - {"type": "retrieval", "documents", "scores", "category", "cached"}
+        - {"type": "chunk", "text"} (autant que nécessaire)
+        - {"type": "done", "response"} avec la réponse complète
+        """
+        response = ""
         try:
-            documents, scores = self.search_similar_documents(query)
-            response = self.generate_response(query, documents)
-            return response
+            version = self.corpus_version
+            cached = self.response_cache.get(query, version)
+            if cached is not None:
+                self.metrics.incr("response_cache_hit")
+                yield {"type": "retrieval", "documents": [], "scores": [], "category": None, "cached": True}
+                chunks, source = self._split_chunks(cached), "cache"
+            else:
+                self.metrics.incr("response_cache_miss")
+                start = time.perf_counter()
+                detected_category = self._detect_question_category(query)
+                documents, scores = self.search_similar_documents(query, detected_category=detected_category)
+                retrieved = time.perf_counter()
+                yield {"type": "retrieval", "documents": documents, "scores": scores,
+                       "category": detected_category, "cached": False}
+                chunks, source = self._generate_stream(query, documents, detected_category=detected_category)
+            
+            first_chunk = None
+            for chunk in chunks:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                response += chunk
+                yield {"type": "chunk", "text": chunk}
+            
+            if cached is None:
+                logger.info(f"Latences: recherche {(retrieved - start) * 1000:.0f} ms, premier fragment "
+                            f"({source}) {((first_chunk or retrieved) - retrieved) * 1000:.0f} ms, "
+                            f"fin {(time.perf_counter() - retrieved) * 1000:.0f} ms")
+                if self.metrics.enabled:
+                    # Flux consommé par morceaux (souvent depuis un autre thread) : pas de trace,
+                    # seules les durées de bout en bout sont enregistrées
+                    self.metrics.observe_stage("first_chunk", (first_chunk or retrieved) - start)
+                    self.metrics.observe_stage("chat_stream", time.perf_counter() - start)
+                if (documents or self._is_greeting(query)) and source != "fallback":
+                    self.response_cache.put(query, version, response)
         except Exception as e:
-            logger.error(f"Erreur dans chat(): {e}")
-            return f"Désolé, une erreur s'est produite : {str(e)}"
+            logger.error(f"Erreur dans chat_stream(): {e}")
+            self.metrics.incr("errors")
+            error = f"Désolé, une erreur s'est produite : {str(e)}"
+            response += error
+            yield {"type": "chunk", "text": error}
+        yield {"type": "done", "response": response}
 
-    def reset_database(self):
-        """Réinitialise la base de données"""
+    def chat_batch(self, queries: List[str]) -> List[str]:
+        """Traite plusieurs questions à la fois (évaluations hors ligne, appels en masse)
+
+        Les réponses en cache sont servies directement ; les autres questions partagent
+        un seul appel au modèle d'embeddings et une requête Chroma par catégorie.
+        Les réponses sont retournées dans l'ordre des questions.
+        """
         try:
-            self.chroma_client.delete_collection(name=self.config.COLLECTION_NAME)
-            self.collection = self.chroma_client.create_collection(
-                name=self.config.COLLECTION_NAME,
-                metadata={"hnsw:space": "cosine"}
+            version = self.corpus_version
+            responses: List[Optional[str]] = [self.response_cache.get(q, version) for q in queries]
+            pending = [i for i, response in enumerate(responses) if response is None]
+            self.metrics.incr("response_cache_hit", len(queries) - len(pending))
+            self.metrics.incr("response_cache_miss", len(pending))
+            
+            if pending:
+                pending_queries = [queries[i] for i in pending]
+                categories = [self._detect_question_category(q) for q in pending_queries]
+                search_results = self.search_batch(pending_queries, categories=categories)
+                
+                for i, query, category, (documents, scores) in zip(pending, pending_queries, categories, search_results):
+                    response, source = self._generate(query, documents, detected_category=category)
+                    if (documents or self._is_greeting(query)) and source != "fallback":
+                        self.response_cache.put(query, version, response)
+                    responses[i] = response
+            
+            return responses
+        except Exception as e:
+            logger.error(f"Erreur dans chat_batch(): {e}")
+            self.metrics.incr("errors")
+            return [f"Désolé, une erreur s'est produite : {str(e)}" for _ in queries]
+
+    def rebuild_database(self) -> Dict[str, int]:
+        """Reconstruit l'index dans une nouvelle collection puis bascule dessus (blue/green)
+
+        Les requêtes continuent d'être servies par la collection active pendant la
+        construction ; la bascule est atomique et l'ancienne collection est supprimée
+        après un délai de grâce. Le rapport compare la nouvelle collection à celle
+        qu'elle remplace (documents ajoutés, mis à jour, supprimés et inchangés).
+        """
+        with self._rebuild_lock:
+            self.last_reindex_error = None
+            new_name = f"{self.config.COLLECTION_NAME}_v{int(time.time() * 1000)}"
+            logger.info(f"Construction de la collection {new_name}...")
+            new_collection = self.chroma_client.create_collection(
+                name=new_name,
+                metadata={"hnsw:space": "cosine", "encoder": self.encoder_id}
             )
-            self.load_data()
+            
+            try:
+                self.load_data(collection=new_collection)
+                new_keys = self._document_keys(new_collection)
+            except Exception:
+                self.chroma_client.delete_collection(name=new_name)
+                raise
+            
+            with self._lock:
+                old_name = self.collection.name
+                report = self._sync_report(self._document_keys(self.collection), new_keys)
+                self.collection = new_collection
+                self._write_active_collection_name(new_name)
+                self._refresh_corpus_version()
+            logger.info(f"Collection active: {new_name} (remplace {old_name})")
+            
+            # Les requêtes en cours sur l'ancienne collection ont le temps de se terminer
+            timer = threading.Timer(self.config.COLLECTION_SWAP_GRACE_SECONDS, self._drop_collection, args=(old_name,))
+            timer.daemon = True
+            timer.start()
+            
+            self.last_reindex_report = report
+            return report
+
+    def _drop_collection(self, name: str):
+        """Supprime une collection désactivée"""
+        try:
+            self.chroma_client.delete_collection(name=name)
+            logger.info(f"Ancienne collection supprimée: {name}")
+        except Exception as e:
+            logger.warning(f"Suppression de la collection {name} impossible: {e}")
+
+    @property
+    def is_reindexing(self) -> bool:
+        """Indique si une réindexation en arrière-plan est en cours"""
+        return self._rebuild_thread is not None and self._rebuild_thread.is_alive()
+
+    def reset_database(self, background: bool = False) -> Optional[Dict[str, int]]:
+        """Réinitialise la base de données sans interruption de service
+
+        Avec `background=True`, la reconstruction s'exécute dans un thread et la méthode
+        rend la main immédiatement (le rapport sera disponible dans `last_reindex_report`,
+        ou le message d'erreur dans `last_reindex_error` en cas d'échec).
+        """
+        if background:
+            with self._lock:
+                if not self.is_reindexing:
+                    self._rebuild_thread = threading.Thread(
+                        target=self.reset_database, name="reindex", daemon=True
+                    )
+                    self._rebuild_thread.start()
+            return None
+        
+        try:
+            report = self.rebuild_database()
             logger.info("Base de données réinitialisée avec succès!")
+            return report
         except Exception as e:
             logger.error(f"Erreur lors de la réinitialisation: {e}")
+            self.last_reindex_error = str(e) or type(e).__name__
+            return None
+
+
+# Instance partagée par tout le processus (modèle, client Chroma et collection)
+_shared_chatbot: Optional[BurkinaChatbot] = None
+_shared_chatbot_lock = threading.Lock()
+
+
+def get_shared_chatbot() -> BurkinaChatbot:
+    """Retourne le chatbot partagé du processus, créé une seule fois de façon thread-safe.
+
+    Les sessions Streamlit (et tout autre appelant) réutilisent le même modèle
+    d'embeddings et la même collection ; l'état de conversation reste propre
+    à chaque session.
+    """
+    global _shared_chatbot
+    if _shared_chatbot is None:
+        with _shared_chatbot_lock:
+            if _shared_chatbot is None:
+                logger.info("Création du chatbot partagé du processus...")
+                _shared_chatbot = BurkinaChatbot()
+    return _shared_chatbot
+
+
+_warmup_future: Optional[Future] = None
+_warmup_lock = threading.Lock()  # Distinct du verrou de création, tenu pendant tout le chargement
+
+
+def warm_up_shared_chatbot() -> Future:
+    """Lance en arrière-plan la création du chatbot partagé et un premier encodage.
+
+    Retourne immédiatement un Future (le même à chaque appel) : l'interface peut
+    s'afficher pendant le chargement du modèle et de l'index, puis consulter
+    `done()` pour indiquer l'état de préparation ou `result()` pour l'attendre.
+    """
+    global _warmup_future
+    if _warmup_future is not None:
+        return _warmup_future
+    with _warmup_lock:
+        if _warmup_future is None:
+            _warmup_future = Future()
+            threading.Thread(target=_warm_up, args=(_warmup_future,), name="chatbot-warmup",
+                             daemon=True).start()
+        return _warmup_future
+
+
+def _warm_up(future: Future):
+    start = time.perf_counter()
+    try:
+        chatbot = get_shared_chatbot()
+        # Premier appel au modèle hors cache : initialise les noyaux et le tokenizer
+        chatbot.embedding_model.encode(["Bonjour"])
+        if chatbot.generator is not None:
+            chatbot.generator.load()
+    except Exception as e:
+        logger.error(f"Erreur lors du préchargement du chatbot: {e}")
+        future.set_exception(e)
+        return
+    logger.info(f"✓ Chatbot prêt en {time.perf_counter() - start:.1f}s")
+    future.set_result(chatbot)
 
 
 # Tests du chatbot
 if __name__ == "__main__":
+    load_environment()
+    print_config()
     print("Initialisation du chatbot...")
     chatbot = BurkinaChatbot()
 
@@ -0,0 +1,150 @@
+"""
+Caches en mémoire utilisés par le chatbot
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalise une question pour servir de clé de cache (casse, espaces, ponctuation finale)"""
+    text = unicodedata.normalize("NFC", query).lower()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.rstrip(" ?!.")
+
+
+class LRUCache:
+    """Cache LRU borné et thread-safe, avec expiration optionnelle des entrées"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 0):
+        self.max_size = max_size
+        self.ttl = ttl  # en secondes, 0 = sans expiration
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retourne la valeur associée à la clé, ou None si absente ou expirée"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl and time.monotonic() - stored_at > self.ttl:
+                    del self._data[key]
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        """Ajoute ou remplace une entrée en évinçant la moins récemment utilisée"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class ResponseCache:
+    """Cache des réponses complètes, indexé par question normalisée et version du corpus.
+
+    Les entrées vivent dans un LRU en mémoire ; si `path` est fourni, elles sont aussi
+    persistées dans une base SQLite pour survivre aux redémarrages.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 0, path: Optional[str] = None):
+        self.ttl = ttl
+        self._memory = LRUCache(max_size=max_size, ttl=ttl)
+        self._db = None
+        self._db_lock = threading.Lock()
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "version TEXT, query TEXT, response TEXT, created REAL, "
+                    "PRIMARY KEY (version, query))"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Cache de réponses sur disque indisponible ({e}), mémoire seule")
+                self._db = None
+
+    def get(self, query: str, version: str) -> Optional[str]:
+        """Retourne la réponse mémorisée pour cette question et cette version du corpus"""
+        key = (version, normalize_query(query))
+        response = self._memory.get(key)
+        if response is not None or self._db is None:
+            return response
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT response, created FROM responses WHERE version = ? AND query = ?", key
+            ).fetchone()
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+
+        # Promotion en mémoire pour les accès suivants
+        self._memory.put(key, row[0])
+        return row[0]
+
+    def put(self, query: str, version: str, response: str):
+        """Mémorise une réponse"""
+        key = (version, normalize_query(query))
+        self._memory.put(key, response)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (*key, response, time.time())
+                )
+                self._db.commit()
+
+    def invalidate(self, current_version: Optional[str] = None):
+        """Vide le cache mémoire et purge du disque les versions autres que `current_version`"""
+        self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM responses WHERE version != ?", (current_version or "",))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache mémoire"""
+        stats = self._memory.stats()
+        stats["persistent"] = self._db is not None
+        return stats
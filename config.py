@@ -4,22 +4,41 @@ Configuration centralisée pour le chatbot touristique du Burkina Faso
 import os
 from dotenv import load_dotenv
 
-# Charger les variables d'environnement
-load_dotenv()
-
 
 class Config:
-    # Configuration API
+    # Configuration API (relues depuis le fichier .env par `load_environment`)
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 
+    # Backend de recherche vectorielle : "numpy" (en mémoire, reconstruit au démarrage à partir
+    # du cache d'embeddings) ou "chroma" (persistant). Les sous-index par catégorie des requêtes
+    # filtrées n'existent qu'avec "numpy" ; avec Chroma, une requête filtrée passe par le filtre
+    # `where` et les questions sans résultat par un second passage
+    VECTOR_BACKEND = "numpy"
+
+    # Stockage des embeddings du corpus (backend numpy) : "float32", "float16" ou "int8"
+    EMBEDDING_STORAGE = "float32"
+    EMBEDDING_RESCORE_CANDIDATES = 20  # Candidats re-classés en float32 en mode compact (0 = désactivé)
+
     # Configuration ChromaDB
     CHROMA_DB_PATH = "./chroma_db"
     COLLECTION_NAME = "burkina_tourism"
+    COLLECTION_SWAP_GRACE_SECONDS = 5  # Délai avant suppression de l'ancienne collection après une réindexation
 
     # Modèle d'embeddings multilingue pour supporter le français
     EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
+    # Backend d'inférence du modèle d'embeddings : "torch" (sentence-transformers) ou "onnx"
+    EMBEDDING_BACKEND = "torch"
+    ONNX_CACHE_DIR = "./onnx_cache"  # Export ONNX réalisé une seule fois puis réutilisé
+    ONNX_QUANTIZE = True  # Quantification dynamique int8 des poids
+    ONNX_INTRA_OP_THREADS = 0  # Threads par opérateur (0 = nombre de cœurs)
+    ONNX_INTER_OP_THREADS = 1  # Opérateurs exécutés en parallèle
+    ONNX_TOLERANCE = 0.02  # Écart maximal (1 - cosinus) accepté avec les embeddings PyTorch
+
+    # Cache disque des embeddings du corpus (None pour désactiver)
+    EMBEDDING_CACHE_DIR = "./embeddings_cache"
+
     # Paramètres de découpage des documents
     CHUNK_SIZE = 600  # Taille des segments de texte
     CHUNK_OVERLAP = 150  # Chevauchement entre segments
@@ -27,10 +46,52 @@ class Config:
     # Paramètres de recherche
     SIMILARITY_THRESHOLD = 0.30  # Seuil de pertinence des résultats
     TOP_K_RESULTS = 3  # Nombre de résultats à retourner
+    SEARCH_MULTIPLIER = 4  # Candidats demandés par résultat avec filtre de catégorie (marge pour la déduplication)
+    CROSS_CATEGORY_MIN_SCORE = 0.45  # Score au-delà duquel un document d'une autre catégorie est conservé
+
+    # Recherche hybride : index lexical BM25 fusionné avec la recherche dense (lexical_index.py)
+    HYBRID_SEARCH = True
+    BM25_K1 = 1.5  # Saturation de la fréquence des termes
+    BM25_B = 0.75  # Normalisation par la longueur des documents
+    RRF_K = 60  # Constante de la fusion par rang réciproque
+    LEXICAL_CANDIDATES = 10  # Documents lexicaux fusionnés avec les résultats denses
+    LEXICAL_FAST_PATH = True  # Répondre depuis l'index lexical seul (sans encodeur) quand il est confiant
+    LEXICAL_FAST_PATH_MAX_TOKENS = 4  # Longueur maximale (en termes) d'une question éligible
+    LEXICAL_RARE_DF_RATIO = 0.1  # Un terme est rare s'il apparaît dans au plus 10% des documents
+    ENTITY_FAST_PATH = True  # Questions nommant un site, un hôtel ou un restaurant : documents de l'entité sans recherche
+    STRUCTURED_ANSWERS = True  # Questions à critères (tarif, ouverture, mois) : filtrage de l'index structuré
+    GEO_INDEX = True  # Questions de proximité ("près de Banfora") : index géographique des fiches
+    GEO_RADIUS_KM = 50  # Rayon par défaut d'une question de proximité
+    GEO_GRID_CELL_DEG = 0.5  # Côté des cellules de la grille (degrés, environ 55 km)
+    ITINERARY_PLANNER = True  # Trajets entre villes et circuits de plusieurs jours (itinerary.py)
+    ITINERARY_START_CITY = "Ouagadougou"  # Ville de départ d'un circuit sans ville précisée
+    ITINERARY_DEFAULT_DAYS = 7  # Durée d'un circuit sans durée précisée
+    ITINERARY_DAY_HOURS = 8  # Heures de visites et de trajets par jour
+    ITINERARY_ROAD_NEIGHBOURS = 3  # Villes voisines reliées par la route (trajets estimés)
+
+    # Cache des embeddings de requêtes
+    QUERY_EMBEDDING_CACHE_SIZE = 1024  # Nombre maximal de requêtes mémorisées
+    QUERY_EMBEDDING_CACHE_TTL = 3600  # Durée de vie en secondes (0 = sans expiration)
+
+    # Regroupement des encodages de requêtes concurrentes (micro-batching)
+    EMBEDDING_BATCHING = True
+    EMBEDDING_BATCH_MAX_SIZE = 32  # Nombre maximal de questions encodées ensemble
+    EMBEDDING_BATCH_WINDOW_MS = 2  # Attente maximale pour compléter un lot (millisecondes)
+
+    # Cache des réponses complètes (invalidé à chaque changement du corpus)
+    RESPONSE_CACHE_SIZE = 512  # Nombre maximal de réponses en mémoire
+    RESPONSE_CACHE_TTL = 0  # Durée de vie en secondes (0 = sans expiration)
+    RESPONSE_CACHE_PATH = None  # Ex: "./cache/responses.sqlite" pour persister sur disque
 
     # Configuration du modèle de génération
     USE_LOCAL_MODEL = False  # Utiliser un modèle local ou l'API
-    LOCAL_MODEL_NAME = "microsoft/DialoGPT-medium"
+    LOCAL_MODEL_NAME = "Qwen/Qwen2.5-0.5B-Instruct"  # Petit modèle instruit et multilingue, adapté au CPU
+    LOCAL_MODEL_WORKERS = 1  # Générations simultanées
+    LOCAL_MODEL_THREADS = 0  # Threads torch (0 = valeur par défaut de torch)
+    LOCAL_MODEL_MAX_PENDING = 4  # Demandes en file au-delà desquelles on répond par les modèles de réponse
+    LOCAL_MODEL_QUEUE_TIMEOUT = 2.0  # Attente maximale dans la file avant repli (secondes)
+    LOCAL_MODEL_MAX_NEW_TOKENS = 160  # Longueur maximale d'une réponse générée
+    LOCAL_MODEL_CONTEXT_CHARS = 1500  # Taille maximale du contexte injecté dans le prompt
 
     # Chemins des données
     DATA_JSON_PATH = "./data/burkina_tourism_data.json"
@@ -40,10 +101,21 @@ class Config:
     STREAMLIT_THEME = "light"
     MAX_MESSAGE_HISTORY = 50
 
+    # Configuration de l'API HTTP (api.py)
+    API_HOST = "0.0.0.0"
+    API_PORT = 8000
+    API_WORKERS = 1  # Processus derrière le même port (chacun charge son propre chatbot)
+    API_THREADS = 4  # Threads par processus pour l'encodage et la recherche
+    API_MAX_PENDING = 32  # Requêtes en cours au-delà desquelles l'API répond 503
+
     # Paramètres de génération de réponses
     MAX_RESPONSE_LENGTH = 500
     TEMPERATURE = 0.7
 
+    # Instrumentation (metrics.py) : durées par étape et compteurs, exposés par GET /metrics
+    METRICS_ENABLED = False
+    METRICS_JSON_LOGS = False  # Une ligne JSON par requête avec la durée de chaque étape
+
     # Mode debug
     DEBUG = True
 
@@ -51,8 +123,19 @@ class Config:
 # Instance de configuration
 config = Config()
 
-# Affichage de la configuration au démarrage
-if config.DEBUG:
+
+def load_environment():
+    """Charge les variables du fichier .env et met à jour les clés d'API de la configuration ;
+    appelée explicitement par les points d'entrée (app.py, api.py, scripts en ligne de commande)"""
+    load_dotenv()
+    Config.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    Config.HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
+
+
+def print_config(config: Config = config):
+    """Affiche la configuration (mode debug) ; appelée explicitement par les scripts de lancement"""
+    if not config.DEBUG:
+        return
     print("=" * 60)
     print("CONFIGURATION DU CHATBOT BURKINA FASO")
     print("=" * 60)
@@ -71,4 +154,9 @@ if config.DEBUG:
     print(f"✓ MAX_MESSAGE_HISTORY: {config.MAX_MESSAGE_HISTORY}")
     print(f"✓ MAX_RESPONSE_LENGTH: {config.MAX_RESPONSE_LENGTH}")
     print(f"✓ TEMPERATURE: {config.TEMPERATURE}")
-    print("=" * 60)
\ No newline at end of file
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    load_environment()
+    print_config()
@@ -0,0 +1,168 @@
+"""
+Cache persistant des embeddings du corpus, adressé par le contenu
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier entre processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """Stocke les vecteurs calculés par un modèle, indexés par empreinte (modèle + texte).
+
+    Les vecteurs sont ajoutés à la suite dans un fichier float32 brut lu par memory-map ;
+    un index JSON associe l'empreinte de chaque texte à sa ligne. Le répertoire peut être
+    partagé entre plusieurs processus ou nœuds pour éviter de ré-encoder un corpus déjà
+    vu : les écritures se font sous un verrou `fcntl.flock` exclusif, après relecture de
+    l'index sur disque, et les lectures rechargent l'index lorsqu'il a changé. Le verrou
+    n'existe pas sous Windows et dépend du système de fichiers partagé (NFS doit le
+    prendre en charge) : sans lui, un seul processus doit écrire dans le répertoire.
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        self.model_name = model_name
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.directory = os.path.join(directory, slug)
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.lock_path = os.path.join(self.directory, "lock")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._mmap: Optional[np.memmap] = None
+        self._index_signature = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._reload_index()
+        if self._rows:
+            logger.info(f"Cache d'embeddings: {len(self._rows)} vecteurs disponibles")
+
+    def _reload_index(self):
+        """Relit l'index sur disque s'il a changé depuis la dernière lecture (écrit par un autre processus)"""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._index_signature:
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self._dim = index.get("dim", self._dim)
+        # Les lignes déjà attribuées ne changent jamais : l'index sur disque les contient toutes
+        self._rows.update(index.get("rows", {}))
+        self._index_signature = signature
+
+    @contextmanager
+    def _exclusive(self):
+        """Verrou exclusif entre processus sur le répertoire (sans effet si fcntl est indisponible)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def key(self, text: str) -> str:
+        """Empreinte d'un texte pour le modèle courant"""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _row_count(self) -> int:
+        """Nombre de lignes complètes présentes dans le fichier de vecteurs"""
+        if self._dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self._dim * 4)
+
+    def _vectors(self) -> np.memmap:
+        """Vue memory-map du fichier de vecteurs, rouverte lorsqu'il a grandi"""
+        rows = self._row_count()
+        if self._mmap is None or self._mmap.shape[0] != rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self._dim))
+        return self._mmap
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Retourne le vecteur mémorisé de chaque texte, ou None s'il est inconnu"""
+        with self._lock:
+            keys = [self.key(text) for text in texts]
+            if any(key not in self._rows for key in keys):
+                self._reload_index()
+            rows = [self._rows.get(key) for key in keys]
+            if all(row is None for row in rows):
+                return [None] * len(texts)
+            vectors = self._vectors()
+            return [np.array(vectors[row]) if row is not None else None for row in rows]
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Ajoute des vecteurs au cache (les textes déjà connus sont ignorés)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._exclusive():
+            # Lignes ajoutées par les autres processus depuis la dernière lecture
+            self._reload_index()
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Dimension {vectors.shape[1]} incompatible avec le cache ({self._dim})")
+
+            # Une écriture interrompue peut laisser une ligne partielle : on la tronque
+            next_row = self._row_count()
+            if os.path.exists(self.vectors_path):
+                with open(self.vectors_path, 'r+b') as f:
+                    f.truncate(next_row * self._dim * 4)
+
+            new_rows = {}
+            to_write = []
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self._rows or key in new_rows:
+                    continue
+                new_rows[key] = next_row + len(to_write)
+                to_write.append(vector)
+
+            if not to_write:
+                return
+
+            # Vecteurs d'abord, index ensuite : l'index ne référence jamais une ligne absente
+            with open(self.vectors_path, 'ab') as f:
+                f.write(np.stack(to_write).astype(np.float32).tobytes())
+            self._rows.update(new_rows)
+
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"model": self.model_name, "dim": self._dim, "rows": self._rows}, f)
+            os.replace(tmp_path, self.index_path)
+            stat = os.stat(self.index_path)
+            self._index_signature = (stat.st_mtime_ns, stat.st_size)
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Encode les textes en ne calculant que ceux absents du cache"""
+        cached = self.get_many(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        logger.info(f"Cache d'embeddings: {len(texts) - len(missing)} réutilisés, {len(missing)} à calculer")
+
+        if missing:
+            computed = np.asarray(encoder([texts[i] for i in missing]), dtype=np.float32)
+            self.put_many([texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                cached[i] = vector
+
+        return np.stack(cached) if cached else np.empty((0, self._dim or 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._rows)
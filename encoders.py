@@ -0,0 +1,222 @@
+"""
+Backends d'inférence du modèle d'embeddings : PyTorch (sentence-transformers) ou ONNX Runtime
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Phrases de contrôle pour comparer les embeddings ONNX à ceux de PyTorch
+VERIFICATION_TEXTS = [
+    "Quels sont les sites touristiques incontournables ?",
+    "Où dormir à Ouagadougou ?",
+    "Combien coûte l'entrée du parc national d'Arly ?",
+    "Les cascades de Karfiguéla sont situées près de Banfora.",
+    "Comment aller de Ouaga à Bobo-Dioulasso en bus ?",
+    "Bonjour",
+]
+
+
+def create_encoder(config):
+    """Crée l'encodeur configuré (`Config.EMBEDDING_BACKEND`)
+
+    Le backend ONNX se replie sur PyTorch si ONNX Runtime n'est pas installé ou si
+    l'export ne respecte pas la tolérance fixée par `Config.ONNX_TOLERANCE`.
+    """
+    if config.EMBEDDING_BACKEND == "onnx":
+        try:
+            return OnnxEncoder(
+                config.EMBEDDING_MODEL,
+                cache_dir=config.ONNX_CACHE_DIR,
+                quantize=config.ONNX_QUANTIZE,
+                intra_op_threads=config.ONNX_INTRA_OP_THREADS,
+                inter_op_threads=config.ONNX_INTER_OP_THREADS,
+                tolerance=config.ONNX_TOLERANCE
+            )
+        except ImportError as e:
+            logger.warning(f"ONNX Runtime indisponible ({e}), utilisation de PyTorch")
+        except ValueError as e:
+            logger.error(f"Export ONNX rejeté: {e}, utilisation de PyTorch")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(config.EMBEDDING_MODEL)
+
+
+def encoder_id(encoder, model_name: str) -> str:
+    """Identifiant des vecteurs produits par un encodeur (clé des caches d'embeddings)"""
+    return getattr(encoder, "model_id", model_name)
+
+
+def max_deviation(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Écart maximal de similarité cosinus entre deux séries d'embeddings (1 - cos)"""
+    reference = reference / np.maximum(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12)
+    candidate = candidate / np.maximum(np.linalg.norm(candidate, axis=1, keepdims=True), 1e-12)
+    return float(np.max(1.0 - np.sum(reference * candidate, axis=1)))
+
+
+class OnnxEncoder:
+    """Encodeur servi par ONNX Runtime, avec la même méthode `encode` que SentenceTransformer.
+
+    Le transformeur est exporté une seule fois en ONNX (puis quantifié en int8 dynamique
+    si demandé) dans `cache_dir` ; le pooling et la normalisation du modèle
+    sentence-transformers sont reproduits en NumPy. À l'export, les embeddings sont
+    comparés à ceux de PyTorch : au-delà de `tolerance`, l'export est refusé.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = "./onnx_cache", quantize: bool = True,
+                 intra_op_threads: int = 0, inter_op_threads: int = 1, tolerance: float = 0.02,
+                 batch_size: int = 32):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.model_id = f"{model_name}@onnx{'-int8' if quantize else ''}"
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.directory = os.path.join(cache_dir, slug)
+        self.model_path = os.path.join(self.directory, "model.int8.onnx" if quantize else "model.onnx")
+        meta_path = os.path.join(self.directory, "meta.json")
+
+        meta = self._load_meta(meta_path)
+        if meta is None or not os.path.exists(self.model_path):
+            meta = self._export(meta_path, tolerance)
+        self.meta = meta
+
+        deviation = meta["deviation"]["int8" if quantize else "fp32"]
+        if deviation > tolerance:
+            raise ValueError(f"écart {deviation:.4f} > tolérance {tolerance}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(self.directory)
+        logger.info(f"Encodeur ONNX chargé: {self.model_path} (écart max {deviation:.4f})")
+
+    def _load_meta(self, meta_path: str) -> Optional[Dict]:
+        """Métadonnées d'un export complet (écrites en dernier), ou None"""
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name:
+            return None
+        if self.quantize and "int8" not in meta.get("deviation", {}):
+            return None
+        return meta
+
+    def _export(self, meta_path: str, tolerance: float) -> Dict:
+        """Exporte le modèle PyTorch en ONNX, le quantifie et mesure l'écart avec l'original"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Export ONNX du modèle {self.model_name}...")
+        reference = SentenceTransformer(self.model_name, device="cpu")
+        transformer = reference[0]
+        pooling = next((m for m in reference if hasattr(m, "get_pooling_mode_str")), None)
+        meta = {
+            "model": self.model_name,
+            "pooling": pooling.get_pooling_mode_str() if pooling is not None else "mean",
+            "normalize": any(type(m).__name__ == "Normalize" for m in reference),
+            "max_seq_length": int(transformer.max_seq_length),
+            "deviation": {},
+        }
+
+        tmp_dir = f"{self.directory}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        transformer.tokenizer.save_pretrained(tmp_dir)
+
+        class TokenEmbeddings(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, input_ids, attention_mask):
+                return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+        sample = transformer.tokenizer(VERIFICATION_TEXTS[:2], padding=True, return_tensors="pt")
+        fp32_path = os.path.join(tmp_dir, "model.onnx")
+        dynamic = {0: "batch", 1: "sequence"}
+        with torch.no_grad():
+            torch.onnx.export(
+                TokenEmbeddings(transformer.auto_model.eval()),
+                (sample["input_ids"], sample["attention_mask"]),
+                fp32_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["token_embeddings"],
+                dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "token_embeddings": dynamic},
+                opset_version=14
+            )
+
+        paths = {"fp32": fp32_path}
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            paths["int8"] = os.path.join(tmp_dir, "model.int8.onnx")
+            quantize_dynamic(fp32_path, paths["int8"], weight_type=QuantType.QInt8)
+
+        # Vérification : mêmes phrases encodées par PyTorch et par chaque export
+        expected = reference.encode(VERIFICATION_TEXTS)
+        self.tokenizer = transformer.tokenizer
+        self.meta = meta
+        import onnxruntime as ort
+        for variant, path in paths.items():
+            self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+            meta["deviation"][variant] = max_deviation(expected, self.encode(VERIFICATION_TEXTS))
+            logger.info(f"Écart ONNX {variant} / PyTorch: {meta['deviation'][variant]:.5f} (tolérance {tolerance})")
+
+        with open(os.path.join(tmp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(os.path.dirname(self.directory) or ".", exist_ok=True)
+        os.replace(tmp_dir, self.directory)
+        return meta
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Reproduit le module de pooling sentence-transformers"""
+        if self.meta["pooling"] == "cls":
+            return token_embeddings[:, 0]
+        mask = attention_mask[..., None].astype(np.float32)
+        if self.meta["pooling"] == "max":
+            return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+        return (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False, batch_size: Optional[int] = None,
+               **kwargs) -> np.ndarray:
+        """Encode des textes en embeddings float32 (une ligne par texte)"""
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size=batch_size)[0]
+        batch_size = batch_size or self.batch_size
+        # Tri par longueur : moins de remplissage dans chaque lot
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        for start in range(0, len(texts), batch_size):
+            indices = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [texts[i] for i in indices], padding=True, truncation=True,
+                max_length=self.meta["max_seq_length"], return_tensors="np"
+            )
+            inputs = {
+                "input_ids": tokens["input_ids"].astype(np.int64),
+                "attention_mask": tokens["attention_mask"].astype(np.int64),
+            }
+            token_embeddings = self.session.run(None, inputs)[0]
+            pooled = self._pool(token_embeddings, inputs["attention_mask"])
+            if self.meta["normalize"]:
+                pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            for i, vector in zip(indices, pooled.astype(np.float32)):
+                embeddings[i] = vector
+
+        return np.stack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
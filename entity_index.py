@@ -0,0 +1,156 @@
+"""
+Dictionnaire des entités nommées du corpus (sites, hébergements, restaurants) : variantes de noms
+sans accents, abréviations des villes, recherche directe des documents d'une entité
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from lexical_index import tokenize
+
+# Abréviations courantes des villes, développées dans les noms comme dans les questions
+CITY_ALIASES = {
+    "ouaga": ("ouagadougou",),
+    "bobo": ("bobo", "dioulasso"),
+}
+
+# Mots génériques ôtés en tête d'un nom pour obtenir sa partie distinctive
+# ("Cascades de Karfiguéla" -> "karfiguela"), sous leur forme tokenisée
+GENERIC_WORDS = frozenset("""
+hotel auberge campement lodge restaurant maqui chez parc national nationale village lac mare pic
+ruine dome cascade mosquee musee ranch grand grande site
+""".split())
+
+# Variantes trop générales pour désigner une entité
+BLOCKED_VARIANTS = frozenset({"burkina", "faso", "burkina faso"})
+
+# Ordre de préférence des types de fiches lorsqu'une variante désigne plusieurs entités
+# ("Karfiguéla" : les cascades avant le campement)
+TYPE_PREFERENCE = ("site_touristique", "hebergement", "restaurant")
+
+
+def entity_tokens(text: str) -> List[str]:
+    """Termes normalisés (voir `tokenize`) avec les abréviations de villes développées"""
+    tokens = tokenize(text)
+    expanded = []
+    for i, token in enumerate(tokens):
+        alias = CITY_ALIASES.get(token)
+        if alias is None or tuple(tokens[i:i + len(alias)]) == alias:
+            expanded.append(token)
+        else:
+            expanded.extend(alias)
+    return expanded
+
+
+def name_variants(name: str) -> Set[str]:
+    """Formes sous lesquelles un nom peut apparaître dans une question"""
+    tokens = entity_tokens(name)
+    variants = {" ".join(tokens)}
+
+    # Partie distinctive : "Hôtel Splendid" -> "splendid", "Le Gondwana" -> "gondwana"
+    start = 0
+    while start < len(tokens) - 1 and tokens[start] in GENERIC_WORDS:
+        start += 1
+    variants.add(" ".join(tokens[start:]))
+
+    # Tête descriptive d'au moins deux termes : "Musée National du Burkina Faso" -> "musee national"
+    for separator in (" du ", " de ", " des ", " d'"):
+        head = name.lower().split(separator)[0]
+        head_tokens = entity_tokens(head)
+        if head != name.lower() and len(head_tokens) >= 2:
+            variants.add(" ".join(head_tokens))
+
+    return {v for v in variants if len(v) >= 4 and v not in BLOCKED_VARIANTS and not v.isdigit()}
+
+
+class EntityIndex:
+    """Table variante de nom -> entités -> documents, construite à partir des métadonnées `nom`.
+
+    Une question est découpée en termes normalisés ; ses n-grammes (du plus long au
+    plus court, sans chevauchement) sont cherchés dans la table, soit quelques accès
+    à un dictionnaire par question. Les variantes égales au nom d'une ville comptant
+    plusieurs entités sont ignorées ("Mosquée de Bobo-Dioulasso" n'est pas trouvée
+    par "Bobo"). Une variante partagée par plusieurs entités les donne dans l'ordre :
+    nom complet avant partie distinctive, puis sites, hébergements et restaurants.
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Optional[Dict]]):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [meta or {} for meta in metadatas]
+        self.rows_by_entity: Dict[str, List[int]] = {}
+        for row, metadata in enumerate(self.metadatas):
+            name = metadata.get("nom")
+            if name:
+                self.rows_by_entity.setdefault(name, []).append(row)
+
+        # Villes accueillant plusieurs entités : leur nom seul ne désigne aucune d'elles
+        entities_by_city: Dict[str, Set[str]] = {}
+        for name, rows in self.rows_by_entity.items():
+            city = self.metadatas[rows[0]].get("ville")
+            if city:
+                entities_by_city.setdefault(" ".join(entity_tokens(city)), set()).add(name)
+        shared_cities = {city for city, names in entities_by_city.items() if len(names) > 1}
+
+        self.entities_by_variant: Dict[str, Set[str]] = {}
+        for name in self.rows_by_entity:
+            for variant in name_variants(name) - shared_cities:
+                self.entities_by_variant.setdefault(variant, set()).add(name)
+        self.max_variant_tokens = max((len(v.split()) for v in self.entities_by_variant), default=0)
+        self.full_names = {name: " ".join(entity_tokens(name)) for name in self.rows_by_entity}
+        self.type_ranks = {}
+        for name, rows in self.rows_by_entity.items():
+            types = {self.metadatas[row].get("type") for row in rows}
+            self.type_ranks[name] = next(
+                (rank for rank, kind in enumerate(TYPE_PREFERENCE) if kind in types), len(TYPE_PREFERENCE)
+            )
+
+    def _rank(self, name: str, variant: str) -> Tuple[bool, int, str]:
+        """Clé de tri des entités partageant une variante"""
+        return self.full_names[name] != variant, self.type_ranks[name], name
+
+    def match(self, query: str) -> List[str]:
+        """Entités nommées dans la question (plus longues correspondances d'abord)"""
+        tokens = entity_tokens(query)
+        found: List[str] = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.max_variant_tokens, len(tokens) - i), 0, -1):
+                variant = " ".join(tokens[i:i + n])
+                names = self.entities_by_variant.get(variant)
+                if names:
+                    found.extend(sorted(names - set(found), key=lambda name: self._rank(name, variant)))
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def lookup(self, query: str, category: Optional[str] = None) -> Optional[List[int]]:
+        """Documents des entités nommées dans la question, ou None.
+
+        Si une catégorie est détectée, au moins un document des entités doit en relever
+        (sinon la question porte sur autre chose que l'entité, ex. un hôtel près d'un site) ;
+        les documents de cette catégorie viennent en premier.
+        """
+        names = self.match(query)
+        if not names:
+            return None
+        rows = [row for name in names for row in self.rows_by_entity[name]]
+        if category is not None:
+            if not any(self.metadatas[row].get("category") == category for row in rows):
+                return None
+            rows.sort(key=lambda row: self.metadatas[row].get("category") != category)
+        return rows
+
+    def as_results(self, rows: List[int]) -> Dict[str, List]:
+        """Résultats au format d'une question Chroma (correspondance exacte : distance nulle)"""
+        return {
+            "ids": [self.ids[row] for row in rows],
+            "documents": [self.documents[row] for row in rows],
+            "metadatas": [self.metadatas[row] for row in rows],
+            "distances": [0.0] * len(rows),
+        }
+
+    def stats(self) -> Tuple[int, int]:
+        """Nombre d'entités et de variantes de noms"""
+        return len(self.rows_by_entity), len(self.entities_by_variant)
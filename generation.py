@@ -0,0 +1,194 @@
+"""
+Génération de réponses par un modèle de langage local (RAG), servie par un pool borné
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "Tu es un assistant touristique pour le Burkina Faso. Réponds en français, de façon "
+    "concise et pratique, uniquement à partir des informations fournies. Si elles ne "
+    "permettent pas de répondre, dis-le simplement."
+)
+
+
+class GenerationOverloaded(RuntimeError):
+    """Le pool de génération est saturé ou la demande a trop attendu dans la file"""
+
+
+class LocalGenerator:
+    """Modèle causal local exécuté sur CPU par un nombre fixe de workers.
+
+    Au plus `workers` générations tournent en parallèle et `max_pending` attendent
+    dans la file ; au-delà, ou si une demande n'est pas prise en charge par un worker
+    dans les `queue_timeout` secondes, elle est retirée de la file, `GenerationOverloaded`
+    est levée aussitôt et l'appelant se replie sur les réponses mises en forme. La
+    longueur de chaque réponse est bornée par `max_new_tokens`.
+    """
+
+    def __init__(self, model_name: str, workers: int = 1, max_pending: int = 4,
+                 queue_timeout: float = 2.0, max_new_tokens: int = 160, temperature: float = 0.7,
+                 max_context_chars: int = 1500, threads: int = 0):
+        self.model_name = model_name
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.max_context_chars = max_context_chars
+        self.threads = threads
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="generation")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.model = None
+        self.tokenizer = None
+        self.generated = 0
+        self.rejected = 0
+        self.expired = 0
+        self.errors = 0
+        self.generation_seconds = 0.0
+
+    def load(self):
+        """Charge le tokenizer et le modèle (une seule fois)"""
+        if self.model is not None:
+            return
+        with self._load_lock:
+            if self.model is not None:
+                return
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+
+            start = time.perf_counter()
+            if self.threads:
+                torch.set_num_threads(self.threads)
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModelForCausalLM.from_pretrained(self.model_name)
+            model.eval()
+            if tokenizer.pad_token_id is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            self.tokenizer = tokenizer
+            self.model = model
+            logger.info(f"Modèle de génération chargé: {self.model_name} ({time.perf_counter() - start:.1f}s)")
+
+    def build_prompt(self, query: str, context: List[str]) -> str:
+        """Prompt RAG : consignes, extraits retrouvés (tronqués) et question"""
+        snippets = []
+        budget = self.max_context_chars
+        for document in context:
+            if budget <= 0:
+                break
+            snippet = document.strip()[:budget]
+            snippets.append(f"- {snippet}")
+            budget -= len(snippet)
+        user = f"Informations :\n{chr(10).join(snippets)}\n\nQuestion : {query}"
+
+        if getattr(self.tokenizer, "chat_template", None):
+            messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": user}]
+            return self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        return f"{SYSTEM_PROMPT}\n\n{user}\nRéponse :"
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise GenerationOverloaded("file de génération pleine")
+
+    def _submit(self, prompt: str, streamer=None) -> Future:
+        """Met une génération en file et attend qu'un worker la prenne en charge.
+
+        Passé `queue_timeout` secondes sans prise en charge, la demande est annulée
+        (sa place dans la file est libérée) et GenerationOverloaded levée sans attendre
+        la fin des générations en cours.
+        """
+        self._acquire_slot()
+        started = threading.Event()
+        future = self._executor.submit(self._run, prompt, started, time.perf_counter(), streamer)
+        future.add_done_callback(lambda _: self._slots.release())
+        # Un worker a pu la prendre entre l'expiration de l'attente et l'annulation : elle se poursuit
+        if not started.wait(self.queue_timeout) and future.cancel():
+            with self._stats_lock:
+                self.expired += 1
+            raise GenerationOverloaded(f"aucun worker disponible en {self.queue_timeout:.1f}s")
+        return future
+
+    def _run(self, prompt: str, started: threading.Event, enqueued: float, streamer=None) -> str:
+        """Exécuté par un worker : signale la prise en charge puis génère une réponse bornée"""
+        started.set()
+        try:
+            waited = time.perf_counter() - enqueued
+
+            import torch
+            self.load()
+            start = time.perf_counter()
+            inputs = self.tokenizer(prompt, return_tensors="pt")
+            options: Dict[str, Any] = {
+                "max_new_tokens": self.max_new_tokens,
+                "pad_token_id": self.tokenizer.pad_token_id,
+                "do_sample": self.temperature > 0,
+            }
+            if self.temperature > 0:
+                options["temperature"] = self.temperature
+            if streamer is not None:
+                options["streamer"] = streamer
+            with torch.no_grad():
+                output = self.model.generate(**inputs, **options)
+
+            new_tokens = output[0][inputs["input_ids"].shape[1]:]
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.generated += 1
+                self.generation_seconds += elapsed
+            logger.info(f"Génération: attente {waited * 1000:.0f} ms, {len(new_tokens)} tokens en "
+                        f"{elapsed * 1000:.0f} ms")
+            return self.tokenizer.decode(new_tokens, skip_special_tokens=True).strip()
+        except Exception as e:
+            with self._stats_lock:
+                self.errors += 1
+            logger.error(f"Erreur lors de la génération: {e}")
+            raise
+        finally:
+            if streamer is not None:
+                streamer.end()
+
+    def generate(self, query: str, context: List[str]) -> str:
+        """Génère une réponse complète (bloquant) ; lève GenerationOverloaded sous surcharge"""
+        self.load()
+        prompt = self.build_prompt(query, context)
+        return self._submit(prompt).result()
+
+    def stream(self, query: str, context: List[str]) -> Iterator[str]:
+        """Génère une réponse fragment par fragment ; la surcharge est signalée avant tout fragment"""
+        from transformers import TextIteratorStreamer
+
+        self.load()
+        prompt = self.build_prompt(query, context)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        return self._iterate(streamer, self._submit(prompt, streamer))
+
+    @staticmethod
+    def _iterate(streamer, future) -> Iterator[str]:
+        for text in streamer:
+            if text:
+                yield text
+        # Fait remonter l'erreur du worker (aucun fragment produit dans ce cas)
+        future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du pool de génération"""
+        with self._stats_lock:
+            return {
+                "model": self.model_name,
+                "loaded": self.model is not None,
+                "workers": self.workers,
+                "generated": self.generated,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "errors": self.errors,
+                "mean_generation_ms": round(1000 * self.generation_seconds / self.generated, 1)
+                if self.generated else 0.0,
+            }
@@ -0,0 +1,256 @@
+"""
+Index géographique des fiches (sites, hébergements, restaurants) : coordonnées extraites des
+métadonnées (`coordonnees`, à défaut centre de la ville), grille régulière pour les questions
+de proximité ("hôtels près des cascades de Karfiguéla", "que voir autour de Banfora")
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from entity_index import entity_tokens
+from structured_index import KIND_PATTERNS
+from text_utils import fold_accents
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.2
+
+# Centres approximatifs des villes du corpus (latitude, longitude) : position de repli des
+# fiches sans coordonnées et point de départ des questions "près de <ville>"
+CITY_COORDINATES = {
+    "Ouagadougou": (12.37, -1.52),
+    "Bobo-Dioulasso": (11.18, -4.30),
+    "Banfora": (10.63, -4.76),
+    "Diapaga": (12.07, 1.79),
+    "Loropéni": (10.30, -3.53),
+    "Gaoua": (10.33, -3.18),
+    "Tiébélé": (11.10, -0.97),
+    "Sabou": (12.07, -2.23),
+    "Sindou": (10.67, -5.17),
+    "Parc de Nazinga": (11.15, -1.60),
+    "Koudougou": (12.25, -2.37),
+    "Ouahigouya": (13.58, -2.42),
+    "Fada N'Gourma": (12.06, 0.36),
+    "Kaya": (13.09, -1.08),
+    "Dori": (14.03, -0.03),
+}
+
+# Types de documents principaux des fiches localisables
+ENTITY_TYPES = ("site_touristique", "hebergement", "restaurant")
+
+_COORDINATES = re.compile(
+    r"(\d{1,2}(?:[.,]\d+)?)\s*°?\s*([ns])\s*,?\s*(\d{1,3}(?:[.,]\d+)?)\s*°?\s*([ewo])\b"
+)
+# Mots entiers : "pres" ne doit pas être trouvé dans "présentez", "prestations" ou "presque"
+_NEAR = re.compile(
+    r"\b(?:pres|proches?|autour|a cote|aux alentours|non loin|a proximite|environs)\b\s*(?:des|du|de|d')?"
+)
+_WITHIN = re.compile(r"\bmoins de \d+\s*km\s*(?:des|du|de|d')")
+_RADIUS = re.compile(r"(?:moins de|rayon de|dans les|a|max(?:imum)?)\s*(\d+)\s*km\b")
+
+
+def parse_coordinates(text: str) -> Optional[Tuple[float, float]]:
+    """Latitude et longitude en degrés signés ("10.63°N, 4.56°W" -> (10.63, -4.56)), None si absentes"""
+    match = _COORDINATES.search(fold_accents(text or ""))
+    if match is None:
+        return None
+    lat, north_south, lon, east_west = match.groups()
+    lat = float(lat.replace(",", ".")) * (-1 if north_south == "s" else 1)
+    lon = float(lon.replace(",", ".")) * (-1 if east_west in "wo" else 1)
+    return lat, lon
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distances orthodromiques (km) d'un point à un ensemble de points"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """Grille régulière de cellules de `cell_deg` degrés sur les positions des fiches.
+
+    Les points sont triés par cellule et stockés dans deux tableaux contigus (latitude,
+    longitude) ; chaque cellule occupée pointe vers sa tranche. Une recherche par rayon
+    ne calcule les distances que dans les cellules recouvrant le cercle ; la recherche
+    des plus proches voisins parcourt les anneaux de cellules autour du point jusqu'à
+    ce qu'aucune cellule non visitée ne puisse contenir un point plus proche.
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Optional[Dict]],
+                 cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        # Une position par fiche : document principal, coordonnées exactes en priorité
+        chosen: Dict[str, int] = {}
+        for row, meta in enumerate(metadatas):
+            meta = meta or {}
+            name = meta.get("nom")
+            if not name or meta.get("type") not in ENTITY_TYPES:
+                continue
+            if name not in chosen or (meta.get("coordonnees") and not metadatas[chosen[name]].get("coordonnees")):
+                chosen[name] = row
+
+        self.city_centers = {
+            " ".join(entity_tokens(city)): (city, coords) for city, coords in CITY_COORDINATES.items()
+        }
+        points, precise = [], []
+        for name, row in chosen.items():
+            meta = metadatas[row]
+            coords = parse_coordinates(meta.get("coordonnees"))
+            exact = coords is not None
+            if coords is None:
+                coords = self.city_centers.get(" ".join(entity_tokens(meta.get("ville", ""))), (None, None))[1]
+            if coords is not None:
+                points.append((row, coords))
+                precise.append(exact)
+
+        cells = [self._cell(lat, lon) for _, (lat, lon) in points]
+        order = sorted(range(len(points)), key=lambda i: cells[i])
+        self.ids = [ids[points[i][0]] for i in order]
+        self.documents = [documents[points[i][0]] for i in order]
+        self.metadatas = [metadatas[points[i][0]] for i in order]
+        self.names = [meta["nom"] for meta in self.metadatas]
+        self._name_array = np.array(self.names, dtype=object)
+        self.row_by_name = {name: row for row, name in enumerate(self.names)}
+        self.kinds = np.array([meta.get("type", "") for meta in self.metadatas], dtype=object)
+        self.lats = np.array([points[i][1][0] for i in order], dtype=np.float64)
+        self.lons = np.array([points[i][1][1] for i in order], dtype=np.float64)
+        self.precise = np.array([precise[i] for i in order], dtype=bool)
+        self.size = len(order)
+
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        for position, i in enumerate(order):
+            start, _ = self._cells.get(cells[i], (position, position))
+            self._cells[cells[i]] = (start, position + 1)
+        if self._cells:
+            keys = np.array(list(self._cells))
+            self._bounds = (keys[:, 0].min(), keys[:, 0].max(), keys[:, 1].min(), keys[:, 1].max())
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def _gather(self, cells) -> np.ndarray:
+        """Lignes des points contenus dans les cellules données"""
+        slices = [self._cells[cell] for cell in cells if cell in self._cells]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in slices])
+
+    def _allowed(self, rows: np.ndarray, kinds: Optional[List[str]], exclude: Optional[List[str]]) -> np.ndarray:
+        mask = np.ones(len(rows), dtype=bool)
+        if kinds:
+            mask &= np.isin(self.kinds[rows], kinds)
+        if exclude:
+            mask &= ~np.isin(self._name_array[rows], exclude)
+        return rows[mask]
+
+    def within(self, lat: float, lon: float, radius_km: float, kinds: Optional[List[str]] = None,
+               exclude: Optional[List[str]] = None) -> List[Tuple[int, float]]:
+        """Points à au plus `radius_km` km, du plus proche au plus éloigné : [(ligne, distance)]"""
+        if not self.size:
+            return []
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + lat_span, 89.9))), 1e-6))
+        # Cellules recouvrant le cercle, limitées à l'emprise des cellules occupées
+        min_i, max_i, min_j, max_j = self._bounds
+        low, high = self._cell(lat - lat_span, lon - lon_span), self._cell(lat + lat_span, lon + lon_span)
+        rows = self._gather((i, j) for i in range(max(low[0], min_i), min(high[0], max_i) + 1)
+                            for j in range(max(low[1], min_j), min(high[1], max_j) + 1))
+        rows = self._allowed(rows, kinds, exclude)
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        keep = distances <= radius_km
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return [(int(rows[i]), float(distances[i])) for i in order]
+
+    def nearest(self, lat: float, lon: float, k: int, kinds: Optional[List[str]] = None,
+                exclude: Optional[List[str]] = None) -> List[Tuple[int, float]]:
+        """Les `k` points les plus proches : [(ligne, distance)]"""
+        if not self.size or k <= 0:
+            return []
+        ci, cj = self._cell(lat, lon)
+        min_i, max_i, min_j, max_j = self._bounds
+        max_ring = max(abs(ci - min_i), abs(ci - max_i), abs(cj - min_j), abs(cj - max_j))
+        rows_found: List[np.ndarray] = []
+        distances_found: List[np.ndarray] = []
+        best = np.empty(0)
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                cells = [(ci, cj)]
+            else:
+                cells = [(ci + di, cj + dj) for di in range(-ring, ring + 1) for dj in range(-ring, ring + 1)
+                         if max(abs(di), abs(dj)) == ring]
+            rows = self._allowed(self._gather(cells), kinds, exclude)
+            if len(rows):
+                rows_found.append(rows)
+                distances_found.append(haversine_km(lat, lon, self.lats[rows], self.lons[rows]))
+                best = np.sort(np.concatenate(distances_found))[:k]
+            # Distance minimale à une cellule hors des anneaux visités (longitudes au plus haut de l'anneau)
+            reach_deg = ring * self.cell_deg
+            top_lat = min(abs(lat) + (ring + 1) * self.cell_deg, 89.9)
+            bound_km = reach_deg * KM_PER_DEGREE * math.cos(math.radians(top_lat))
+            if len(best) == k and best[-1] <= bound_km:
+                break
+        if not rows_found:
+            return []
+        rows = np.concatenate(rows_found)
+        distances = np.concatenate(distances_found)
+        order = np.argsort(distances, kind="stable")[:k]
+        return [(int(rows[i]), float(distances[i])) for i in order]
+
+    def parse_query(self, query: str, match_names: Optional[Callable[[str], List[str]]] = None) -> Optional[Dict]:
+        """Question de proximité : lieu de référence (voir `locate`), rayon et types de fiches
+        cherchés (nommés avant "près de") ; None si ce n'en est pas une ou si le texte suivant
+        "près de" ne désigne ni des coordonnées, ni une fiche, ni une ville connue
+
+        `match_names` donne les noms de fiches cités dans ce texte (dictionnaire des entités).
+        """
+        folded = fold_accents(query)
+        near = _NEAR.search(folded) or _WITHIN.search(folded)
+        if near is None:
+            return None
+        anchor = folded[near.end():]
+        location = self.locate(anchor, match_names(anchor) if match_names is not None else [])
+        if location is None:
+            return None
+        radius = _RADIUS.search(folded)
+        head = folded[:near.start()]
+        return {
+            "anchor": anchor,
+            "location": location,
+            "radius_km": float(radius.group(1)) if radius else None,
+            "kinds": [kind for kind, pattern in KIND_PATTERNS.items() if pattern.search(head)] or None,
+        }
+
+    def locate(self, text: str, names: List[str]) -> Optional[Tuple[str, float, float]]:
+        """Lieu de référence (libellé, latitude, longitude) : coordonnées explicites, fiche nommée
+        (parmi `names`, trouvées par le dictionnaire des entités) ou ville connue"""
+        coords = parse_coordinates(text)
+        if coords is not None:
+            return f"{coords[0]:.2f}, {coords[1]:.2f}", coords[0], coords[1]
+        for name in names:
+            row = self.row_by_name.get(name)
+            if row is not None:
+                return name, float(self.lats[row]), float(self.lons[row])
+        tokens = f" {' '.join(entity_tokens(text))} "
+        for key in sorted(self.city_centers, key=len, reverse=True):
+            if f" {key} " in tokens:
+                city, (lat, lon) = self.city_centers[key]
+                return city, lat, lon
+        return None
+
+    def as_results(self, hits: List[Tuple[int, float]]) -> Dict[str, List]:
+        """Résultats au format d'une question Chroma (ordre des distances, distance nulle)"""
+        return {
+            "ids": [self.ids[row] for row, _ in hits],
+            "documents": [self.documents[row] for row, _ in hits],
+            "metadatas": [self.metadatas[row] for row, _ in hits],
+            "distances": [0.0] * len(hits),
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de fiches localisées (dont coordonnées exactes) et de cellules occupées"""
+        return {"fiches": self.size, "exactes": int(self.precise.sum()), "cellules": len(self._cells)}
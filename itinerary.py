@@ -0,0 +1,394 @@
+"""
+Planification d'itinéraires : graphe pondéré des trajets entre villes (liaisons de bus du
+corpus, trajets routiers estimés entre villes voisines), plus courts chemins mémorisés et
+circuits de plusieurs jours sous contrainte de durée et de budget
+"""
+
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache import LRUCache
+from entity_index import entity_tokens
+from geo_index import CITY_COORDINATES, haversine_km, parse_coordinates
+from structured_index import MONTHS, StructuredIndex
+from text_utils import fold_accents
+
+# Vitesse et tarif par km (à vol d'oiseau) des trajets estimés, à défaut de liaisons à calibrer
+DEFAULT_SPEED_KMH = 60.0
+DEFAULT_COST_PER_KM = 20.0
+# Durée et tarif d'une visite dont la fiche ne précise rien
+DEFAULT_VISIT_HOURS = 2.0
+
+# Un trajet : (ville de départ, ville d'arrivée, heures, FCFA, mode)
+Leg = Tuple[str, str, float, float, str]
+
+_LIAISON = re.compile(r"([^,(]+?)\s*\(\s*(\d+(?:[.,]\d+)?)\s*h[^,)]*,\s*(\d{1,3}(?:[ ,.]\d{3})+|\d+)\s*fcfa\s*\)")
+_AMOUNT = re.compile(r"(\d{1,3}(?:[ ,.]\d{3})+|\d+)\s*(?:fcfa|francs?\b|f\b)")
+_DAYS = re.compile(r"(\d+)\s*(?:jours|jour|j\b)")
+# Demande explicite de circuit ; "programme" et "plan" seuls ne suffisent pas ("programme du
+# FESPACO", "plan de Ouagadougou") : il leur faut une durée ou un mot de voyage
+_PLAN_WORDS = re.compile(
+    r"\bitineraire|\bcircuit|\broad ?trip|\bplanifi\w*\s+(?:un|une|mon|ma|notre|nos|mes|le|la)?\s*(?:voyage|sejour)"
+)
+_SCHEDULE_WORDS = re.compile(r"\bprogramme\b|\bplan\b")
+_STAY_WORDS = re.compile(r"voyage|sejour|vacances")
+_TRIP_WORDS = re.compile(r"visit|\bvoir\b|voyage|sejour|decouvrir")
+# Questions de coût ("quel budget pour un séjour de 10 jours ?") : réponse sur les tarifs, pas un circuit
+_BUDGET_WORDS = re.compile(r"\bbudget|\bcombien\b|\bcout|\bprix\b|\btarif")
+_ROUTE_WORDS = re.compile(r"\baller\b|\btrajet|\brejoindre|\bse rendre|\bvoyager|\bbus\b|\broute\b|->|→|\bdistance")
+
+
+def format_hours(hours: float) -> str:
+    """Durée lisible ("1h30", "4h")"""
+    minutes = int(round(hours * 60 / 15) * 15)
+    return f"{minutes // 60}h{minutes % 60:02d}" if minutes % 60 else f"{minutes // 60}h"
+
+
+def _round_fcfa(amount: float) -> float:
+    """Tarif estimé arrondi aux 500 FCFA"""
+    return max(500.0, round(amount / 500) * 500)
+
+
+class TravelPlanner:
+    """Graphe des villes du corpus et planificateur de circuits.
+
+    Les arêtes viennent des liaisons de bus des fiches transport ("Ouaga-Bobo (4h,
+    5000 FCFA)") ; chaque ville est en outre reliée par la route à ses `road_neighbours`
+    voisines les plus proches, avec une durée et un tarif estimés à partir de la distance,
+    calibrés sur les liaisons de bus. Les plus courts chemins (en heures) sont calculés
+    par Dijkstra et mémorisés par couple de villes.
+
+    Un circuit est cherché en profondeur sur l'ordre des villes à visiter, en élaguant
+    les branches qui dépassent la durée ou le budget, ou qui atteignent une ville avec
+    le même ensemble de villes visitées plus tard et plus cher qu'une branche déjà vue.
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Optional[Dict]],
+                 structured: StructuredIndex, day_hours: float = 8, road_neighbours: int = 3,
+                 cache_size: int = 1024):
+        self.day_hours = day_hours
+        self.city_names: Dict[str, str] = {}
+        self.positions: Dict[str, Tuple[float, float]] = {}
+        for city, coords in CITY_COORDINATES.items():
+            key = " ".join(entity_tokens(city))
+            self.city_names[key] = city
+            self.positions[key] = coords
+
+        # Fiches transport : liaisons directes et documents servis pour les questions de trajet
+        self.transport_rows = [row for row, meta in enumerate(metadatas) if (meta or {}).get("type") == "transport"]
+        self.transport_results = {
+            "ids": [ids[row] for row in self.transport_rows],
+            "documents": [documents[row] for row in self.transport_rows],
+            "metadatas": [metadatas[row] for row in self.transport_rows],
+            "distances": [0.0] * len(self.transport_rows),
+        }
+        bus_legs: List[Leg] = []
+        for row in self.transport_rows:
+            liaisons = metadatas[row].get("liaisons")
+            if liaisons:
+                mode = metadatas[row].get("mode", "transport").lower()
+                bus_legs.extend(self._parse_liaisons(liaisons, mode))
+
+        # Calibrage des trajets estimés sur les liaisons connues
+        distances = [self._distance(a, b) for a, b, _, _, _ in bus_legs]
+        if bus_legs and sum(distances) > 0:
+            self.speed_kmh = sum(distances) / sum(leg[2] for leg in bus_legs)
+            self.cost_per_km = sum(leg[3] for leg in bus_legs) / sum(distances)
+        else:
+            self.speed_kmh, self.cost_per_km = DEFAULT_SPEED_KMH, DEFAULT_COST_PER_KM
+
+        # Sites visitables : ville, durée et tarif de visite (aller-retour depuis la ville compris)
+        self.structured = structured
+        self.sites: Dict[str, List[Tuple[int, float, float]]] = {}
+        for row in range(structured.size):
+            if structured.kinds[row] != "site_touristique":
+                continue
+            city = self.resolve_city(structured.metadatas[row].get("ville", ""))
+            if city is None:
+                continue
+            hours = structured.duration_min[row]
+            hours = DEFAULT_VISIT_HOURS if np.isnan(hours) else float(hours)
+            price = structured.price_min[row]
+            price = 0.0 if np.isnan(price) else float(price)
+            coords = parse_coordinates(structured.metadatas[row].get("coordonnees"))
+            if coords is not None:
+                city_lat, city_lon = self.positions[city]
+                detour = 2 * float(haversine_km(city_lat, city_lon, np.array([coords[0]]), np.array([coords[1]]))[0])
+                hours += detour / self.speed_kmh
+                price += _round_fcfa(detour * self.cost_per_km)
+            self.sites.setdefault(city, []).append((row, hours, price))
+        for visits in self.sites.values():
+            visits.sort(key=lambda visit: (visit[1], visit[2]))
+
+        # Villes du graphe : villes des fiches et extrémités des liaisons
+        nodes = set(self.sites)
+        for meta in metadatas:
+            city = self.resolve_city((meta or {}).get("ville", ""))
+            if city is not None:
+                nodes.add(city)
+        nodes.update(leg[0] for leg in bus_legs)
+        nodes.update(leg[1] for leg in bus_legs)
+        self.nodes = sorted(nodes)
+
+        self.edges: Dict[str, List[Leg]] = {node: [] for node in self.nodes}
+        for a, b, hours, cost, mode in bus_legs:
+            self.edges[a].append((a, b, hours, cost, mode))
+            self.edges[b].append((b, a, hours, cost, mode))
+        for node in self.nodes:
+            others = sorted((self._distance(node, other), other) for other in self.nodes if other != node)
+            for distance, other in others[:road_neighbours]:
+                leg = (distance / self.speed_kmh, _round_fcfa(distance * self.cost_per_km))
+                for a, b in ((node, other), (other, node)):
+                    if not any(edge[1] == b and edge[4] == "route" for edge in self.edges[a]):
+                        self.edges[a].append((a, b, leg[0], leg[1], "route"))
+        self.bus_legs = bus_legs
+        self._routes = LRUCache(max_size=cache_size)
+        self._plans = LRUCache(max_size=cache_size)
+
+    def _parse_liaisons(self, text: str, mode: str) -> List[Leg]:
+        """Liaisons "Ouaga-Bobo (4h, 5000 FCFA)" dont les deux villes sont connues"""
+        legs = []
+        for endpoints, hours, cost in _LIAISON.findall(fold_accents(text)):
+            # Le tiret sépare les deux villes mais peut aussi appartenir à un nom ("Bobo-Dioulasso")
+            parts = endpoints.strip().split("-")
+            for cut in range(1, len(parts)):
+                a = self.resolve_city("-".join(parts[:cut]))
+                b = self.resolve_city("-".join(parts[cut:]))
+                if a is not None and b is not None and a != b:
+                    legs.append((a, b, float(hours.replace(",", ".")), float(re.sub(r"[ ,.]", "", cost)), mode))
+                    break
+        return legs
+
+    def _distance(self, a: str, b: str) -> float:
+        lat, lon = self.positions[a]
+        other_lat, other_lon = self.positions[b]
+        return float(haversine_km(lat, lon, np.array([other_lat]), np.array([other_lon]))[0])
+
+    def resolve_city(self, text: str) -> Optional[str]:
+        """Clé de la ville désignée par un texte ("Ouaga", "Bobo-Dioulasso"), None si inconnue"""
+        key = " ".join(entity_tokens(text or ""))
+        return key if key in self.city_names else None
+
+    def find_cities(self, text: str) -> List[str]:
+        """Villes citées dans un texte, dans l'ordre d'apparition"""
+        tokens = entity_tokens(text)
+        found = []
+        i = 0
+        while i < len(tokens):
+            for n in (3, 2, 1):
+                key = " ".join(tokens[i:i + n])
+                if key in self.city_names and len(tokens[i:i + n]) == n:
+                    if key not in found:
+                        found.append(key)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def route(self, origin: str, destination: str) -> Optional[Tuple[List[Leg], float, float]]:
+        """Trajet le plus rapide entre deux villes : (trajets, heures, FCFA), mémorisé ; None si impossible"""
+        key = (origin, destination)
+        cached = self._routes.get(key)
+        if cached is not None:
+            return cached or None
+        result = self._dijkstra(origin, destination)
+        # Trajet impossible mémorisé lui aussi (valeur vide)
+        self._routes.put(key, result or ())
+        return result
+
+    def _dijkstra(self, origin: str, destination: str) -> Optional[Tuple[List[Leg], float, float]]:
+        if origin not in self.edges or destination not in self.edges:
+            return None
+        if origin == destination:
+            return [], 0.0, 0.0
+        best = {origin: (0.0, 0.0)}
+        previous: Dict[str, Leg] = {}
+        heap = [(0.0, 0.0, origin)]
+        while heap:
+            hours, cost, node = heapq.heappop(heap)
+            if node == destination:
+                break
+            if (hours, cost) > best[node]:
+                continue
+            for leg in self.edges[node]:
+                candidate = (hours + leg[2], cost + leg[3])
+                if leg[1] not in best or candidate < best[leg[1]]:
+                    best[leg[1]] = candidate
+                    previous[leg[1]] = leg
+                    heapq.heappush(heap, (candidate[0], candidate[1], leg[1]))
+        if destination not in best:
+            return None
+        legs = []
+        node = destination
+        while node != origin:
+            legs.append(previous[node])
+            node = previous[node][0]
+        legs.reverse()
+        return legs, best[destination][0], best[destination][1]
+
+    def plan(self, start: str, days: int, budget: Optional[float] = None, month: Optional[int] = None,
+             return_to_start: bool = True) -> Optional[Dict]:
+        """Circuit visitant le plus de sites en `days` jours (puis le moins d'heures, puis le moins cher).
+
+        Le budget couvre les trajets et les entrées, hors hébergement et repas. Avec `month`,
+        seuls les sites recommandés ce mois-là sont retenus. Retourne None si aucun site
+        ne peut être visité. Les circuits calculés sont mémorisés.
+        """
+        key = (start, days, budget, month, return_to_start)
+        cached = self._plans.get(key)
+        if cached is not None:
+            return cached or None
+        plan = self._search_plan(start, days, budget, month, return_to_start)
+        self._plans.put(key, plan or {})
+        return plan
+
+    def _search_plan(self, start: str, days: int, budget: Optional[float], month: Optional[int],
+                     return_to_start: bool) -> Optional[Dict]:
+        limit = days * self.day_hours
+        budget = math.inf if budget is None else budget
+        eligible = {
+            city: [visit for visit in visits if month is None or self.structured.months[visit[0], month]]
+            for city, visits in self.sites.items()
+        }
+        eligible = {city: visits for city, visits in eligible.items() if visits}
+        total_sites = sum(len(visits) for visits in eligible.values())
+        best: Dict = {"key": (0, 0.0, 0.0), "steps": None}
+        seen: Dict[Tuple[str, frozenset], Tuple[float, float]] = {}
+
+        def close(city: str, hours: float, cost: float) -> Optional[Tuple[List[Leg], float, float]]:
+            if not return_to_start or city == start:
+                return [], hours, cost
+            back = self.route(city, start)
+            if back is None or hours + back[1] > limit or cost + back[2] > budget:
+                return None
+            return back[0], hours + back[1], cost + back[2]
+
+        def visit(city: str, hours: float, cost: float):
+            """Sites de la ville qui tiennent dans la durée et le budget restants, les plus courts d'abord"""
+            chosen = []
+            for row, visit_hours, price in eligible.get(city, []):
+                if hours + visit_hours <= limit and cost + price <= budget:
+                    chosen.append(("visit", row, visit_hours, price))
+                    hours += visit_hours
+                    cost += price
+            return chosen, hours, cost
+
+        def record(steps: List, count: int, hours: float, cost: float, city: str):
+            closing = close(city, hours, cost)
+            if closing is None:
+                return
+            legs, hours, cost = closing
+            key = (count, -hours, -cost)
+            steps = steps + [("travel", leg) for leg in legs]
+            if key > best["key"] and len(self.split_days(steps)) <= days:
+                best["key"], best["steps"] = key, steps
+
+        def explore(city: str, visited: frozenset, steps: List, count: int, hours: float, cost: float):
+            state = (city, visited)
+            previous = seen.get(state)
+            if previous is not None and previous[0] <= hours and previous[1] <= cost:
+                return
+            seen[state] = (hours, cost)
+            record(steps, count, hours, cost, city)
+            remaining = sum(len(eligible[c]) for c in eligible if c not in visited)
+            if count + remaining < best["key"][0]:
+                return
+            for target in eligible:
+                if target in visited:
+                    continue
+                path = self.route(city, target)
+                if path is None or hours + path[1] > limit or cost + path[2] > budget:
+                    continue
+                chosen, new_hours, new_cost = visit(target, hours + path[1], cost + path[2])
+                if not chosen:
+                    continue
+                explore(target, visited | {target}, steps + [("travel", leg) for leg in path[0]] + chosen,
+                        count + len(chosen), new_hours, new_cost)
+
+        chosen, hours, cost = visit(start, 0.0, 0.0)
+        explore(start, frozenset({start}), chosen, len(chosen), hours, cost)
+        if best["steps"] is None or best["key"][0] == 0:
+            return None
+        return {
+            "start": start,
+            "days": self.split_days(best["steps"]),
+            "sites": best["key"][0],
+            "eligible_sites": total_sites,
+            "hours": -best["key"][1],
+            "cost": -best["key"][2],
+        }
+
+    def split_days(self, steps: List) -> List[List]:
+        """Répartit les étapes en journées de `day_hours` heures (une étape plus longue en occupe plusieurs)"""
+        days: List[List] = [[]]
+        used = 0.0
+        for step in steps:
+            hours = step[1][2] if step[0] == "travel" else step[2]
+            if used > 0 and used + hours > self.day_hours:
+                days.append([])
+                used = 0.0
+            days[-1].append(step)
+            used += hours
+            while used > self.day_hours:
+                used -= self.day_hours
+                if used > 1e-9:
+                    days.append([])
+        return days
+
+    def parse_query(self, query: str, default_start: str, default_days: int) -> Optional[Dict]:
+        """Demande de trajet ("de Ouaga à Banfora") ou de circuit ("circuit de 5 jours avec
+        100 000 FCFA") ; None pour les autres questions.
+
+        Deux villes et un mot de trajet désignent un trajet, même si la question parle
+        d'itinéraire ou de durée ("quel itinéraire pour aller de Ouaga à Bobo ?").
+        Un circuit est demandé par un mot explicite ("itinéraire", "circuit", "road trip",
+        "planifier un voyage"), par "programme" ou "plan" accompagnés d'une durée ou d'un
+        mot de voyage, ou par une durée et un mot de visite ; une question de coût sans mot
+        explicite ("quel budget pour un séjour de 10 jours ?") n'en est pas une.
+        """
+        folded = fold_accents(query)
+        cities = self.find_cities(query)
+        if len(cities) >= 2 and _ROUTE_WORDS.search(folded):
+            return {"plan": False, "origin": cities[0], "destination": cities[1]}
+        days = _DAYS.search(folded)
+        if _PLAN_WORDS.search(folded):
+            wants_plan = True
+        elif _BUDGET_WORDS.search(folded):
+            wants_plan = False
+        elif _SCHEDULE_WORDS.search(folded):
+            wants_plan = days is not None or bool(_STAY_WORDS.search(folded))
+        else:
+            wants_plan = days is not None and bool(_TRIP_WORDS.search(folded))
+        if wants_plan:
+            budget = _AMOUNT.search(folded)
+            month = next((i for i, name in enumerate(MONTHS) if re.search(rf"\b{name}\b", folded)), None)
+            start = cities[0] if cities else self.resolve_city(default_start)
+            if start is None:
+                return None
+            return {
+                "plan": True,
+                "start": start,
+                "days": int(days.group(1)) if days else default_days,
+                "budget": float(re.sub(r"[ ,.]", "", budget.group(1))) if budget else None,
+                "month": month,
+            }
+        return None
+
+    def site_results(self, plan: Dict) -> Dict[str, List]:
+        """Documents des sites du circuit, dans l'ordre de visite"""
+        rows = [step[1] for day in plan["days"] for step in day if step[0] == "visit"]
+        return self.structured.as_results(rows)
+
+    def stats(self) -> Dict[str, int]:
+        """Villes, trajets (dans un sens) et liaisons directes du graphe, sites planifiables"""
+        return {
+            "villes": len(self.nodes),
+            "trajets": sum(len(legs) for legs in self.edges.values()),
+            "liaisons": len(self.bus_legs),
+            "sites": sum(len(visits) for visits in self.sites.values()),
+        }
@@ -0,0 +1,137 @@
+"""
+Index lexical BM25 en mémoire (tokenisation française sans accents) et fusion par rang réciproque
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from text_utils import fold_accents
+
+# Mots vides du français (formes sans accents) ignorés à l'indexation comme dans les questions
+STOPWORDS = frozenset("""
+a au aux avec ce ces cet cette comme dans de des du elle en est et etre il ils je la le les leur
+leurs lui ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que quel quelle
+quelles quels qui sa se ses son sont sur ta te tes toi ton tu un une vos votre vous y peut faut
+combien comment quand
+""".split())
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Mots sans accents ni majuscules, hors mots vides, ramenés au singulier ("Hôtels" -> "hotel")"""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(fold_accents(text)):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        # Pluriel régulier : suffisant pour rapprocher "cascades" et "cascade"
+        if len(token) > 3 and token[-1] in "sx" and token[-2] not in "su":
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Fusionne plusieurs classements d'identifiants : score = somme de 1 / (k + rang)"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
+
+
+class LexicalIndex:
+    """Index inversé BM25 construit à partir du contenu d'une collection.
+
+    Chaque terme pointe vers les documents qui le contiennent avec son poids BM25
+    (fréquence saturée par `k1`, normalisée par la longueur avec `b`) ; une requête
+    additionne, pour ses seuls termes, idf x poids dans un vecteur de scores.
+
+    Une recherche est dite confiante lorsque la question est courte (au plus
+    `fast_path_max_tokens` termes), que le meilleur document contient tous ses termes
+    et qu'au moins l'un d'eux est rare (présent dans au plus `rare_df_ratio` du corpus) :
+    c'est le cas des noms propres ("Karfiguéla", "Gondwana").
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Optional[Dict]],
+                 k1: float = 1.5, b: float = 0.75, fast_path_max_tokens: int = 4, rare_df_ratio: float = 0.1):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [meta or {} for meta in metadatas]
+        self.fast_path_max_tokens = fast_path_max_tokens
+        self.size = len(self.ids)
+        self.rare_df = max(1, int(rare_df_ratio * self.size))
+
+        term_frequencies: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for row, document in enumerate(self.documents):
+            tokens = tokenize(document or "")
+            lengths[row] = len(tokens)
+            for token in tokens:
+                postings = term_frequencies.setdefault(token, {})
+                postings[row] = postings.get(row, 0) + 1
+
+        average_length = float(lengths.mean()) if self.size else 0.0
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._idf: Dict[str, float] = {}
+        for token, postings in term_frequencies.items():
+            rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            norm = k1 * (1 - b + b * lengths[rows] / max(average_length, 1e-9))
+            self._postings[token] = (rows, tf * (k1 + 1) / (tf + norm))
+            self._idf[token] = math.log(1 + (self.size - len(postings) + 0.5) / (len(postings) + 0.5))
+
+    def search(self, query: str, n_results: int) -> Tuple[List[Tuple[int, float]], bool]:
+        """Meilleurs documents (ligne, score BM25) et indicateur de confiance"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.size:
+            return [], False
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        coverage = np.zeros(self.size, dtype=np.int32)
+        rare = False
+        for token in tokens:
+            entry = self._postings.get(token)
+            if entry is None:
+                continue
+            rows, weights = entry
+            scores[rows] += self._idf[token] * weights
+            coverage[rows] += 1
+            rare = rare or len(rows) <= self.rare_df
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return [], False
+        n_results = min(n_results, len(matched))
+        top = matched[np.argpartition(-scores[matched], n_results - 1)[:n_results]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        confident = rare and len(tokens) <= self.fast_path_max_tokens and coverage[top[0]] == len(tokens)
+        return [(int(row), float(scores[row])) for row in top], bool(confident)
+
+    def covering(self, query: str, hits: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """Documents contenant tous les termes de la question, dans l'ordre des résultats"""
+        rows = np.array([row for row, _ in hits], dtype=np.int64)
+        keep = np.ones(len(rows), dtype=bool)
+        for token in dict.fromkeys(tokenize(query)):
+            entry = self._postings.get(token)
+            keep &= np.isin(rows, entry[0]) if entry is not None else False
+        return [hit for hit, kept in zip(hits, keep) if kept]
+
+    def as_results(self, hits: List[Tuple[int, float]]) -> Dict[str, List]:
+        """Résultats au format d'une question Chroma ; distance = 1 - score relatif au meilleur.
+
+        Ces distances ne font que traduire l'ordre BM25 (le meilleur document est toujours
+        à 0) : ce ne sont pas des distances cosinus et les seuils de pertinence ne s'y
+        appliquent pas. Le chemin rapide ne sert que les documents retenus par `covering`.
+        """
+        best = hits[0][1] if hits else 1.0
+        return {
+            "ids": [self.ids[row] for row, _ in hits],
+            "documents": [self.documents[row] for row, _ in hits],
+            "metadatas": [self.metadatas[row] for row, _ in hits],
+            "distances": [1.0 - score / best for _, score in hits],
+        }
@@ -0,0 +1,186 @@
+"""
+Instrumentation légère du pipeline : durées par étape, compteurs, export Prometheus et logs JSON
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bornes (secondes) des histogrammes de latence
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (format Prometheus)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Dernière case : +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Paires (borne "le", nombre cumulé d'observations)"""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return pairs
+
+
+class _NullSpan:
+    """Span sans effet, partagé : coût d'un `with` vide lorsque les métriques sont désactivées"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Collecteur de métriques d'un chatbot.
+
+    `span(étape)` mesure une étape du pipeline dans l'histogramme `stage_seconds` ;
+    `incr(événement)` incrémente un compteur (cache, replis, résultats vides...).
+    `trace(nom)` regroupe les étapes d'une requête et, si `json_logs` est activé,
+    émet une ligne JSON par requête avec la durée de chaque étape. Désactivé, chaque
+    appel se réduit à un test de booléen.
+    """
+
+    def __init__(self, enabled: bool = False, json_logs: bool = False, prefix: str = "burkina",
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.json_logs = json_logs
+        self.prefix = prefix
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._local = threading.local()
+
+    def span(self, stage: str):
+        """Contexte mesurant la durée d'une étape"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def incr(self, event: str, value: int = 1):
+        """Incrémente un compteur d'événements"""
+        if not self.enabled or not value:
+            return
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + value
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace["events"][event] = trace["events"].get(event, 0) + value
+
+    def observe_stage(self, stage: str, seconds: float):
+        """Enregistre la durée d'une étape (et l'ajoute à la trace courante du thread)"""
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace["stages_ms"][stage] = round(trace["stages_ms"].get(stage, 0.0) + seconds * 1000, 3)
+
+    @contextmanager
+    def trace(self, name: str, **fields) -> Iterator[Optional[Dict[str, Any]]]:
+        """Trace d'une requête : durée totale mesurée comme une étape, ligne JSON en sortie
+
+        Le dictionnaire produit (None si désactivé) peut recevoir des champs supplémentaires.
+        """
+        if not self.enabled:
+            yield None
+            return
+        if getattr(self._local, "trace", None) is not None:
+            # Trace imbriquée (ex. chat -> search) : les étapes rejoignent la trace englobante
+            yield self._local.trace
+            return
+
+        trace = {"event": name, **fields, "stages_ms": {}, "events": {}}
+        self._local.trace = trace
+        start = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            self._local.trace = None
+            elapsed = time.perf_counter() - start
+            self.observe_stage(name, elapsed)
+            if self.json_logs:
+                trace["total_ms"] = round(elapsed * 1000, 3)
+                logger.info(json.dumps(trace, ensure_ascii=False, default=str))
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """État courant des métriques (sérialisable en JSON)"""
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {
+                        "count": h.count,
+                        "sum_s": round(h.sum, 6),
+                        "mean_ms": round(1000 * h.sum / h.count, 3) if h.count else 0.0,
+                        "buckets": dict(h.cumulative()),
+                    }
+                    for stage, h in self._stages.items()
+                },
+                "counters": dict(self._counters),
+            }
+
+    def prometheus_text(self) -> str:
+        """Export au format texte Prometheus (histogramme des étapes et compteurs)"""
+        stage_metric = f"{self.prefix}_stage_seconds"
+        counter_metric = f"{self.prefix}_events_total"
+        lines = [
+            f"# HELP {stage_metric} Durée des étapes du pipeline de réponse",
+            f"# TYPE {stage_metric} histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._stages.items()):
+                for bound, count in h.cumulative():
+                    lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{stage_metric}_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{stage_metric}_count{{stage="{stage}"}} {h.count}')
+            lines.append(f"# HELP {counter_metric} Événements du pipeline (caches, replis, résultats vides)")
+            lines.append(f"# TYPE {counter_metric} counter")
+            for event, value in sorted(self._counters.items()):
+                lines.append(f'{counter_metric}{{event="{event}"}} {value}')
+        return "\n".join(lines) + "\n"
@@ -4,6 +4,7 @@ Script de lancement rapide pour le Chatbot Touristique Burkina Faso
 Usage: python run.py
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
@@ -62,16 +63,14 @@ def check_environment():
     return issues
 
 def check_dependencies():
-    """Vérifie que les dépendances sont installées"""
-    try:
-        import streamlit
-        import chromadb
-        import sentence_transformers
-        return True
-    except ImportError as e:
-        print(f"❌ Dépendances manquantes: {e}")
+    """Vérifie que les dépendances sont installées (sans les importer : le lancement reste rapide)"""
+    missing = [name for name in ("streamlit", "chromadb", "sentence_transformers")
+               if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Dépendances manquantes: {', '.join(missing)}")
         print("💡 Installez les dépendances avec: pip install -r requirements.txt")
         return False
+    return True
 
 def launch_chatbot():
     """Lance le chatbot"""
@@ -106,7 +105,7 @@ def launch_chatbot():
     print("\n📋 Options de lancement:")
     print("1. Interface Web Streamlit (Recommandé)")
     print("2. Test en ligne de commande")
-    print("3. Lancer les tests unitaires")
+    print("3. Lancer le banc d'essai (latences, mémoire)")
     print("4. Régénérer les données")
     print("5. Configuration avancée")
     print("6. Quitter")
@@ -137,16 +136,12 @@ def launch_chatbot():
             print(f"❌ Erreur: {e}")
             
     elif choice == "3":
-        print("\n🧪 Lancement des tests unitaires...")
+        print("\n🧪 Lancement du banc d'essai...")
         print("="*60)
         try:
-            subprocess.run(["pytest", "test_chatbot.py", "-v"])
-        except FileNotFoundError:
-            print("❌ Pytest non trouvé. Installez avec: pip install pytest")
-            try:
-                subprocess.run([python_cmd, "test_chatbot.py"])
-            except Exception as e:
-                print(f"❌ Erreur: {e}")
+            subprocess.run([python_cmd, os.path.join("benchmarks", "bench_suite.py")])
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
                 
     elif choice == "4":
         print("\n📊 Régénération des données...")
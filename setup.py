@@ -104,6 +104,8 @@ class ProjectSetup:
         directories = [
             "data",
             "chroma_db",
+            "embeddings_cache",
+            "onnx_cache",
             "logs",
             "docs"
         ]
@@ -127,8 +129,8 @@ print("✅ Modèle d'embeddings téléchargé")
 
 print("Téléchargement du modèle de génération...")
 try:
-    tokenizer = AutoTokenizer.from_pretrained("microsoft/DialoGPT-medium")
-    model = AutoModelForCausalLM.from_pretrained("microsoft/DialoGPT-medium")
+    tokenizer = AutoTokenizer.from_pretrained("Qwen/Qwen2.5-0.5B-Instruct")
+    model = AutoModelForCausalLM.from_pretrained("Qwen/Qwen2.5-0.5B-Instruct")
     print("✅ Modèle de génération téléchargé")
 except Exception as e:
     print(f"⚠️ Modèle de génération non téléchargé (optionnel): {e}")
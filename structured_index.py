@@ -0,0 +1,385 @@
+"""
+Index structuré des fiches (sites, hébergements, restaurants) : tarifs en FCFA, horaires
+d'ouverture, mois de visite et durée de visite extraits du texte, stockés en colonnes NumPy
+pour répondre aux questions à critères ("sites à moins de 2000 FCFA", "ouvert le vendredi
+matin") par filtrage vectoriel, sans recherche dans le texte libre
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from entity_index import entity_tokens
+from text_utils import fold_accents
+
+DAYS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+MONTHS = ["janvier", "fevrier", "mars", "avril", "mai", "juin", "juillet", "aout",
+          "septembre", "octobre", "novembre", "decembre"]
+MONTH_NAMES = ["janvier", "février", "mars", "avril", "mai", "juin", "juillet", "août",
+               "septembre", "octobre", "novembre", "décembre"]
+
+# Créneaux d'une demi-heure : 48 par jour
+SLOTS_PER_DAY = 48
+# Une journée de visite compte pour 8 heures dans les durées ("2-3 jours" -> 16-24 h)
+HOURS_PER_VISIT_DAY = 8
+
+# Moments de la journée reconnus dans les questions (heure représentative)
+DAY_PERIODS = [("apres-midi", 15), ("apres midi", 15), ("matin", 9), ("midi", 12), ("soir", 19)]
+
+# Types de fiches désignés dans une question
+KIND_PATTERNS = {
+    "site_touristique": re.compile(r"\bsites?\b|\bvisit|\blieux?\b|\bendroits?\b"),
+    "hebergement": re.compile(r"\bhotel|\bheberg|\bauberge|\bcampement|\bdormir|\bloger|\bchambre"),
+    "restaurant": re.compile(r"\brestau|\bmanger|\bmaquis|\brepas|\bdiner|\bdejeuner"),
+}
+
+_AMOUNT = r"(\d{1,3}(?:[ ,.]\d{3})+|\d+)"
+_PRICE_PATTERN = re.compile(_AMOUNT + r"(?:\s*-\s*" + _AMOUNT + r")?\s*(?:fcfa|francs?\b|f\b)")
+_DAY = "(" + "|".join(DAYS) + ")"
+_MONTH = "(" + "|".join(MONTHS) + ")"
+_TIME = r"(\d{1,2})\s*h\s*(\d{2})?"
+_TIME_RANGE = re.compile(_TIME + r"\s*(?:-|a)\s*(?:" + _TIME + r"|(tard))")
+_DAY_RANGE = re.compile(_DAY + r"\s*(?:-|a|au)\s*" + _DAY)
+_MONTH_RANGE = re.compile(_MONTH + r"\s*(?:-|a|au|jusqu'?a)\s*" + _MONTH)
+_CLOSED_MONTHS = re.compile(r"ferme\w*\s+(?:de|du|en)\s+" + _MONTH + r"(?:\s*(?:-|a|au)\s*" + _MONTH + r")?")
+_DURATION = re.compile(r"(\d+)(?:\s*-\s*(\d+))?\s*(heure|h\b|jour)")
+_PARENTHESES = re.compile(r"\([^)]*\)")
+_CLOSED = re.compile(r"\bferme")
+
+_QUERY_PRICE = re.compile(
+    r"(pas plus de|moins de|au plus|au maximum|maximum|max|jusqu.a|inferieur a|sous|"
+    r"plus de|au moins|minimum|superieur a|a partir de|[<>])\s*" + _AMOUNT + r"\s*([a-z]*)"
+)
+_MAX_OPERATORS = {"pas plus de", "moins de", "au plus", "au maximum", "maximum", "max",
+                  "inferieur a", "sous", "<"}
+_CURRENCIES = {"fcfa", "cfa", "f", "franc", "francs"}
+# Un nombre suivi d'une de ces unités n'est pas un montant ("moins de 3 heures")
+_OTHER_UNITS = {"h", "heure", "heures", "jour", "jours", "nuit", "nuits", "km", "min", "minute",
+                "minutes", "an", "ans", "personne", "personnes", "semaine", "semaines"}
+# "gratuit" n'est un critère de tarif que s'il porte sur l'entrée ou la visite ("entrée gratuite",
+# "sites gratuits", "gratuit de visiter"), pas sur un service ("le wifi est-il gratuit ?")
+_QUERY_FREE = re.compile(
+    r"\b(?:entrees?|acces|sites?|lieux?|endroits?|visites?|activites?|musees?|parcs?|monuments?)"
+    r"\s+(?:\S+\s+){0,2}gratuit"
+    r"|\bgratuit\w*\s+(?:\S+\s+){0,2}(?:l')?(?:entree|acces|visit|entrer)"
+    r"|\b(?:visiter|entrer|voir|faire)\s+(?:\S+\s+)?gratuitement"
+)
+_QUERY_OPENING = re.compile(r"\bouver|\bouvre|\bhoraire|\bferme")
+_QUERY_OPEN = re.compile(r"\bouver|\bouvre")
+_QUERY_MONTH = re.compile(r"(?:\ben|\bmois d.|\bmois de)\s*" + _MONTH)
+_QUERY_VISIT = re.compile(r"visit|\bvoir\b|\baller\b|\bendroits?\b|\bsites?\b|\bfaire\b")
+
+
+def _amount(text: str) -> float:
+    return float(re.sub(r"[ ,.]", "", text))
+
+
+def parse_prices(text: str) -> Tuple[float, float]:
+    """Tarif d'entrée (premier montant, 0 si l'entrée est gratuite) et montant maximal ; NaN si inconnu"""
+    folded = fold_accents(text)
+    amounts = []
+    first = None
+    for match in _PRICE_PATTERN.finditer(folded):
+        values = [_amount(value) for value in match.groups() if value]
+        if first is None:
+            first = (match.start(), values[0])
+        amounts.extend(values)
+    free = folded.find("gratuit")
+    if free >= 0 and (first is None or free < first[0]):
+        return 0.0, max(amounts, default=0.0)
+    if first is None:
+        return np.nan, np.nan
+    return first[1], max(amounts)
+
+
+def _slot(hours: str, minutes: Optional[str], end: bool = False) -> int:
+    value = int(hours) * 2 + (int(minutes or 0) + (29 if end else 0)) // 30
+    return min(value, SLOTS_PER_DAY)
+
+
+def _day_range(first: int, last: int) -> List[int]:
+    return [(first + i) % 7 for i in range((last - first) % 7 + 1)]
+
+
+def parse_opening_hours(text: str) -> Optional[np.ndarray]:
+    """Créneaux d'ouverture (7 jours x 48 demi-heures), None si les horaires sont inconnus.
+
+    Le texte est découpé en segments séparés par des virgules ; un segment commençant
+    par des jours ("Mardi-Samedi 9h00-17h00") ne s'applique qu'à ces jours, les autres
+    à toute la semaine. Les précisions entre parenthèses sont ignorées (voir `parse_closures`).
+    """
+    folded = _PARENTHESES.sub("", fold_accents(text))
+    if "toute la journee" in folded or "24h/24" in folded:
+        return np.ones((7, SLOTS_PER_DAY), dtype=bool)
+
+    opening = np.zeros((7, SLOTS_PER_DAY), dtype=bool)
+    found = False
+    for segment in folded.split(","):
+        ranges = list(_TIME_RANGE.finditer(segment))
+        if not ranges:
+            continue
+        head = segment[:ranges[0].start()]
+        days: List[int] = []
+        for match in _DAY_RANGE.finditer(head):
+            days.extend(_day_range(DAYS.index(match.group(1)), DAYS.index(match.group(2))))
+        head = _DAY_RANGE.sub("", head)
+        days.extend(DAYS.index(day) for day in re.findall(_DAY, head))
+        days = days or list(range(7))
+
+        for match in ranges:
+            start_h, start_m, end_h, end_m, late = match.groups()
+            start = _slot(start_h, start_m)
+            end = SLOTS_PER_DAY if late else _slot(end_h, end_m, end=True)
+            if end <= start:
+                end = SLOTS_PER_DAY
+            opening[days, start:end] = True
+            found = True
+    return opening if found else None
+
+
+def _month_range(first: int, last: int) -> List[int]:
+    return [(first + i) % 12 for i in range((last - first) % 12 + 1)]
+
+
+def parse_months(text: str) -> Optional[np.ndarray]:
+    """Mois cités (plages "novembre à février" comprises), None si aucun"""
+    folded = _PARENTHESES.sub("", fold_accents(text))
+    months = np.zeros(12, dtype=bool)
+    if "toute l'annee" in folded or "toute l’annee" in folded:
+        months[:] = True
+        return months
+    for match in _MONTH_RANGE.finditer(folded):
+        months[_month_range(MONTHS.index(match.group(1)), MONTHS.index(match.group(2)))] = True
+    for month in re.findall(_MONTH, _MONTH_RANGE.sub("", folded)):
+        months[MONTHS.index(month)] = True
+    return months if months.any() else None
+
+
+def parse_closed_months(text: str) -> np.ndarray:
+    """Mois de fermeture annoncés dans les horaires ("fermé de juillet à octobre")"""
+    closed = np.zeros(12, dtype=bool)
+    for first, last in _CLOSED_MONTHS.findall(fold_accents(text)):
+        last = last or first
+        closed[_month_range(MONTHS.index(first), MONTHS.index(last))] = True
+    return closed
+
+
+def parse_closures(text: str) -> Tuple[np.ndarray, List[str]]:
+    """Fermetures partielles précisées entre parenthèses ("fermé pendant les prières du
+    vendredi") : jours concernés et précisions telles qu'écrites, pour les signaler"""
+    days = np.zeros(7, dtype=bool)
+    notes = []
+    for note in _PARENTHESES.findall(text):
+        folded = fold_accents(note)
+        if not _CLOSED.search(folded):
+            continue
+        notes.append(note.strip("() "))
+        for day in re.findall(r"\b" + _DAY, folded):
+            days[DAYS.index(day)] = True
+    return days, notes
+
+
+def parse_duration(text: str) -> Tuple[float, float]:
+    """Durée de visite minimale et maximale en heures ; NaN si inconnue"""
+    match = _DURATION.search(fold_accents(text))
+    if match is None:
+        return np.nan, np.nan
+    low, high, unit = match.groups()
+    factor = HOURS_PER_VISIT_DAY if unit == "jour" else 1
+    return float(low) * factor, float(high or low) * factor
+
+
+def format_fcfa(amount: float) -> str:
+    return f"{amount:,.0f} FCFA"
+
+
+class StructuredIndex:
+    """Colonnes typées des fiches portant des métadonnées `prix`, `horaires`,
+    `meilleure_periode` ou `duree_visite` (documents principaux des sites, hôtels et
+    restaurants).
+
+    Chaque critère d'une question devient un masque booléen sur ces colonnes : tarif
+    (`price_min`, `price_max`), ouverture (`opening` : fiches x jours x demi-heures),
+    mois recommandés (`months`, hors mois de fermeture), ville et type de fiche. Les
+    fermetures partielles entre parenthèses des horaires sont gardées à part
+    (`closure_days`, `closure_notes`) : la fiche reste ouverte ces jours-là, mais elle
+    compte aussi parmi les lieux fermés et la précision est signalée dans les réponses.
+    """
+
+    def __init__(self, ids: List[str], documents: List[str], metadatas: List[Optional[Dict]]):
+        fields = ("prix", "horaires", "meilleure_periode", "duree_visite")
+        rows = [row for row, meta in enumerate(metadatas)
+                if meta and meta.get("nom") and any(meta.get(field) for field in fields)]
+        self.ids = [ids[row] for row in rows]
+        self.documents = [documents[row] for row in rows]
+        self.metadatas = [metadatas[row] for row in rows]
+        self.size = len(rows)
+        self.names = [meta["nom"] for meta in self.metadatas]
+        self.row_by_name = {name: row for row, name in enumerate(self.names)}
+
+        self.kinds = np.array([meta.get("type", "") for meta in self.metadatas], dtype=object)
+        self.cities = np.array([" ".join(entity_tokens(meta.get("ville", ""))) for meta in self.metadatas],
+                               dtype=object)
+        self.price_min = np.full(self.size, np.nan, dtype=np.float64)
+        self.price_max = np.full(self.size, np.nan, dtype=np.float64)
+        self.opening = np.zeros((self.size, 7, SLOTS_PER_DAY), dtype=bool)
+        self.hours_known = np.zeros(self.size, dtype=bool)
+        self.months = np.zeros((self.size, 12), dtype=bool)
+        self.duration_min = np.full(self.size, np.nan, dtype=np.float64)
+        self.duration_max = np.full(self.size, np.nan, dtype=np.float64)
+        self.closure_days = np.zeros((self.size, 7), dtype=bool)
+        self.closure_notes: List[List[str]] = [[] for _ in range(self.size)]
+
+        for row, meta in enumerate(self.metadatas):
+            if meta.get("prix"):
+                self.price_min[row], self.price_max[row] = parse_prices(meta["prix"])
+            closed = np.zeros(12, dtype=bool)
+            if meta.get("horaires"):
+                opening = parse_opening_hours(meta["horaires"])
+                if opening is not None:
+                    self.opening[row] = opening
+                    self.hours_known[row] = True
+                closed = parse_closed_months(meta["horaires"])
+                self.closure_days[row], self.closure_notes[row] = parse_closures(meta["horaires"])
+            if meta.get("meilleure_periode"):
+                months = parse_months(meta["meilleure_periode"])
+                if months is not None:
+                    self.months[row] = months & ~closed
+            if meta.get("duree_visite"):
+                self.duration_min[row], self.duration_max[row] = parse_duration(meta["duree_visite"])
+
+    def parse_query(self, query: str) -> Dict:
+        """Critères structurés d'une question (arguments de `filter`), vide s'il n'y en a aucun.
+
+        Le type de fiche et la ville ne font que restreindre un critère de tarif,
+        d'ouverture ou de mois : seuls, ils relèvent de la recherche habituelle.
+        """
+        folded = fold_accents(query)
+        constraints: Dict = {}
+
+        for operator, amount, unit in _QUERY_PRICE.findall(folded):
+            # Sans devise, seul un nombre d'au moins 100 est pris pour un montant
+            if unit not in _CURRENCIES and (unit in _OTHER_UNITS or _amount(amount) < 100):
+                continue
+            key = "max_price" if operator in _MAX_OPERATORS else "min_price"
+            constraints.setdefault(key, _amount(amount))
+        if _QUERY_FREE.search(folded):
+            constraints["max_price"] = 0.0
+
+        if _QUERY_OPENING.search(folded):
+            # "fermé le lundi" : critère inversé, sauf si l'ouverture est aussi demandée ("ouvert ou fermé")
+            closed = bool(_CLOSED.search(folded)) and not _QUERY_OPEN.search(folded)
+            day = re.search(r"\b" + _DAY, folded)
+            if day:
+                constraints["day"] = DAYS.index(day.group(1))
+            time = re.search(r"\b" + _TIME, folded)
+            if time:
+                constraints["hour"] = min(int(time.group(1)) + int(time.group(2) or 0) / 60, 23.5)
+            else:
+                for period, hour in DAY_PERIODS:
+                    if period in folded:
+                        constraints["hour"] = hour
+                        break
+            if closed and ("day" in constraints or "hour" in constraints):
+                constraints["closed"] = True
+
+        month = _QUERY_MONTH.search(folded)
+        if month and _QUERY_VISIT.search(folded):
+            constraints["month"] = MONTHS.index(month.group(1))
+
+        if not constraints:
+            return {}
+        kinds = [kind for kind, pattern in KIND_PATTERNS.items() if pattern.search(folded)]
+        if kinds:
+            constraints["kinds"] = kinds
+        tokens = f" {' '.join(entity_tokens(query))} "
+        cities = sorted(set(self.cities), key=lambda c: (-len(c), c))
+        city = next((c for c in cities if c and f" {c} " in tokens), None)
+        if city:
+            constraints["city"] = city
+        return constraints
+
+    def filter(self, max_price: Optional[float] = None, min_price: Optional[float] = None,
+               day: Optional[int] = None, hour: Optional[float] = None, month: Optional[int] = None,
+               kinds: Optional[List[str]] = None, city: Optional[str] = None,
+               names: Optional[List[str]] = None, closed: bool = False) -> List[int]:
+        """Lignes satisfaisant tous les critères, de la moins chère à la plus chère (tarif inconnu en dernier).
+
+        Avec `closed`, le critère de jour et d'heure est inversé : fiches aux horaires connus
+        fermées à ce moment, ou annonçant une fermeture partielle ce jour-là.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        # Les comparaisons avec NaN sont fausses : un tarif inconnu ne satisfait aucun critère de prix
+        if max_price is not None:
+            mask &= self.price_min <= max_price
+        if min_price is not None:
+            mask &= self.price_max >= min_price
+        if day is not None or hour is not None:
+            days = self.opening[:, day, :] if day is not None else self.opening.any(axis=1)
+            is_open = days[:, int(hour * 2)] if hour is not None else days.any(axis=1)
+            if closed:
+                # Horaires inconnus : ni ouvert ni fermé
+                is_closed = self.hours_known & ~is_open
+                if day is not None:
+                    is_closed |= self.closure_days[:, day]
+                mask &= is_closed
+            else:
+                mask &= is_open
+        if month is not None:
+            mask &= self.months[:, month]
+        if kinds:
+            mask &= np.isin(self.kinds, kinds)
+        if city is not None:
+            mask &= self.cities == city
+        if names is not None:
+            mask &= np.isin(np.array(self.names, dtype=object), names)
+        rows = np.flatnonzero(mask)
+        prices = np.where(np.isnan(self.price_min[rows]), np.inf, self.price_min[rows])
+        return [int(row) for row in rows[np.argsort(prices, kind="stable")]]
+
+    def describe(self, constraints: Dict) -> str:
+        """Critères sous forme lisible ("moins de 2,000 FCFA, ouvert le vendredi vers 9h")"""
+        parts = []
+        if "max_price" in constraints:
+            price = constraints["max_price"]
+            parts.append("gratuit" if price == 0 else f"moins de {format_fcfa(price)}")
+        if "min_price" in constraints:
+            parts.append(f"à partir de {format_fcfa(constraints['min_price'])}")
+        if "day" in constraints or "hour" in constraints:
+            opening = "fermé" if constraints.get("closed") else "ouvert"
+            if "day" in constraints:
+                opening += f" le {DAYS[constraints['day']]}"
+            if "hour" in constraints:
+                hour = constraints["hour"]
+                opening += f" vers {int(hour)}h{int(hour % 1 * 60):02d}" if hour % 1 else f" vers {int(hour)}h"
+            parts.append(opening)
+        if "month" in constraints:
+            parts.append(f"à visiter en {MONTH_NAMES[constraints['month']]}")
+        if "city" in constraints:
+            row = next(row for row in range(self.size) if self.cities[row] == constraints["city"])
+            parts.append(f"à {self.metadatas[row].get('ville')}")
+        return ", ".join(parts)
+
+    def rows_for(self, names: List[str]) -> List[int]:
+        """Lignes des entités données (dans l'ordre), celles sans fiche structurée ignorées"""
+        return [self.row_by_name[name] for name in names if name in self.row_by_name]
+
+    def as_results(self, rows: List[int]) -> Dict[str, List]:
+        """Résultats au format d'une question Chroma (critères satisfaits : distance nulle)"""
+        return {
+            "ids": [self.ids[row] for row in rows],
+            "documents": [self.documents[row] for row in rows],
+            "metadatas": [self.metadatas[row] for row in rows],
+            "distances": [0.0] * len(rows),
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de fiches et de fiches dont chaque champ a pu être interprété"""
+        return {
+            "fiches": self.size,
+            "prix": int((~np.isnan(self.price_min)).sum()),
+            "horaires": int(self.hours_known.sum()),
+            "periodes": int(self.months.any(axis=1).sum()),
+            "durees": int((~np.isnan(self.duration_min)).sum()),
+        }
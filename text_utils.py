@@ -0,0 +1,85 @@
+"""
+Utilitaires de traitement du texte (normalisation, détection de mots-clés)
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+
+def fold_accents(text: str) -> str:
+    """Met en minuscules et supprime les accents ("Hôtel" -> "hotel")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+# Variantes accentuées reconnues pour chaque lettre de base
+_ACCENT_VARIANTS = {
+    "a": "aàâä", "c": "cç", "e": "eéèêë", "i": "iîï", "o": "oôö", "u": "uùûü", "y": "yÿ",
+}
+
+
+def _accent_insensitive_char(char: str) -> str:
+    """Motif d'une lettre sans accent reconnaissant aussi ses variantes accentuées"""
+    variants = _ACCENT_VARIANTS.get(char)
+    return f"[{variants}]" if variants else re.escape(char)
+
+
+def trie_pattern(words: List[str]) -> str:
+    """Expression régulière en arbre préfixe reconnaissant les mots (sans accents) donnés.
+
+    Factoriser les préfixes communs évite au moteur de retester chaque mot à chaque
+    position ; le quantificateur gourmand garantit la correspondance la plus longue.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in fold_accents(word):
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [_accent_insensitive_char(c) + build(child) for c, child in sorted(node.items()) if c]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Détecteur de catégories par mots-clés, compilé une seule fois.
+
+    Tous les mots-clés sont réunis dans une unique expression régulière (arbre préfixe
+    insensible aux accents) appliquée en une passe sur la question.
+    Un mot-clé doit commencer un mot ("site" ne correspond pas à "visite") mais peut
+    être suivi d'un suffixe ("cascade" correspond à "cascades").
+    """
+
+    def __init__(self, keywords_by_category: Dict[str, List[str]]):
+        self.categories = list(keywords_by_category)
+        self._categories_by_keyword: Dict[str, List[str]] = {}
+        for category, keywords in keywords_by_category.items():
+            for keyword in keywords:
+                self._categories_by_keyword.setdefault(fold_accents(keyword), []).append(category)
+
+        self._pattern = re.compile(r"\b" + trie_pattern(list(self._categories_by_keyword)))
+        self._rank = {category: i for i, category in enumerate(self.categories)}
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Nombre de mots-clés distincts trouvés par catégorie"""
+        scores: Dict[str, int] = {}
+        # Seuls les fragments reconnus (quelques caractères) sont ramenés à leur forme sans accents
+        for fragment in set(self._pattern.findall(text.lower())):
+            for category in self._categories_by_keyword[fold_accents(fragment)]:
+                scores[category] = scores.get(category, 0) + 1
+        return scores
+
+    def best(self, text: str) -> Optional[Tuple[str, int]]:
+        """Catégorie la mieux notée (ordre de déclaration en cas d'égalité), ou None"""
+        scores = self.scores(text)
+        if not scores:
+            return None
+        category = min(scores, key=lambda c: (-scores[c], self._rank[c]))
+        return category, scores[category]
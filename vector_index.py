@@ -0,0 +1,450 @@
+"""
+Backends de recherche vectorielle : ChromaDB (persistant) ou index NumPy en mémoire
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+STORAGE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+_SCORE_CHUNK_ROWS = 8192  # Lignes décompressées à la fois lors du calcul des scores
+
+
+def create_vector_client(config, embedding_store=None):
+    """Crée le client du backend configuré (`Config.VECTOR_BACKEND`)
+
+    `embedding_store` sert de source pleine précision pour re-classer les candidats
+    lorsque les vecteurs sont stockés en float16 ou int8.
+    """
+    if config.VECTOR_BACKEND == "numpy":
+        logger.info(f"Backend vectoriel: index NumPy en mémoire ({config.EMBEDDING_STORAGE})")
+        rescore_fn = None
+        if config.EMBEDDING_STORAGE != "float32" and config.EMBEDDING_RESCORE_CANDIDATES:
+            if embedding_store is None:
+                logger.warning("Re-classement pleine précision indisponible sans cache d'embeddings")
+            else:
+                rescore_fn = embedding_store.get_many
+        return NumpyClient(storage=config.EMBEDDING_STORAGE, rescore_fn=rescore_fn,
+                           rescore_candidates=config.EMBEDDING_RESCORE_CANDIDATES)
+
+    import chromadb
+    from chromadb.config import Settings
+    if config.EMBEDDING_STORAGE != "float32":
+        logger.warning("Stockage compact non supporté par ChromaDB : vecteurs conservés en float32")
+    logger.info("Backend vectoriel: ChromaDB")
+    return chromadb.PersistentClient(
+        path=config.CHROMA_DB_PATH,
+        settings=Settings(anonymized_telemetry=False)
+    )
+
+
+def query_with_fallback(collection, query_embeddings, n_results: int, where: Optional[Dict],
+                        fallback_n_results: int, include: Optional[List[str]] = None) -> Dict[str, List[List[Any]]]:
+    """Requête filtrée avec repli sans filtre pour les questions sans résultat
+
+    L'index NumPy traite le repli dans le même passage ; pour Chroma, seules les
+    questions sans résultat sont réinterrogées, avec les embeddings déjà calculés.
+    """
+    if isinstance(collection, NumpyCollection):
+        return collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where,
+                                include=include, fallback_n_results=fallback_n_results)
+
+    results = collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where,
+                               include=include)
+    empty = [i for i, documents in enumerate(results["documents"]) if not documents]
+    if empty:
+        fallback = collection.query(query_embeddings=[query_embeddings[i] for i in empty],
+                                    n_results=fallback_n_results, include=include)
+        for j, i in enumerate(empty):
+            for key in ("ids", "documents", "metadatas", "distances"):
+                if results.get(key) is not None and fallback.get(key) is not None:
+                    results[key][i] = fallback[key][j]
+    return results
+
+
+class NumpyCollection:
+    """Collection en mémoire compatible avec le sous-ensemble de l'API Chroma utilisé par le chatbot.
+
+    Les embeddings normalisés sont rangés dans une matrice float32 contiguë (capacité
+    doublée à la demande), les métadonnées dans des colonnes. Une requête top-k est un
+    produit matriciel suivi d'un `argpartition` ; les filtres `where` sont des masques
+    sur les colonnes. Les lectures travaillent sur un instantané : les ajouts écrivent
+    au-delà des lignes visibles et les suppressions recopient les tableaux.
+
+    Pour la clé de partition (`category`), les lignes sont rangées par valeur à la première
+    requête filtrée suivant une modification : chaque catégorie forme alors une tranche
+    contiguë de la matrice, et une requête filtrée sur cette seule clé calcule ses scores
+    sur une vue de sa tranche, sans masque ni copie. Le rangement recopie les tableaux
+    une fois (comme une suppression) ; il n'y a pas de seconde copie de la matrice.
+
+    Le stockage peut être compact : float16, ou int8 avec une échelle par vecteur
+    (quantification scalaire symétrique). Les scores sont alors approchés ; si
+    `rescore_fn` est fourni, les `rescore_candidates` meilleurs candidats sont
+    re-classés avec leurs vecteurs float32 (retrouvés par le texte du document).
+    """
+
+    def __init__(self, name: str, metadata: Optional[Dict] = None, partition_key: str = "category",
+                 storage: str = "float32", rescore_fn: Optional[Callable] = None,
+                 rescore_candidates: int = 0):
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"Stockage {storage} inconnu (attendu: {', '.join(STORAGE_DTYPES)})")
+        self.name = name
+        self.metadata = metadata or {}
+        self.partition_key = partition_key
+        self.storage = storage
+        self._dtype = STORAGE_DTYPES[storage]
+        self._rescore_fn = rescore_fn
+        self.rescore_candidates = rescore_candidates
+        self._version = 0
+        self._layout = None  # (version, tranches des partitions)
+        self._lock = threading.Lock()
+        self._vectors = np.empty((0, 0), dtype=self._dtype)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._row_of: Dict[str, int] = {}
+
+    # ----- Écriture -----
+
+    def _reserve(self, rows: int, dim: int):
+        """Agrandit la matrice et les colonnes pour accueillir `rows` lignes"""
+        if self._vectors.shape[1] not in (0, dim):
+            raise ValueError(f"Dimension {dim} incompatible avec la collection ({self._vectors.shape[1]})")
+        capacity = self._vectors.shape[0]
+        if rows <= capacity and self._vectors.shape[1] == dim:
+            return
+        new_capacity = max(rows, 2 * capacity, 64)
+        vectors = np.zeros((new_capacity, dim), dtype=self._dtype)
+        scales = np.ones(new_capacity, dtype=np.float32)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            scales[:self._size] = self._scales[:self._size]
+        self._vectors = vectors
+        self._scales = scales
+        for key, column in self._columns.items():
+            grown = np.empty(new_capacity, dtype=object)
+            grown[:self._size] = column[:self._size]
+            self._columns[key] = grown
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        """Ajoute des documents ; les identifiants existants sont remplacés"""
+        self.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Convertit des vecteurs normalisés au format de stockage (vecteurs, échelles)"""
+        if self.storage == "int8":
+            scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+            quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return quantized, scales.astype(np.float32)
+        return vectors.astype(self._dtype), np.ones(len(vectors), dtype=np.float32)
+
+    def _dequantize(self, vectors: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Vecteurs float32 à partir du format de stockage"""
+        if self.storage == "int8":
+            return vectors.astype(np.float32) * scales[:, None]
+        return vectors.astype(np.float32, copy=False)
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        """Ajoute ou remplace des documents"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        stored, scales = self._quantize(vectors / np.maximum(norms, 1e-12))
+
+        with self._lock:
+            # Suppression des anciennes versions et ajout dans la même section : une requête
+            # concurrente voit soit les anciens documents, soit les nouveaux
+            self._remove(ids)
+            start = self._size
+            self._reserve(start + len(ids), stored.shape[1])
+            self._vectors[start:start + len(ids)] = stored
+            self._scales[start:start + len(ids)] = scales
+            for offset, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                row = start + offset
+                for key, value in metadata.items():
+                    if key not in self._columns:
+                        self._columns[key] = np.empty(self._vectors.shape[0], dtype=object)
+                    self._columns[key][row] = value
+                self._ids.append(doc_id)
+                self._documents.append(document)
+                self._metadatas.append(dict(metadata))
+                self._row_of[doc_id] = row
+            # Les nouvelles lignes ne deviennent visibles qu'une fois entièrement écrites
+            self._size = start + len(ids)
+            self._version += 1
+
+    def delete(self, ids: List[str]):
+        """Supprime des documents (copie des tableaux : les lectures en cours ne sont pas affectées)"""
+        with self._lock:
+            self._remove(ids)
+
+    def _remove(self, ids: List[str]):
+        """Retire les lignes des identifiants connus (appel sous verrou)"""
+        rows = sorted(self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of)
+        if not rows:
+            return
+        keep = np.ones(self._size, dtype=bool)
+        keep[rows] = False
+        kept_rows = np.flatnonzero(keep)
+
+        self._vectors = np.ascontiguousarray(self._vectors[:self._size][keep])
+        self._scales = self._scales[:self._size][keep]
+        self._columns = {key: column[:self._size][keep] for key, column in self._columns.items()}
+        self._ids = [self._ids[r] for r in kept_rows]
+        self._documents = [self._documents[r] for r in kept_rows]
+        self._metadatas = [self._metadatas[r] for r in kept_rows]
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._size = len(self._ids)
+        self._version += 1
+
+    # ----- Lecture -----
+
+    def count(self) -> int:
+        return self._size
+
+    def memory_bytes(self) -> int:
+        """Mémoire occupée par les vecteurs visibles (hors métadonnées)"""
+        size = self._size
+        scales = self._scales[:size].nbytes if self.storage == "int8" else 0
+        return self._vectors[:size].nbytes + scales
+
+    def _snapshot(self):
+        """Références cohérentes vers l'état courant"""
+        with self._lock:
+            return (self._size, self._vectors, self._scales, self._columns, self._ids,
+                    self._documents, self._metadatas, self._row_of)
+
+    def _partition_slices(self) -> Dict[str, Tuple[int, int]]:
+        """Tranche [début, fin) de chaque valeur de partition, les lignes étant rangées par valeur
+
+        Recalculée paresseusement après chaque modification (appel sous verrou).
+        """
+        if self._layout is not None and self._layout[0] == self._version:
+            return self._layout[1]
+
+        size = self._size
+        column = self._columns.get(self.partition_key)
+        labels = np.array(
+            ["" if column is None or column[r] is None else str(column[r]) for r in range(size)],
+            dtype=object
+        )
+        order = np.argsort(labels, kind="stable") if size else np.empty(0, dtype=np.int64)
+        if np.any(order != np.arange(size)):
+            self._permute(order)
+
+        slices = {}
+        if size:
+            values, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+            slices = {value: (int(start), int(start + count))
+                      for value, start, count in zip(values, starts, counts)}
+
+        self._layout = (self._version, slices)
+        return slices
+
+    def _permute(self, order: np.ndarray):
+        """Range les lignes visibles dans l'ordre donné (nouveaux tableaux de même capacité :
+        les lectures en cours gardent l'ancien ordre ; appel sous verrou)"""
+        size = self._size
+        vectors = np.empty_like(self._vectors)
+        vectors[:size] = self._vectors[:size][order]
+        scales = np.ones_like(self._scales)
+        scales[:size] = self._scales[:size][order]
+        columns = {}
+        for key, column in self._columns.items():
+            columns[key] = np.empty(len(column), dtype=object)
+            columns[key][:size] = column[:size][order]
+
+        self._vectors, self._scales, self._columns = vectors, scales, columns
+        self._ids = [self._ids[r] for r in order]
+        self._documents = [self._documents[r] for r in order]
+        self._metadatas = [self._metadatas[r] for r in order]
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+    def _partition_value(self, where: Optional[Dict]) -> Optional[str]:
+        """Valeur de partition si le filtre porte uniquement sur la clé de partition"""
+        if not where or len(where) != 1 or self.partition_key not in where:
+            return None
+        condition = where[self.partition_key]
+        if isinstance(condition, dict):
+            if set(condition) != {"$eq"}:
+                return None
+            condition = condition["$eq"]
+        return str(condition)
+
+    def partition_sizes(self) -> Dict[str, int]:
+        """Nombre de documents par valeur de partition"""
+        with self._lock:
+            slices = self._partition_slices()
+        return {value: int(end - start) for value, (start, end) in slices.items()}
+
+    def _mask(self, where: Optional[Dict], size: int, columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """Masque booléen des lignes satisfaisant le filtre (égalité, $eq, $in, $and)"""
+        if not where:
+            return None
+        if "$and" in where:
+            mask = np.ones(size, dtype=bool)
+            for clause in where["$and"]:
+                mask &= self._mask(clause, size, columns)
+            return mask
+
+        mask = np.ones(size, dtype=bool)
+        for key, condition in where.items():
+            column = columns.get(key)
+            if column is None:
+                return np.zeros(size, dtype=bool)
+            values = column[:size]
+            if isinstance(condition, dict) and "$in" in condition:
+                mask &= np.isin(values, list(condition["$in"]))
+            else:
+                target = condition["$eq"] if isinstance(condition, dict) else condition
+                mask &= values == target
+        return mask
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict] = None,
+              include: Optional[List[str]] = None,
+              fallback_n_results: Optional[int] = None) -> Dict[str, List[List[Any]]]:
+        """Top-k par similarité cosinus (distance = 1 - similarité), au format des résultats Chroma
+
+        Si `fallback_n_results` est donné et qu'aucune ligne ne satisfait `where`, la
+        recherche se poursuit sur toute la collection dans le même appel.
+        """
+        partition = self._partition_value(where)
+        with self._lock:
+            # Rangement éventuel des lignes avant la prise des références
+            slices = self._partition_slices() if partition is not None else None
+            size, vectors, scales, columns, ids, documents, metadatas = (
+                self._size, self._vectors, self._scales, self._columns, self._ids,
+                self._documents, self._metadatas
+            )
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        if not where:
+            rows = np.arange(size)
+            candidates, candidate_scales = vectors[:size], scales[:size]
+        elif slices is not None:
+            # Sous-index de la partition : vue sur sa tranche contiguë
+            start, end = slices.get(partition, (0, 0))
+            rows = np.arange(start, end)
+            candidates, candidate_scales = vectors[start:end], scales[start:end]
+        else:
+            mask = self._mask(where, size, columns)
+            rows = np.flatnonzero(mask)
+            candidates, candidate_scales = vectors[rows], scales[rows]
+
+        if not len(rows) and fallback_n_results is not None:
+            # Aucune ligne retenue : repli sur l'ensemble de la collection
+            rows = np.arange(size)
+            candidates, candidate_scales = vectors[:size], scales[:size]
+            n_results = fallback_n_results
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        scores = self._scores(candidates, candidate_scales, queries)
+        k = min(n_results, len(rows))
+        rescore = self._rescore_fn is not None and self.storage != "float32"
+        # En mode compact, on garde plus de candidats pour le re-classement pleine précision
+        shortlist = min(max(k, self.rescore_candidates), len(rows)) if rescore else k
+
+        for q in range(len(queries)):
+            column = scores[:, q]
+            if shortlist < len(rows):
+                top = np.argpartition(-column, shortlist)[:shortlist]
+            else:
+                top = np.arange(len(rows))
+            similarities = column[top]
+            if rescore and len(top):
+                similarities = self._rescore(queries[q], [documents[r] for r in rows[top]], similarities)
+            order = np.argsort(-similarities, kind="stable")[:k]
+            top, similarities = top[order], similarities[order]
+            selected = rows[top]
+            results["ids"].append([ids[r] for r in selected])
+            results["documents"].append([documents[r] for r in selected])
+            results["metadatas"].append([metadatas[r] for r in selected])
+            results["distances"].append((1.0 - similarities).tolist())
+        return results
+
+    def _scores(self, candidates: np.ndarray, scales: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """Similarités (lignes x requêtes), décompressées par blocs en mode compact"""
+        if not len(candidates):
+            return np.empty((0, len(queries)), dtype=np.float32)
+        if self.storage == "float32":
+            return candidates @ queries.T
+
+        scores = np.empty((len(candidates), len(queries)), dtype=np.float32)
+        for start in range(0, len(candidates), _SCORE_CHUNK_ROWS):
+            block = candidates[start:start + _SCORE_CHUNK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ queries.T
+        if self.storage == "int8":
+            scores *= scales[:, None]
+        return scores
+
+    def _rescore(self, query: np.ndarray, documents: List[str], approximate: np.ndarray) -> np.ndarray:
+        """Similarités exactes des candidats dont le vecteur float32 est disponible"""
+        exact = approximate.copy()
+        for i, vector in enumerate(self._rescore_fn(documents)):
+            if vector is not None:
+                exact[i] = float(vector @ query) / max(float(np.linalg.norm(vector)), 1e-12)
+        return exact
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            include: Optional[List[str]] = None) -> Dict[str, List[Any]]:
+        """Documents par identifiant et/ou filtre, au format des résultats Chroma"""
+        size, vectors, scales, columns, all_ids, documents, metadatas, row_of = self._snapshot()
+        include = include if include is not None else ["documents", "metadatas"]
+
+        mask = self._mask(where, size, columns)
+        if ids is not None:
+            rows = [row_of[doc_id] for doc_id in ids if doc_id in row_of]
+            rows = [r for r in rows if r < size and (mask is None or mask[r])]
+        else:
+            rows = list(range(size)) if mask is None else np.flatnonzero(mask).tolist()
+
+        result: Dict[str, List[Any]] = {"ids": [all_ids[r] for r in rows]}
+        result["documents"] = [documents[r] for r in rows] if "documents" in include else None
+        result["metadatas"] = [metadatas[r] for r in rows] if "metadatas" in include else None
+        result["embeddings"] = self._dequantize(vectors[rows], scales[rows]) if "embeddings" in include else None
+        return result
+
+
+class NumpyClient:
+    """Client en mémoire exposant la gestion de collections de l'API Chroma"""
+
+    def __init__(self, storage: str = "float32", rescore_fn: Optional[Callable] = None,
+                 rescore_candidates: int = 0):
+        self.storage = storage
+        self._rescore_fn = rescore_fn
+        self.rescore_candidates = rescore_candidates
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_collection(self, name: str) -> NumpyCollection:
+        with self._lock:
+            if name not in self._collections:
+                raise ValueError(f"Collection {name} inexistante")
+            return self._collections[name]
+
+    def create_collection(self, name: str, metadata: Optional[Dict] = None) -> NumpyCollection:
+        with self._lock:
+            if name in self._collections:
+                raise ValueError(f"Collection {name} déjà existante")
+            self._collections[name] = NumpyCollection(
+                name, metadata, storage=self.storage, rescore_fn=self._rescore_fn,
+                rescore_candidates=self.rescore_candidates
+            )
+            return self._collections[name]
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+
+    def list_collections(self) -> List[NumpyCollection]:
+        with self._lock:
+            return list(self._collections.values())